@@ -0,0 +1,93 @@
+"""
+Availability query latency for one busy doctor.
+
+    python -m benchmarks.bench_availability --days 30 --slot-minutes 15
+
+Seeds a doctor whose working days are roughly half booked with a mix of
+durations, then times `get_availability` over the whole range.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks.common import emit, session_factory, summarize_ms, temp_sqlite_engine
+from src.models.appointment import Appointment, appointment_end
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.services.availability_service import get_availability
+
+
+def _seed(db, days: int, rng: random.Random) -> int:
+    patient = Patient(
+        first_name="Bench", last_name="Patient", email="b@example.com", phone="1"
+    )
+    doctor = Doctor(full_name="Dr Busy", specialization="Bench")
+    db.add_all([patient, doctor])
+    db.commit()
+
+    rows = []
+    first_day = datetime.now(timezone.utc).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    for day in range(days):
+        cursor = first_day + timedelta(days=day)
+        day_end = cursor.replace(hour=17)
+        while cursor < day_end:
+            duration = rng.choice((15, 30, 45, 60))
+            if rng.random() < 0.5 and cursor + timedelta(minutes=duration) <= day_end:
+                rows.append(
+                    {
+                        "patient_id": patient.id,
+                        "doctor_id": doctor.id,
+                        "start_time_utc": cursor,
+                        "duration_minutes": duration,
+                        "end_time_utc": appointment_end(cursor, duration),
+                    }
+                )
+            cursor += timedelta(minutes=duration)
+    db.execute(insert(Appointment), rows)
+    db.commit()
+    return doctor.id
+
+
+def run(days: int, slot_minutes: int, repeats: int) -> dict:
+    with temp_sqlite_engine() as engine:
+        Session = session_factory(engine)
+        with Session() as db:
+            doctor_id = _seed(db, days, random.Random(42))
+
+        start = datetime.now(timezone.utc).date() + timedelta(days=1)
+        end = start + timedelta(days=days - 1)
+        samples = []
+        slots = 0
+        for _ in range(repeats):
+            with Session() as db:
+                t0 = time.perf_counter()
+                result = get_availability(db, doctor_id, start, end, slot_minutes)
+                samples.append(time.perf_counter() - t0)
+                slots = len(result.slots)
+
+    return {
+        "benchmark": "availability",
+        "days": days,
+        "slot_minutes": slot_minutes,
+        "slots_returned": slots,
+        **summarize_ms(samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--slot-minutes", type=int, default=15)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    emit(run(args.days, args.slot_minutes, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Booking latency vs. appointment history size.
+
+    python -m benchmarks.bench_booking --history 10 1000 100000
+
+For every history size a fresh doctor gets that many past appointments, then
+`create_appointment` is timed for a series of future, non-conflicting slots.
+With the bounded conflict window the latency should stay flat as history
+grows.
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks.common import emit, session_factory, summarize_ms, temp_sqlite_engine
+from src.models.appointment import Appointment, appointment_end
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.schemas.appointment_pydantic import AppointmentCreate
+from src.services.appointment_service import create_appointment
+
+SEED_BATCH = 10_000
+
+
+def _seed_history(db, doctor_id: int, patient_id: int, rows: int) -> None:
+    # Back-to-back 30 minute appointments ending an hour ago.
+    first = datetime.now(timezone.utc) - timedelta(minutes=30 * rows + 60)
+    for offset in range(0, rows, SEED_BATCH):
+        db.execute(
+            insert(Appointment),
+            [
+                {
+                    "patient_id": patient_id,
+                    "doctor_id": doctor_id,
+                    "start_time_utc": start,
+                    "duration_minutes": 30,
+                    "end_time_utc": appointment_end(start, 30),
+                }
+                for i in range(offset, min(rows, offset + SEED_BATCH))
+                for start in (first + timedelta(minutes=30 * i),)
+            ],
+        )
+    db.commit()
+
+
+def run(history_sizes: list[int], bookings: int) -> dict:
+    results = []
+    with temp_sqlite_engine() as engine:
+        Session = session_factory(engine)
+        with Session() as db:
+            patient = Patient(
+                first_name="Bench",
+                last_name="Patient",
+                email="bench.patient@example.com",
+                phone="9999999999",
+            )
+            db.add(patient)
+            db.commit()
+            patient_id = patient.id
+
+        for size in history_sizes:
+            with Session() as db:
+                doctor = Doctor(full_name=f"Dr Bench {size}", specialization="Bench")
+                db.add(doctor)
+                db.commit()
+                doctor_id = doctor.id
+                _seed_history(db, doctor_id, patient_id, size)
+
+            base = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+            samples = []
+            for i in range(bookings):
+                payload = AppointmentCreate(
+                    patient_id=patient_id,
+                    doctor_id=doctor_id,
+                    start_time_utc=base + timedelta(days=1, minutes=30 * i),
+                    duration_minutes=30,
+                )
+                with Session() as db:
+                    t0 = time.perf_counter()
+                    create_appointment(db, payload)
+                    samples.append(time.perf_counter() - t0)
+            results.append({"history_rows": size, **summarize_ms(samples)})
+
+    return {"benchmark": "create_appointment", "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--bookings", type=int, default=200)
+    args = parser.parse_args()
+    emit(run(args.history, args.bookings))
+
+
+if __name__ == "__main__":
+    main()
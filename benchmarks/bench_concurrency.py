@@ -0,0 +1,110 @@
+"""
+Sync (threadpool) vs. async (AsyncEngine) request handling under concurrency.
+
+    python -m benchmarks.bench_concurrency --concurrency 200 --requests 5000
+
+Starts the app with uvicorn once per mode against a throwaway SQLite file,
+seeds a few rows through the API and then keeps `--concurrency` requests in
+flight against the read endpoints. Reports throughput and latency per mode.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import (
+    emit,
+    free_port,
+    start_server,
+    summarize_ms,
+    temp_sqlite_path,
+    wait_ready,
+)
+
+
+async def _seed(client: httpx.AsyncClient, doctors: int) -> list[int]:
+    ids = []
+    for i in range(doctors):
+        r = await client.post(
+            "/doctors", json={"full_name": f"Dr {i}", "specialization": "Bench"}
+        )
+        ids.append(r.json()["id"])
+    for i in range(50):
+        await client.post(
+            "/patients",
+            json={
+                "first_name": "Bench",
+                "last_name": str(i),
+                "email": f"bench{i}@example.com",
+                "phone": "1",
+            },
+        )
+    return ids
+
+
+async def _load(
+    client: httpx.AsyncClient, doctor_ids: list[int], concurrency: int, total: int
+) -> tuple[list[float], float, int]:
+    paths = [f"/doctors/{doctor_id}" for doctor_id in doctor_ids] + [
+        "/patients?limit=50"
+    ]
+    samples: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            t0 = time.perf_counter()
+            r = await client.get(paths[i % len(paths)])
+            samples.append(time.perf_counter() - t0)
+            errors += r.status_code != 200
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - t0, errors
+
+
+async def _run_mode(mode: str, concurrency: int, total: int) -> dict:
+    port = free_port()
+    limits = httpx.Limits(max_connections=concurrency)
+    with temp_sqlite_path() as db_path:
+        server = start_server(db_path, port, mode)
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+            ) as client:
+                await wait_ready(client)
+                doctor_ids = await _seed(client, doctors=20)
+                samples, elapsed, errors = await _load(
+                    client, doctor_ids, concurrency, total
+                )
+        finally:
+            server.terminate()
+            server.wait()
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests_per_s": round(len(samples) / elapsed, 1),
+        "errors": errors,
+        **summarize_ms(samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    args = parser.parse_args()
+    results = [
+        asyncio.run(_run_mode(mode, args.concurrency, args.requests))
+        for mode in args.modes
+    ]
+    emit({"benchmark": "concurrency", "results": results})
+
+
+if __name__ == "__main__":
+    main()
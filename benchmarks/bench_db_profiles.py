@@ -0,0 +1,133 @@
+"""
+Mixed read/write load under each DB_PROFILE.
+
+    python -m benchmarks.bench_db_profiles --concurrency 32 --requests 4000 \\
+        --write-share 0.2
+
+Seeds one SQLite file like bench_endpoints, then for each profile starts
+the app on a fresh copy of it and sends `--requests` requests with
+`--concurrency` in flight. `--write-share` of them are writes (new
+patients and bookings), the rest are reads (patient and appointment
+lookups, list pages, a doctor's day and availability). Reports requests/s, errors
+and read and write latency per profile.
+
+Under `baseline` (rollback journal) every write locks readers out of the
+file, so read latency tracks the write rate; WAL lets reads run alongside
+the writer.
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+import time
+
+import httpx
+
+from benchmarks.bench_endpoints import Dataset, scenarios, seed
+from benchmarks.common import (
+    emit,
+    free_port,
+    remove_sqlite_files,
+    start_server,
+    summarize_ms,
+    temp_sqlite_path,
+    wait_ready,
+)
+from src.db_profiles import PROFILES
+
+READS = (
+    "get_patient",
+    "list_patients",
+    "get_appointment",
+    "list_appointments_by_date_and_doctor",
+    "doctor_availability",
+)
+WRITES = ("create_patient", "create_appointment")
+
+
+async def _drive(
+    port: int, data: Dataset, args: argparse.Namespace, rng: random.Random
+) -> dict:
+    factories = scenarios(data, rng)
+    samples: dict[str, list[float]] = {"read": [], "write": []}
+    errors = 0
+    counter = iter(range(args.requests))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for i in counter:
+            kind = "write" if rng.random() < args.write_share else "read"
+            req = factories[rng.choice(WRITES if kind == "write" else READS)](i)
+            t0 = time.perf_counter()
+            r = await client.request(req.method, req.path, json=req.json)
+            samples[kind].append(time.perf_counter() - t0)
+            errors += r.status_code >= 400
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120
+    ) as client:
+        await wait_ready(client)
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - t0
+    return {
+        "requests_per_s": round(args.requests / elapsed, 1),
+        "errors": errors,
+        "read": summarize_ms(samples["read"]),
+        "write": summarize_ms(samples["write"]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--doctors", type=int, default=100)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=4000, help="per profile")
+    parser.add_argument("--write-share", type=float, default=0.2)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument(
+        "--profiles", nargs="+", default=list(PROFILES["sqlite"]), metavar="NAME"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = {}
+    with temp_sqlite_path() as seeded, temp_sqlite_path() as db_path:
+        data = seed(seeded, args.patients, args.doctors, args.appointments)
+        for profile in args.profiles:
+            # The same data for every profile, and no WAL left over from the
+            # previous run: journal_mode is stored in the file.
+            remove_sqlite_files(db_path)
+            shutil.copyfile(seeded, db_path)
+            port = free_port()
+            server = start_server(db_path, port, args.mode, profile)
+            try:
+                rng = random.Random(args.seed)  # nosec B311 - load pattern
+                results[profile] = asyncio.run(_drive(port, data, args, rng))
+            finally:
+                server.terminate()
+                server.wait()
+
+    emit(
+        {
+            "benchmark": "db_profiles",
+            "params": {
+                "patients": args.patients,
+                "doctors": args.doctors,
+                "appointments": args.appointments,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "write_share": args.write_share,
+                "mode": args.mode,
+            },
+            "results": results,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
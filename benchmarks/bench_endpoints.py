@@ -0,0 +1,292 @@
+"""
+Per-endpoint throughput and latency at production-like data sizes.
+
+    python -m benchmarks.bench_endpoints --patients 10000 --doctors 100 \\
+        --appointments 100000 --concurrency 32 --requests 2000 --output run.json
+
+Seeds a throwaway SQLite file with `--patients`, `--doctors` and
+`--appointments` rows (deterministic for a given `--seed`), starts the app
+on it with uvicorn and drives each route in turn with `--concurrency`
+requests in flight until `--requests` have completed. Seeded appointments
+are back-to-back 30 minute slots per doctor around today, so the
+date-filtered listing sees a realistic day.
+
+The JSON report carries the git commit and the parameters next to the
+results, so reports from two commits can be compared directly. Use
+`--scenarios` to run a subset.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess  # nosec B404
+import time
+from datetime import datetime, timedelta, timezone
+from datetime import time as dt_time
+from itertools import count
+from typing import Callable, NamedTuple
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from benchmarks.common import (
+    ROOT,
+    emit,
+    free_port,
+    start_server,
+    summarize_ms,
+    temp_sqlite_path,
+    wait_ready,
+)
+from src.database import Base
+from src.models.appointment import Appointment, appointment_end
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+
+SEED_BATCH = 10_000
+SLOT = timedelta(minutes=30)
+SPECIALIZATIONS = ("Cardiology", "Dermatology", "General", "Neurology", "Pediatrics")
+
+
+class Dataset(NamedTuple):
+    patients: int
+    doctors: int
+    appointments: int
+    first_day: datetime
+    days: int
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    json: dict | None = None
+
+
+def _rows(n: int, make: Callable[[int], dict]):
+    for offset in range(0, n, SEED_BATCH):
+        yield [make(i) for i in range(offset, min(n, offset + SEED_BATCH))]
+
+
+def seed(db_path: str, patients: int, doctors: int, appointments: int) -> Dataset:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    per_doctor = -(-appointments // doctors)
+    now = datetime.now(timezone.utc)
+    first_day = datetime.combine(now.date(), dt_time(), tzinfo=timezone.utc)
+    first_day -= timedelta(days=per_doctor * SLOT.total_seconds() // 86400 // 2)
+
+    def appointment(i: int) -> dict:
+        start = first_day + SLOT * (i // doctors)
+        return {
+            "patient_id": i % patients + 1,
+            "doctor_id": i % doctors + 1,
+            "start_time_utc": start,
+            "duration_minutes": 30,
+            "end_time_utc": appointment_end(start, 30),
+        }
+
+    with engine.begin() as conn:
+        for batch in _rows(
+            patients,
+            lambda i: {
+                "first_name": "Seed",
+                "last_name": f"Patient {i}",
+                "email": f"seed{i}@example.com",
+                "phone": "9999999999",
+            },
+        ):
+            conn.execute(insert(Patient), batch)
+        for batch in _rows(
+            doctors,
+            lambda i: {
+                "full_name": f"Dr Seed {i}",
+                "specialization": SPECIALIZATIONS[i % len(SPECIALIZATIONS)],
+            },
+        ):
+            conn.execute(insert(Doctor), batch)
+        for batch in _rows(appointments, appointment):
+            conn.execute(insert(Appointment), batch)
+    engine.dispose()
+    days = -(-per_doctor * int(SLOT.total_seconds()) // 86400)
+    return Dataset(patients, doctors, appointments, first_day, max(days, 1))
+
+
+def scenarios(data: Dataset, rng: random.Random) -> dict[str, Callable[[int], Request]]:
+    """Scenario name -> factory building the i-th request of that scenario."""
+    emails, bookings = count(), count()
+    # Far enough ahead that new bookings never meet the seeded ones.
+    booking_base = data.first_day + timedelta(days=data.days + 400)
+
+    def patient_id() -> int:
+        return rng.randint(1, data.patients)
+
+    def doctor_id() -> int:
+        return rng.randint(1, data.doctors)
+
+    def day() -> str:
+        return (
+            (data.first_day + timedelta(days=rng.randrange(data.days)))
+            .date()
+            .isoformat()
+        )
+
+    def book(_: int) -> Request:
+        n = next(bookings)
+        start = booking_base + SLOT * (n // data.doctors)
+        return Request(
+            "POST",
+            "/appointments",
+            {
+                "patient_id": patient_id(),
+                "doctor_id": n % data.doctors + 1,
+                "start_time_utc": start.isoformat(),
+                "duration_minutes": 30,
+            },
+        )
+
+    def availability(_: int) -> Request:
+        d = day()
+        return Request("GET", f"/doctors/{doctor_id()}/availability?from={d}&to={d}")
+
+    return {
+        "create_patient": lambda i: Request(
+            "POST",
+            "/patients",
+            {
+                "first_name": "Bench",
+                "last_name": f"Patient {i}",
+                "email": f"bench{next(emails)}@example.com",
+                "phone": "9999999999",
+            },
+        ),
+        "list_patients": lambda i: Request("GET", "/patients?limit=100"),
+        "get_patient": lambda i: Request("GET", f"/patients/{patient_id()}"),
+        "create_doctor": lambda i: Request(
+            "POST",
+            "/doctors",
+            {"full_name": f"Dr Bench {i}", "specialization": "General"},
+        ),
+        "list_doctors": lambda i: Request("GET", "/doctors?limit=100"),
+        "get_doctor": lambda i: Request("GET", f"/doctors/{doctor_id()}"),
+        "create_appointment": book,
+        "list_appointments_by_date": lambda i: Request(
+            "GET", f"/appointments?date={day()}"
+        ),
+        "list_appointments_by_date_and_doctor": lambda i: Request(
+            "GET", f"/appointments?date={day()}&doctor_id={doctor_id()}"
+        ),
+        "get_appointment": lambda i: Request(
+            "GET", f"/appointments/{rng.randint(1, data.appointments)}"
+        ),
+        "doctor_availability": availability,
+    }
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    make: Callable[[int], Request],
+    concurrency: int,
+    total: int,
+) -> dict:
+    samples: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            req = make(i)
+            t0 = time.perf_counter()
+            r = await client.request(req.method, req.path, json=req.json)
+            samples.append(time.perf_counter() - t0)
+            errors += r.status_code >= 400
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "requests_per_s": round(len(samples) / elapsed, 1),
+        "errors": errors,
+        **summarize_ms(samples),
+    }
+
+
+async def _run(args: argparse.Namespace, db_path: str, data: Dataset) -> dict:
+    rng = random.Random(args.seed)  # nosec B311 - load pattern, not security
+    factories = scenarios(data, rng)
+    selected = args.scenarios or list(factories)
+    port = free_port()
+    server = start_server(db_path, port, args.mode)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results = {}
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120
+        ) as client:
+            await wait_ready(client)
+            for name in selected:
+                results[name] = await _drive(
+                    client, factories[name], args.concurrency, args.requests
+                )
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(  # nosec B603 B607
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--doctors", type=int, default=100)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="per scenario")
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenarios", nargs="+")
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+
+    with temp_sqlite_path() as db_path:
+        t0 = time.perf_counter()
+        data = seed(db_path, args.patients, args.doctors, args.appointments)
+        seed_s = time.perf_counter() - t0
+        results = asyncio.run(_run(args, db_path, data))
+
+    report = {
+        "benchmark": "endpoints",
+        "git_commit": _git_commit(),
+        "params": {
+            "patients": args.patients,
+            "doctors": args.doctors,
+            "appointments": args.appointments,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "mode": args.mode,
+            "seed": args.seed,
+        },
+        "seed_s": round(seed_s, 3),
+        "results": results,
+    }
+    emit(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
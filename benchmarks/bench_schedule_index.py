@@ -0,0 +1,175 @@
+"""
+Schedule index: memory and conflict-check speed.
+
+    python -m benchmarks.bench_schedule_index --doctors 5000 --days 90
+
+Seeds `--seeded-doctors` doctors with `--days` of fully booked future
+shifts, then compares, on random slots in that span:
+
+- `conflict`: _has_conflict (one indexed query, as under the booking lock)
+  against ScheduleIndex.collides.
+- `day_view`: booked_intervals for one working day from the database
+  against the index.
+- `load`: loading one doctor's horizon into the index.
+
+For memory, the loaded schedules are copied under new ids until the index
+holds `--doctors` doctors, and both the index's own accounting and the
+bytes tracemalloc saw allocated are reported.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks.common import emit, session_factory, summarize_ms, temp_sqlite_engine
+from src.generate_data import BATCH_SIZE, _batches, appointment_rows
+from src.models.appointment import Appointment
+from src.schedule_index import DoctorSchedule, ScheduleIndex
+from src.services.appointment_service import MAX_DURATION_MINUTES, _has_conflict
+from src.services.availability_service import booked_intervals_by_doctor
+
+
+def _time(fn, probes) -> list[float]:
+    samples = []
+    for probe in probes:
+        t0 = time.perf_counter()
+        fn(*probe)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--doctors", type=int, default=5_000)
+    parser.add_argument("--seeded-doctors", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--probes", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)  # nosec B311 - synthetic data
+    today = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+    )
+    doctor_ids = range(1, args.seeded_doctors + 1)
+    index = ScheduleIndex(
+        max_duration=timedelta(minutes=MAX_DURATION_MINUTES),
+        enabled=True,
+        horizon_days=args.days,
+        reconcile_seconds=float("inf"),
+        max_doctors=args.doctors,
+    )
+
+    with temp_sqlite_engine() as engine:
+        rows = appointment_rows(
+            rng,
+            doctor_ids,
+            range(1, 1_001),
+            today + timedelta(days=1),
+            args.days - 1,
+            today,
+            # Far-off horizon, so the seeded days stay fully booked.
+            args.days * 100,
+        )
+        seeded = 0
+        with engine.connect() as conn:
+            for batch in _batches(rows, BATCH_SIZE):
+                conn.execute(insert(Appointment), batch)
+                seeded += len(batch)
+            conn.commit()
+
+        probes = []
+        for _ in range(args.probes):
+            start = datetime.combine(
+                today + timedelta(days=rng.randint(1, args.days - 1)),
+                datetime.min.time(),
+                tzinfo=timezone.utc,
+            ) + timedelta(minutes=rng.randrange(7 * 60, 18 * 60, 15))
+            probes.append(
+                (rng.choice(doctor_ids), start, start + timedelta(minutes=30))
+            )
+        day_probes = [
+            (
+                doctor_id,
+                start.replace(hour=8, minute=0),
+                start.replace(hour=18, minute=0),
+            )
+            for doctor_id, start, _ in probes
+        ]
+
+        make_session = session_factory(engine)
+        with make_session() as db:
+            load = _time(
+                lambda doctor_id: index.intervals(db, doctor_id, *day_probes[0][1:]),
+                [(doctor_id,) for doctor_id in doctor_ids],
+            )
+            db_conflict = _time(lambda *p: _has_conflict(db, *p), probes)
+            index_conflict = _time(index.collides, probes)
+            db_day = _time(
+                lambda d, s, e: booked_intervals_by_doctor(db, [d], s, e), day_probes
+            )
+            index_day = _time(lambda *p: index.intervals(db, *p), day_probes)
+            mismatched = sum(
+                _has_conflict(db, *p) != index.collides(*p) for p in probes
+            ) + sum(
+                booked_intervals_by_doctor(db, [p[0]], *p[1:])[p[0]]
+                != index.intervals(db, *p)
+                for p in day_probes
+            )
+
+    loaded = [index._doctors[doctor_id] for doctor_id in doctor_ids]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    with index._lock:
+        for doctor_id in range(args.seeded_doctors + 1, args.doctors + 1):
+            source = loaded[doctor_id % len(loaded)]
+            copy = DoctorSchedule(
+                source.window_start, source.window_end, source.loaded_at
+            )
+            copy.starts = array("q", source.starts)
+            copy.minutes = array("H", source.minutes)
+            copy.ids = array("q", source.ids)
+            index._doctors[doctor_id] = copy
+    copied = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    stats = index.stats()
+    copies = args.doctors - args.seeded_doctors
+    per_doctor = copied / copies if copies > 0 else 0
+
+    emit(
+        {
+            "benchmark": "schedule_index",
+            "seeded_appointments": seeded,
+            "days": args.days,
+            "conflict": {
+                "database": summarize_ms(db_conflict),
+                "index": summarize_ms(index_conflict),
+            },
+            "day_view": {
+                "database": summarize_ms(db_day),
+                "index": summarize_ms(index_day),
+            },
+            "load_doctor": summarize_ms(load),
+            "mismatched": mismatched,
+            "memory": {
+                "doctors": stats["doctors"],
+                "appointments": stats["appointments"],
+                "index_bytes": stats["bytes"],
+                "bytes_per_appointment": round(
+                    stats["bytes"] / max(stats["appointments"], 1), 1
+                ),
+                "traced_bytes_estimate": round(per_doctor * stats["doctors"]),
+            },
+        }
+    )
+    if mismatched:
+        raise SystemExit(f"{mismatched} index answers differ from the database")
+
+
+if __name__ == "__main__":
+    main()
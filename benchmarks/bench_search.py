@@ -0,0 +1,78 @@
+"""
+Patient search latency.
+
+    python -m benchmarks.bench_search --patients 1000000 --repeat 50
+
+Seeds `--patients` synthetic patients (names drawn from the generator's
+small name lists, so every name is shared by tens of thousands of rows,
+which is harder than real data) and times search_patient_rows for a mix of
+one-letter, name, multi-word and email queries at the default limit.
+Reports p50/p99 per query and the number of rows returned, and fails if
+any query's p50 is over `--max-p50-ms` (10 ms, the target at 1M patients).
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import emit, session_factory, summarize_ms, temp_sqlite_engine
+from src.generate_data import BATCH_SIZE, _batches, patient_rows
+from src.models.patient import Patient
+from src.services.patient_service import search_patient_rows
+
+QUERIES = (
+    "s",
+    "sa",
+    "ivan",
+    "ivanova",
+    "elena garcia",
+    "aarav.p",
+    "grace 12345",
+    "aarav.patel.61@example.com",
+    "nobody",
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p50-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)  # nosec B311 - synthetic data
+    with temp_sqlite_engine() as engine:
+        t0 = time.perf_counter()
+        with engine.connect() as conn:
+            for batch in _batches(patient_rows(rng, 1, args.patients), BATCH_SIZE):
+                conn.execute(insert(Patient), batch)
+            conn.commit()
+        seed_s = time.perf_counter() - t0
+
+        report = {
+            "benchmark": "patient_search",
+            "patients": args.patients,
+            "seed_s": round(seed_s, 1),
+            "queries": {},
+        }
+        with session_factory(engine)() as db:
+            for query in QUERIES:
+                rows = search_patient_rows(db, query)  # warm the page cache
+                samples = []
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    search_patient_rows(db, query)
+                    samples.append(time.perf_counter() - t0)
+                report["queries"][query] = {"rows": len(rows), **summarize_ms(samples)}
+
+    emit(report)
+    slow = [q for q, r in report["queries"].items() if r["p50_ms"] > args.max_p50_ms]
+    if slow:
+        raise SystemExit(f"p50 over {args.max_p50_ms} ms: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+List endpoint serialization: ORM + response model vs column rows + orjson.
+
+    python -m benchmarks.bench_serialization --repeat 50
+
+Seeds patients, doctors and one busy day of appointments, then times a full
+page of each list endpoint both ways, from the query to the response bytes:
+
+- `model`: the ORM service function, each row validated into its read
+  model and rendered by JSONResponse, which is what `response_model` does.
+- `rows`: the column-row service function and encode_rows(), which is
+  what the list routes now serve.
+
+Fails if the two paths produce different bytes.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+
+from benchmarks.common import emit, session_factory, summarize_ms, temp_sqlite_engine
+from src.generate_data import appointment_rows, doctor_rows, patient_rows
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.pagination import MAX_PAGE_SIZE
+from src.schemas.appointment_pydantic import AppointmentExpandedRead, AppointmentRead
+from src.schemas.doctor_pydantic import DoctorRead
+from src.schemas.patient_pydantic import PatientRead
+from src.serialization import encode_rows
+from src.services.appointment_service import (
+    list_appointment_rows_by_date,
+    list_appointments_by_date,
+)
+from src.services.doctor_service import list_doctor_rows, list_doctors
+from src.services.patient_service import list_patient_rows, list_patients
+
+
+def _render(model, items, **dump) -> bytes:
+    adapter = TypeAdapter(list[model])
+    objs = [
+        (
+            item
+            if isinstance(item, model)
+            else model.model_validate(item, from_attributes=True)
+        )
+        for item in items
+    ]
+    return JSONResponse(adapter.dump_python(objs, mode="json", **dump)).body
+
+
+def _time(fn, repeat: int) -> tuple[list[float], bytes]:
+    samples, body = [], b""
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        body = fn()
+        samples.append(time.perf_counter() - t0)
+    return samples, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=5_000)
+    parser.add_argument("--doctors", type=int, default=MAX_PAGE_SIZE)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)  # nosec B311 - synthetic data
+    day = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+    ) + timedelta(days=1)
+
+    with temp_sqlite_engine() as engine:
+        with engine.connect() as conn:
+            conn.execute(insert(Patient), list(patient_rows(rng, 1, args.patients)))
+            conn.execute(insert(Doctor), list(doctor_rows(rng, 1, args.doctors)))
+            conn.execute(
+                insert(Appointment),
+                list(
+                    appointment_rows(
+                        rng,
+                        range(1, args.doctors + 1),
+                        range(1, args.patients + 1),
+                        day,
+                        1,
+                        day,
+                        0,
+                    )
+                ),
+            )
+            conn.commit()
+
+        make_session = session_factory(engine)
+        target = day.date()
+        scenarios = {
+            "patients": (
+                lambda db: _render(PatientRead, list_patients(db, MAX_PAGE_SIZE)[0]),
+                lambda db: encode_rows(
+                    list_patient_rows(db, MAX_PAGE_SIZE)[0], PatientRead
+                ),
+            ),
+            "doctors": (
+                lambda db: _render(DoctorRead, list_doctors(db, MAX_PAGE_SIZE)[0]),
+                lambda db: encode_rows(
+                    list_doctor_rows(db, MAX_PAGE_SIZE)[0], DoctorRead
+                ),
+            ),
+            "appointments_by_date": (
+                lambda db: _render(
+                    AppointmentExpandedRead,
+                    list_appointments_by_date(db, target),
+                    exclude_unset=True,
+                ),
+                lambda db: encode_rows(
+                    list_appointment_rows_by_date(db, target), AppointmentRead
+                ),
+            ),
+        }
+
+        report = {"benchmark": "list_serialization", "repeat": args.repeat}
+        mismatched = []
+        for name, (model_path, rows_path) in scenarios.items():
+            with make_session() as db:
+                model_samples, model_body = _time(lambda: model_path(db), args.repeat)
+            with make_session() as db:
+                rows_samples, rows_body = _time(lambda: rows_path(db), args.repeat)
+            if model_body != rows_body:
+                mismatched.append(name)
+            model_p50 = summarize_ms(model_samples)["p50_ms"]
+            rows_p50 = summarize_ms(rows_samples)["p50_ms"]
+            report[name] = {
+                "items": model_body.count(b'"id":'),
+                "bytes": len(rows_body),
+                "identical": model_body == rows_body,
+                "model": summarize_ms(model_samples),
+                "rows": summarize_ms(rows_samples),
+                "speedup_p50": round(model_p50 / rows_p50, 2) if rows_p50 else None,
+            }
+
+    emit(report)
+    if mismatched:
+        raise SystemExit(f"output differs for: {', '.join(mismatched)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Shared helpers for the scripts in this package.
+
+Benchmarks run against a throwaway SQLite file so they never touch the
+database configured through DATABASE_URL.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess  # nosec B404
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import httpx
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.database import Base
+from src.models.appointment import Appointment  # noqa: F401
+from src.models.doctor import Doctor  # noqa: F401
+from src.models.patient import Patient  # noqa: F401
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@contextmanager
+def temp_sqlite_engine() -> Iterator[Engine]:
+    fd, path = tempfile.mkstemp(prefix="pes-bench-", suffix=".db")
+    os.close(fd)
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+@contextmanager
+def temp_sqlite_path() -> Iterator[str]:
+    """A throwaway SQLite file path for scripts that start their own server."""
+    fd, path = tempfile.mkstemp(prefix="pes-bench-", suffix=".db")
+    os.close(fd)
+    try:
+        yield path
+    finally:
+        remove_sqlite_files(path)
+
+
+def remove_sqlite_files(path: str) -> None:
+    """Delete a SQLite file and any WAL files left next to it."""
+    for name in (path, f"{path}-wal", f"{path}-shm"):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+def session_factory(engine: Engine) -> sessionmaker[Session]:
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(
+    db_path: str, port: int, mode: str = "sync", profile: str | None = None
+) -> subprocess.Popen:
+    """Run the app under uvicorn against `db_path`, sync or async DB mode,
+    with DB_PROFILE `profile` (default: the app's default)."""
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "DB_ASYNC": "1" if mode == "async" else "0",
+    }
+    env.pop("ASYNC_DATABASE_URL", None)
+    env.pop("DB_PROFILE", None)
+    if profile is not None:
+        env["DB_PROFILE"] = profile
+    return subprocess.Popen(  # nosec B603
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient) -> None:
+    for _ in range(100):
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile; `samples` does not need to be sorted."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize_ms(samples: Sequence[float]) -> dict:
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(max(samples, default=0.0) * 1000, 3),
+    }
+
+
+def emit(report: dict) -> None:
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,81 @@
+"""store appointment end time
+
+Adds vamsi_appointments.end_time_utc, backfills it from start_time_utc +
+duration_minutes and replaces ix_doctor_start_time with a
+(doctor_id, start_time_utc, end_time_utc) index so overlap checks are
+answered from the index.
+
+Revision ID: 0002_appointment_end_time
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_appointment_end_time"
+down_revision: Union[str, Sequence[str], None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 50_000
+
+# start_time_utc + duration_minutes, per dialect. SQLite keeps the original
+# fractional seconds so the text format matches what SQLAlchemy writes.
+_END_EXPRESSION = {
+    "mysql": "DATE_ADD(start_time_utc, INTERVAL duration_minutes MINUTE)",
+    "sqlite": (
+        "strftime('%Y-%m-%d %H:%M:%S', start_time_utc, "
+        "'+' || duration_minutes || ' minutes') || substr(start_time_utc, 20)"
+    ),
+}
+_DEFAULT_END_EXPRESSION = "start_time_utc + duration_minutes * INTERVAL '1 minute'"
+
+
+def _backfill_end_time() -> None:
+    bind = op.get_bind()
+    end_expr = _END_EXPRESSION.get(bind.dialect.name, _DEFAULT_END_EXPRESSION)
+    max_id = bind.execute(sa.text("SELECT MAX(id) FROM vamsi_appointments")).scalar()
+    if max_id is None:
+        return
+
+    # Batches by primary key keep each UPDATE's lock footprint small.
+    update = sa.text(
+        f"UPDATE vamsi_appointments SET end_time_utc = {end_expr} "  # nosec B608
+        "WHERE id > :lo AND id <= :hi"
+    )
+    for lo in range(0, max_id, BACKFILL_BATCH):
+        bind.execute(update, {"lo": lo, "hi": lo + BACKFILL_BATCH})
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "vamsi_appointments",
+        sa.Column("end_time_utc", sa.DateTime(), nullable=True),
+    )
+    _backfill_end_time()
+
+    with op.batch_alter_table("vamsi_appointments") as batch_op:
+        batch_op.alter_column(
+            "end_time_utc", existing_type=sa.DateTime(), nullable=False
+        )
+        batch_op.drop_index("ix_doctor_start_time")
+        batch_op.create_index(
+            "ix_doctor_start_end",
+            ["doctor_id", "start_time_utc", "end_time_utc"],
+        )
+        batch_op.create_index("ix_appointment_start_time", ["start_time_utc"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("vamsi_appointments") as batch_op:
+        batch_op.drop_index("ix_appointment_start_time")
+        batch_op.drop_index("ix_doctor_start_end")
+        batch_op.create_index("ix_doctor_start_time", ["doctor_id", "start_time_utc"])
+        batch_op.drop_column("end_time_utc")
@@ -0,0 +1,31 @@
+"""index doctors by specialization
+
+Revision ID: 0003_doctor_specialization_index
+Revises: 0002_appointment_end_time
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_doctor_specialization_index"
+down_revision: Union[str, Sequence[str], None] = "0002_appointment_end_time"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_doctor_specialization_active",
+        "vamsi_doctors",
+        ["specialization", "is_active"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_doctor_specialization_active", table_name="vamsi_doctors")
@@ -0,0 +1,84 @@
+"""patient search indexes
+
+Indexes vamsi_patients for prefix search: (last_name, first_name) and
+first_name B-trees everywhere, and on SQLite the vamsi_patients_fts FTS5
+table with the triggers that keep it in sync, filled from the existing
+rows. The DDL is a copy of PATIENT_FTS_DDL in src/models/patient.py as of
+this revision.
+
+A later batch_alter_table on vamsi_patients recreates the table on SQLite
+and drops its triggers; such a migration has to recreate them.
+
+Revision ID: 0004_patient_search
+Revises: 0003_doctor_specialization_index
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_patient_search"
+down_revision: Union[str, Sequence[str], None] = "0003_doctor_specialization_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_FTS_EMAIL = "substr(new.email, 1, instr(new.email, '@') - 1)"
+_SQLITE_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS vamsi_patients_fts USING fts5(
+        last_name, first_name, email,
+        prefix='1 2 3 4 5 6', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vamsi_patients_fts_ai
+    AFTER INSERT ON vamsi_patients BEGIN
+        INSERT INTO vamsi_patients_fts(rowid, last_name, first_name, email)
+        VALUES (new.id, new.last_name, new.first_name, {_FTS_EMAIL});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS vamsi_patients_fts_ad
+    AFTER DELETE ON vamsi_patients BEGIN
+        DELETE FROM vamsi_patients_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vamsi_patients_fts_au
+    AFTER UPDATE OF id, last_name, first_name, email ON vamsi_patients BEGIN
+        DELETE FROM vamsi_patients_fts WHERE rowid = old.id;
+        INSERT INTO vamsi_patients_fts(rowid, last_name, first_name, email)
+        VALUES (new.id, new.last_name, new.first_name, {_FTS_EMAIL});
+    END
+    """,
+)
+_SQLITE_FTS_FILL = """
+    INSERT INTO vamsi_patients_fts(rowid, last_name, first_name, email)
+    SELECT id, last_name, first_name, substr(email, 1, instr(email, '@') - 1)
+    FROM vamsi_patients
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_patient_last_first", "vamsi_patients", ["last_name", "first_name"]
+    )
+    op.create_index("ix_patient_first_name", "vamsi_patients", ["first_name"])
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in _SQLITE_FTS_DDL:
+            op.execute(statement)
+        op.execute(_SQLITE_FTS_FILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS vamsi_patients_fts_{trigger}")
+        op.execute("DROP TABLE IF EXISTS vamsi_patients_fts")
+    op.drop_index("ix_patient_first_name", table_name="vamsi_patients")
+    op.drop_index("ix_patient_last_first", table_name="vamsi_patients")
@@ -0,0 +1,72 @@
+"""recurring appointment series
+
+Adds vamsi_appointment_series and a nullable vamsi_appointments.series_id
+pointing at it, indexed with start_time_utc so a series' occurrences are
+read in order from the index.
+
+Revision ID: 0005_appointment_series
+Revises: 0004_patient_search
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_appointment_series"
+down_revision: Union[str, Sequence[str], None] = "0004_patient_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "vamsi_appointment_series",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("patient_id", sa.Integer(), nullable=False),
+        sa.Column("doctor_id", sa.Integer(), nullable=False),
+        sa.Column("start_time_utc", sa.DateTime(), nullable=False),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.Column("interval_days", sa.Integer(), nullable=False),
+        sa.Column("occurrences", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("cancelled_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["doctor_id"], ["vamsi_doctors.id"], ondelete="RESTRICT"
+        ),
+        sa.ForeignKeyConstraint(
+            ["patient_id"], ["vamsi_patients.id"], ondelete="RESTRICT"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Batch mode: SQLite can only add a foreign key by rebuilding the table.
+    with op.batch_alter_table("vamsi_appointments") as batch_op:
+        batch_op.add_column(sa.Column("series_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_vamsi_appointments_series_id",
+            "vamsi_appointment_series",
+            ["series_id"],
+            ["id"],
+            ondelete="RESTRICT",
+        )
+        batch_op.create_index(
+            "ix_appointment_series_start", ["series_id", "start_time_utc"]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("vamsi_appointments") as batch_op:
+        batch_op.drop_index("ix_appointment_series_start")
+        batch_op.drop_constraint("fk_vamsi_appointments_series_id", type_="foreignkey")
+        batch_op.drop_column("series_id")
+    op.drop_table("vamsi_appointment_series")
@@ -0,0 +1,47 @@
+"""idempotency keys
+
+Adds vamsi_idempotency_keys, which holds the response of each POST sent
+with an Idempotency-Key header until it expires.
+
+Revision ID: 0006_idempotency_keys
+Revises: 0005_appointment_series
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_idempotency_keys"
+down_revision: Union[str, Sequence[str], None] = "0005_appointment_series"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "vamsi_idempotency_keys",
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("content_type", sa.String(length=100), nullable=True),
+        sa.Column(
+            "response_body",
+            sa.LargeBinary().with_variant(mysql.MEDIUMBLOB(), "mysql"),
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index("ix_idempotency_created", "vamsi_idempotency_keys", ["created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_idempotency_created", table_name="vamsi_idempotency_keys")
+    op.drop_table("vamsi_idempotency_keys")
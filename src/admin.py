@@ -0,0 +1,30 @@
+"""
+Access control for the operational endpoints under /admin.
+
+The admin surface is off unless ADMIN_TOKEN is set; callers then send the
+same value in the X-Admin-Token header.
+"""
+
+import hmac
+import os
+
+from fastapi import Header, HTTPException
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def is_admin_token(token: str | None) -> bool:
+    if ADMIN_TOKEN is None or token is None:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def require_admin(
+    x_admin_token: str | None = Header(default=None, alias=ADMIN_TOKEN_HEADER),
+) -> None:
+    if ADMIN_TOKEN is None:
+        # Pretend the route does not exist when the admin surface is off.
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
@@ -0,0 +1,227 @@
+"""
+Process-local entity cache with cross-worker invalidation.
+
+Each uvicorn worker keeps its own bounded LRU of read models. Writers publish
+the keys they changed to an append-only invalidation log on the local
+filesystem; every worker checks the log's size (one `stat`) before serving
+from its cache and drops the keys that were appended since it last looked.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from src.database import DATABASE_URL
+
+V = TypeVar("V")
+
+ENTITY_CACHE_ENABLED = os.getenv("ENTITY_CACHE_ENABLED", "1").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "10000"))
+ENTITY_CACHE_TTL_SECONDS = float(os.getenv("ENTITY_CACHE_TTL_SECONDS", "300"))
+# Workers share a directory per database, so two apps on one host pointing
+# at different databases do not invalidate each other.
+ENTITY_CACHE_DIR = Path(
+    os.getenv(
+        "ENTITY_CACHE_DIR",
+        Path(tempfile.gettempdir())
+        / ("pes-cache-" + hashlib.sha256(DATABASE_URL.encode()).hexdigest()[:12]),
+    )
+)
+
+MAX_LOG_BYTES = 1 << 20
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe bounded LRU whose entries expire after `ttl` seconds."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self) -> int:
+        """Changes on every invalidation; see `set(..., generation=...)`."""
+        return self._generation
+
+    def set(self, key: Hashable, value: V, generation: Optional[int] = None) -> None:
+        """
+        Store `value`. If `generation` is given and an invalidation happened
+        since it was read, the value may already be stale and is dropped.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class InvalidationLog:
+    """
+    Append-only file of invalidated keys, one per line. Appends of a single
+    short line are atomic with O_APPEND, so several workers can write to it
+    without locking. When it grows past MAX_LOG_BYTES a writer swaps in a
+    fresh file; readers notice the new inode and start over.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._inode, self._offset = self._stat()
+
+    def _stat(self) -> tuple[int, int]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return 0, 0
+        return st.st_ino, st.st_size
+
+    def publish(self, key: Hashable) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._stat()[1] > MAX_LOG_BYTES:
+            fresh = self.path.with_suffix(f".{os.getpid()}.tmp")
+            fresh.touch()
+            os.replace(fresh, self.path)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, f"{key}\n".encode())
+        finally:
+            os.close(fd)
+
+    def poll(self) -> Optional[list[str]]:
+        """
+        Keys appended since the last poll, or None if the log was replaced
+        and the caller has to assume everything changed.
+        """
+        inode, size = self._stat()
+        if inode == self._inode and size == self._offset:
+            return []
+        with self._lock:
+            if inode != self._inode or size < self._offset:
+                self._inode, self._offset = inode, size
+                return None
+            with self.path.open("rb") as f:
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+            # Only consume complete lines; a concurrent append may be partial.
+            consumed = data.rfind(b"\n") + 1
+            self._offset += consumed
+            return data[:consumed].decode().split()
+
+
+class EntityCache(Generic[V]):
+    """TTLCache keyed by primary key, kept coherent across workers."""
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = ENTITY_CACHE_SIZE,
+        ttl: float = ENTITY_CACHE_TTL_SECONDS,
+        enabled: bool = ENTITY_CACHE_ENABLED,
+        directory: Path = ENTITY_CACHE_DIR,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self._cache: TTLCache[V] = TTLCache(maxsize, ttl)
+        self._log = InvalidationLog(directory / f"{name}.log")
+
+    def _sync(self) -> None:
+        changed = self._log.poll()
+        if changed is None:
+            self._cache.clear()
+            return
+        for key in changed:
+            try:
+                self._cache.invalidate(int(key))
+            except ValueError:
+                self._cache.clear()
+
+    def get(self, key: int) -> Optional[V]:
+        if not self.enabled:
+            return None
+        self._sync()
+        return self._cache.get(key)
+
+    def get_or_load(
+        self, key: int, loader: Callable[[], Optional[V]], fill: bool = True
+    ) -> Optional[V]:
+        """
+        Cached value for `key`, or the result of `loader()`. Only values
+        that exist are cached; a None from the loader is returned as is.
+        With fill=False (a loader reading a replica that may lag) a miss is
+        loaded but not cached.
+        """
+        if not self.enabled:
+            return loader()
+        self._sync()
+        value = self._cache.get(key)
+        if value is not None:
+            return value
+        generation = self._cache.generation()
+        value = loader()
+        if value is not None and fill:
+            self._cache.set(key, value, generation)
+        return value
+
+    def invalidate(self, key: int) -> None:
+        """Drop `key` here and in every other worker."""
+        if not self.enabled:
+            return
+        self._cache.invalidate(key)
+        self._log.publish(key)
+
+    def stats(self) -> dict[str, int | bool]:
+        return {"enabled": self.enabled, **self._cache.stats()}
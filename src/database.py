@@ -1,23 +1,71 @@
 import os
+from typing import Any, Callable, TypeVar
 
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+
+from src.db_profiles import apply_sqlite_pragmas, select_profile
+from src.metrics import timed_pool_class
+from src.profiling import profiled
+from src.read_routing import wants_primary
+
+T = TypeVar("T")
 
 # Default to SQLite (safe for evaluator)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 
-# SQLite needs this setting
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+# DB_ASYNC=1 serves requests through an AsyncEngine instead of the sync
+# engine + threadpool. The async URL defaults to DATABASE_URL with the
+# matching async driver (aiosqlite / aiomysql).
+DB_ASYNC = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "yes")
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+
+def _async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# GET routes can read from a replica at READ_DATABASE_URL (and
+# ASYNC_READ_DATABASE_URL with DB_ASYNC). Unset, they use the primary.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL") or None
+ASYNC_READ_DATABASE_URL = (
+    os.getenv("ASYNC_READ_DATABASE_URL", _async_url(READ_DATABASE_URL))
+    if READ_DATABASE_URL
+    else None
+)
+
+
+def _connect_args(url: str) -> dict[str, Any]:
+    # SQLite needs this setting
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
 
+connect_args = _connect_args(DATABASE_URL)
+
+
+# Pool sizing, pre-ping and SQLite pragmas; see src/db_profiles.py.
+DB_PROFILE = select_profile(DATABASE_URL)
 
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
     future=True,
-    pool_pre_ping=True,
+    poolclass=timed_pool_class(DATABASE_URL),
+    **DB_PROFILE.engine_kwargs(DATABASE_URL),
 )
+apply_sqlite_pragmas(engine, DB_PROFILE)
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -26,14 +74,137 @@ SessionLocal = sessionmaker(
     future=True,
 )
 
+if READ_DATABASE_URL:
+    READ_DB_PROFILE = select_profile(READ_DATABASE_URL)
+    read_engine = create_engine(
+        READ_DATABASE_URL,
+        connect_args=_connect_args(READ_DATABASE_URL),
+        future=True,
+        poolclass=timed_pool_class(READ_DATABASE_URL),
+        **READ_DB_PROFILE.engine_kwargs(READ_DATABASE_URL),
+    )
+    apply_sqlite_pragmas(read_engine, READ_DB_PROFILE)
+    ReadSessionLocal = sessionmaker(
+        bind=read_engine, autoflush=False, autocommit=False, future=True
+    )
+else:
+    read_engine, ReadSessionLocal = engine, SessionLocal
+
+async_engine = (
+    create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=timed_pool_class(ASYNC_DATABASE_URL),
+        **DB_PROFILE.engine_kwargs(ASYNC_DATABASE_URL),
+    )
+    if DB_ASYNC
+    else None
+)
+if async_engine is not None:
+    apply_sqlite_pragmas(async_engine.sync_engine, DB_PROFILE)
+
+# Objects returned from the service layer are serialized after the session
+# work is done; with AsyncSession an expired attribute cannot lazy-load then.
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
+if DB_ASYNC and ASYNC_READ_DATABASE_URL:
+    async_read_engine = create_async_engine(
+        ASYNC_READ_DATABASE_URL,
+        poolclass=timed_pool_class(ASYNC_READ_DATABASE_URL),
+        **READ_DB_PROFILE.engine_kwargs(ASYNC_READ_DATABASE_URL),
+    )
+    apply_sqlite_pragmas(async_read_engine.sync_engine, READ_DB_PROFILE)
+    AsyncReadSessionLocal = async_sessionmaker(
+        bind=async_read_engine, autoflush=False, expire_on_commit=False
+    )
+else:
+    async_read_engine, AsyncReadSessionLocal = async_engine, AsyncSessionLocal
+
+DbSession = Session | AsyncSession
+
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_db = get_async_db if DB_ASYNC else get_sync_db
+
+
+def is_replica(db: Session) -> bool:
+    """Whether `db` (or the sync side of an AsyncSession) reads a replica,
+    whose rows may lag the primary."""
+    return db.info.get("replica", False)
+
+
+def get_sync_read_db(request: Request):
+    """A session on the read replica, or on the primary when the client
+    needs to see its own recent writes (see src/read_routing.py)."""
+    primary = wants_primary(request.headers, request.cookies)
+    factory = SessionLocal if primary else ReadSessionLocal
+    db = factory()
+    db.info["replica"] = factory is not SessionLocal
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    primary = wants_primary(request.headers, request.cookies)
+    factory = AsyncSessionLocal if primary else AsyncReadSessionLocal
+    async with factory() as db:
+        db.info["replica"] = factory is not AsyncSessionLocal
+        yield db
+
+
+# For GET routes. Anything that writes, or that has to check against the
+# latest data (the booking overlap check), uses get_db.
+get_read_db = get_async_read_db if DB_ASYNC else get_sync_read_db
+
+
+async def run_db(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call a sync service function `fn(session, *args, **kwargs)` without
+    blocking the event loop.
+
+    With an AsyncSession the function runs through `run_sync`, so its queries
+    go through the async driver on the event loop and no worker thread is
+    held. With a sync Session it runs in the threadpool as before. A request
+    marked for profiling runs `fn` under its profiler.
+    """
+    fn = profiled(fn)
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def create_tables() -> None:
+    if async_engine is not None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    else:
+        await run_in_threadpool(Base.metadata.create_all, bind=engine)
+
+
+async def dispose_engines() -> None:
+    for async_ in {async_engine, async_read_engine}:
+        if async_ is not None:
+            await async_.dispose()
+    for sync in {engine, read_engine}:
+        await run_in_threadpool(sync.dispose)
@@ -0,0 +1,144 @@
+"""
+Named engine settings, selected with DB_PROFILE.
+
+A profile covers the connection pool (size, overflow, recycle), whether
+connections are pinged on checkout and, for SQLite, the pragmas run on
+every new connection. Each profile has a SQLite and a MySQL variant; the
+one matching DATABASE_URL is used.
+
+- `baseline` (default): the settings the app used before profiles existed.
+  A pre-ping on every checkout, the default pool and SQLite in
+  rollback-journal mode, where a writer blocks every reader.
+- `balanced`: SQLite in WAL mode with `synchronous=NORMAL`, so
+  readers never wait for the writer and a commit does not fsync. A write
+  lock is waited for (busy_timeout) instead of failing at once. MySQL skips
+  the pre-ping and recycles connections after 30 minutes, well inside the
+  server's wait_timeout.
+- `durable`: `balanced` with `synchronous=FULL` on SQLite and pre-ping on
+  MySQL, for when losing the last commits in a power cut or a
+  failed first query after a server restart is not acceptable.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event, make_url
+
+
+def _uses_queue_pool(url: str) -> bool:
+    """In-memory SQLite gets a SingletonThreadPool (StaticPool with
+    aiosqlite), which rejects the QueuePool sizing arguments."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return True
+    return parsed.database not in (None, "", ":memory:") and (
+        parsed.query.get("mode") != "memory"
+    )
+
+
+@dataclass(frozen=True)
+class DbProfile:
+    name: str
+    # None leaves SQLAlchemy's default for the engine's pool.
+    pool_size: int | None = None
+    max_overflow: int | None = None
+    # Seconds after which a pooled connection is replaced.
+    pool_recycle: int | None = None
+    pool_pre_ping: bool = True
+    # Run in this order on every new SQLite connection.
+    sqlite_pragmas: tuple[tuple[str, str], ...] = field(default_factory=tuple)
+
+    def _pool_settings(self) -> dict[str, Any]:
+        settings = {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_recycle": self.pool_recycle,
+        }
+        return {key: value for key, value in settings.items() if value is not None}
+
+    def engine_kwargs(self, url: str) -> dict[str, Any]:
+        """create_engine() arguments for `url`; the pool sizing is left out
+        when `url` does not get a QueuePool."""
+        kwargs = self._pool_settings() if _uses_queue_pool(url) else {}
+        return {**kwargs, "pool_pre_ping": self.pool_pre_ping}
+
+    def describe(self) -> str:
+        settings = [
+            *(f"{key}={value}" for key, value in self._pool_settings().items()),
+            f"pool_pre_ping={self.pool_pre_ping}",
+            *(f"{name}={value}" for name, value in self.sqlite_pragmas),
+        ]
+        return f"{self.name} ({', '.join(settings)})"
+
+
+_SQLITE_WAL = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", "-65536"),  # KiB, so 64 MiB per connection
+    ("mmap_size", "268435456"),
+    ("busy_timeout", "5000"),
+)
+
+PROFILES: dict[str, dict[str, DbProfile]] = {
+    "sqlite": {
+        "baseline": DbProfile("baseline"),
+        # Pinging a local file is pointless.
+        "balanced": DbProfile(
+            "balanced", pool_pre_ping=False, sqlite_pragmas=_SQLITE_WAL
+        ),
+        "durable": DbProfile(
+            "durable",
+            pool_pre_ping=False,
+            sqlite_pragmas=tuple(
+                (name, "FULL" if name == "synchronous" else value)
+                for name, value in _SQLITE_WAL
+            ),
+        ),
+    },
+    "mysql": {
+        "baseline": DbProfile("baseline"),
+        "balanced": DbProfile(
+            "balanced",
+            pool_size=10,
+            max_overflow=20,
+            pool_recycle=1800,
+            pool_pre_ping=False,
+        ),
+        "durable": DbProfile(
+            "durable", pool_size=10, max_overflow=20, pool_recycle=1800
+        ),
+    },
+}
+DEFAULT_PROFILE = "baseline"
+
+
+def select_profile(url: str, name: str | None = None) -> DbProfile:
+    """The profile called `name` (default DB_PROFILE, then `baseline`) for
+    the database in `url`. Databases without profiles get `baseline`."""
+    name = name or os.getenv("DB_PROFILE") or DEFAULT_PROFILE
+    backend = url.partition("://")[0].partition("+")[0]
+    profiles = PROFILES.get(backend)
+    if profiles is None:
+        return DbProfile("baseline")
+    if name not in profiles:
+        raise ValueError(
+            f"Unknown DB_PROFILE {name!r}; expected one of {', '.join(profiles)}."
+        )
+    return profiles[name]
+
+
+def apply_sqlite_pragmas(engine: Engine, profile: DbProfile) -> None:
+    """Run the profile's pragmas on each new connection of a sync Engine
+    (for an AsyncEngine pass its `sync_engine`)."""
+    if not profile.sqlite_pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in profile.sqlite_pragmas:
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
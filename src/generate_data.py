@@ -0,0 +1,240 @@
+"""
+Fill the database with synthetic patients, doctors and appointments.
+
+    python -m src.generate_data --patients 1000000 --doctors 2000 \\
+        --history-days 365 --future-days 60 --seed 42
+
+Rows go in through Core bulk inserts in batches of `--batch-size`, one
+transaction per batch, and are produced lazily, so memory stays flat no
+matter how many rows are written. The same `--seed` and `--today` against
+the same starting tables give the same data.
+
+Every doctor gets a fixed weekly schedule (working days, shift start and
+length, how busy they are). Each working day is filled front to back with
+15-60 minute appointments and occasional gaps, so a doctor's appointments
+never overlap. History covers `--history-days` before today, and future
+bookings thin out towards `--future-days`. `--appointments` stops early
+once that many rows are written.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dt_time
+from itertools import islice
+from typing import Iterable, Iterator
+
+from sqlalchemy import Connection, func, insert, select
+
+from src.database import engine
+from src.models import appointment, doctor, patient  # noqa: F401
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.versions import list_versions
+
+BATCH_SIZE = 10_000
+FIRST_NAMES = (
+    "Aarav", "Ana", "Chen", "David", "Elena", "Fatima", "Grace", "Hiro",
+    "Ines", "James", "Kavya", "Liam", "Maria", "Noah", "Olga", "Priya",
+    "Rahul", "Sara", "Tomas", "Yusuf", "Zoe",
+)  # fmt: skip
+LAST_NAMES = (
+    "Anderson", "Bose", "Costa", "Dubois", "Eriksen", "Garcia", "Ivanova",
+    "Khan", "Lee", "Muller", "Nair", "Okafor", "Patel", "Rossi", "Silva",
+    "Tanaka", "Wang", "Williams",
+)  # fmt: skip
+SPECIALIZATIONS = (
+    "Cardiology", "Dermatology", "ENT", "General Practice", "Neurology",
+    "Orthopedics", "Pediatrics", "Psychiatry",
+)  # fmt: skip
+# Appointment lengths in minutes, each repeated by its weight (in percent)
+# so a draw is one index instead of a random.choices() call per row.
+DURATIONS = (15,) * 20 + (20,) * 15 + (30,) * 40 + (45,) * 15 + (60,) * 10
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _next_id(conn: Connection, model: type[Patient] | type[Doctor]) -> int:
+    return (conn.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def patient_rows(rng: random.Random, first_id: int, count: int) -> Iterator[dict]:
+    for pid in range(first_id, first_id + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "id": pid,
+            "first_name": first,
+            "last_name": last,
+            "email": f"{first}.{last}.{pid}@example.com".lower(),
+            "phone": f"{rng.randrange(10**9, 10**10)}",
+        }
+
+
+def doctor_rows(rng: random.Random, first_id: int, count: int) -> Iterator[dict]:
+    for did in range(first_id, first_id + count):
+        yield {
+            "id": did,
+            "full_name": f"Dr {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "specialization": rng.choice(SPECIALIZATIONS),
+            "is_active": rng.random() < 0.95,
+        }
+
+
+def _schedule(rng: random.Random) -> tuple[frozenset[int], int, int, float]:
+    """Working weekdays, shift start (minutes after midnight), shift length
+    in minutes and the share of the shift that gets booked."""
+    days = {0, 1, 2, 3, 4} if rng.random() < 0.8 else {0, 1, 2, 3, 4, 5}
+    if rng.random() < 0.2:
+        days.discard(rng.choice(sorted(days)))  # part-time
+    start = rng.choice((7, 8, 8, 9, 9, 9, 10)) * 60
+    length = rng.choice((6, 7, 8, 8, 9)) * 60
+    return frozenset(days), start, length, rng.uniform(0.6, 0.95)
+
+
+def appointment_rows(
+    rng: random.Random,
+    doctor_ids: range,
+    patient_ids: range,
+    first_day: datetime,
+    days: int,
+    today: datetime,
+    future_days: int,
+) -> Iterator[dict]:
+    """Day by day, doctor by doctor, as the clinic would have booked them."""
+    schedules = {did: _schedule(rng) for did in doctor_ids}
+    draw = rng.random
+    first_patient, patient_count = patient_ids.start, len(patient_ids)
+    for day_index in range(days):
+        day = first_day + timedelta(days=day_index)
+        weekday = day.weekday()
+        ahead = (day - today).days
+        # Future days are only partly booked, the further out the emptier.
+        booked_share = 1.0 if ahead < 0 else max(0.1, 1 - ahead / (future_days + 1))
+        for did in doctor_ids:
+            workdays, shift_start, shift_length, busy = schedules[did]
+            if weekday not in workdays:
+                continue
+            fill = busy * booked_share
+            minute, shift_end = shift_start, shift_start + shift_length
+            while True:
+                duration = DURATIONS[int(draw() * len(DURATIONS))]
+                if minute + duration > shift_end:
+                    break
+                if draw() < fill:
+                    start = day + timedelta(minutes=minute)
+                    yield {
+                        "patient_id": first_patient + int(draw() * patient_count),
+                        "doctor_id": did,
+                        "start_time_utc": start,
+                        "duration_minutes": duration,
+                        "end_time_utc": start + timedelta(minutes=duration),
+                    }
+                    minute += duration
+                else:
+                    minute += 15  # free slot
+
+
+def _insert(
+    conn: Connection, table, rows: Iterable[dict], batch_size: int, label: str
+) -> int:
+    written = 0
+    for batch in _batches(rows, batch_size):
+        conn.execute(insert(table), batch)
+        conn.commit()
+        written += len(batch)
+        print(f"{label}: {written}", end="\r", file=sys.stderr)
+    print(file=sys.stderr)
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic data.")
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--history-days", type=int, default=365)
+    parser.add_argument("--future-days", type=int, default=60)
+    parser.add_argument("--appointments", type=int, help="stop after this many")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--today",
+        type=date.fromisoformat,
+        help="YYYY-MM-DD the schedules are centred on (default: today, UTC)",
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    if args.patients < 1 or args.doctors < 1:
+        parser.error("--patients and --doctors must be at least 1")
+
+    rng = random.Random(args.seed)  # nosec B311 - synthetic data, not security
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            # Bulk-load settings for this connection only: no fsync per batch and
+            # a larger page cache for the appointment indexes.
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            conn.exec_driver_sql("PRAGMA cache_size = -65536")
+        first_patient = _next_id(conn, Patient)
+        first_doctor = _next_id(conn, Doctor)
+        conn.commit()
+        patient_ids = range(first_patient, first_patient + args.patients)
+        doctor_ids = range(first_doctor, first_doctor + args.doctors)
+
+        today = datetime.combine(
+            args.today or datetime.now(timezone.utc).date(), dt_time(), timezone.utc
+        )
+        rows = appointment_rows(
+            rng,
+            doctor_ids,
+            patient_ids,
+            today - timedelta(days=args.history_days),
+            args.history_days + args.future_days,
+            today,
+            args.future_days,
+        )
+        if args.appointments is not None:
+            rows = islice(rows, args.appointments)
+
+        counts = {
+            "patients": _insert(
+                conn,
+                Patient,
+                patient_rows(rng, first_patient, args.patients),
+                args.batch_size,
+                "patients",
+            ),
+            "doctors": _insert(
+                conn,
+                Doctor,
+                doctor_rows(rng, first_doctor, args.doctors),
+                args.batch_size,
+                "doctors",
+            ),
+            "appointments": _insert(
+                conn, Appointment, rows, args.batch_size, "appointments"
+            ),
+        }
+    # The rows bypass the services, so no list version was bumped for them.
+    list_versions.reset()
+    elapsed = time.perf_counter() - started
+    print(
+        json.dumps(
+            {
+                **counts,
+                "seed": args.seed,
+                "elapsed_s": round(elapsed, 1),
+                "rows_per_s": round(sum(counts.values()) / elapsed),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Idempotency-Key handling for the create routes.
+
+A client that retries a POST after a timeout sends the same
+`Idempotency-Key` header both times. The first request runs normally and
+its response (status, content type, body) is stored under the key for
+IDEMPOTENCY_TTL_SECONDS. A retry gets that response back, marked with
+`Idempotent-Replayed: true`, without reaching the route or the service
+layer. A retried booking therefore returns its original 201 instead of a
+409 against itself.
+
+Responses live in vamsi_idempotency_keys, shared by all workers, and in a
+per-worker TTLCache in front of it. The first request claims its key by
+inserting a row with no status:
+
+- A duplicate arriving in the same worker while that row is open waits
+  for the first request to finish.
+- A duplicate in another worker polls the row.
+- Either gives up with a 409 after IDEMPOTENCY_WAIT_SECONDS.
+- A claim still open after IDEMPOTENCY_LEASE_SECONDS is treated as
+  abandoned (its worker was killed or restarted) and the next request with
+  the key takes it over. The lease must outlast the slowest request.
+
+Server errors (5xx) are not stored, so they can be retried. Reusing a
+key for a different request is a 422.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Collection, NamedTuple
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src import database
+from src.cache import TTLCache
+from src.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+# Larger responses (big bulk batches) are only kept in the database.
+IDEMPOTENCY_MAX_CACHED_BYTES = int(os.getenv("IDEMPOTENCY_MAX_CACHED_BYTES", "65536"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+POLL_INTERVAL_SECONDS = 0.05
+PURGE_INTERVAL_SECONDS = 60.0
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    # None while the first request is still running.
+    status_code: int | None
+    content_type: str | None
+    body: bytes
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _expired_before() -> datetime:
+    return _now() - timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)
+
+
+def _dead():
+    """Rows a new request may replace: expired, or claims whose lease ran out."""
+    return or_(
+        IdempotencyKey.created_at < _expired_before(),
+        and_(
+            IdempotencyKey.status_code.is_(None),
+            IdempotencyKey.created_at
+            < _now() - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS),
+        ),
+    )
+
+
+def _stored(row: IdempotencyKey) -> StoredResponse:
+    return StoredResponse(
+        row.request_hash, row.status_code, row.content_type, row.response_body or b""
+    )
+
+
+# ----------------------------
+# Store (sync, run through run_db)
+# ----------------------------
+
+
+def claim_key(db: Session, key: str, request_hash: str) -> StoredResponse | None:
+    """Claim `key` for a new request (None), or the row already holding it."""
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, _dead()))
+    db.add(IdempotencyKey(key=key, request_hash=request_hash, created_at=_now()))
+    try:
+        db.commit()
+        return None
+    except IntegrityError:
+        db.rollback()
+    row = db.scalars(select(IdempotencyKey).where(IdempotencyKey.key == key)).first()
+    # Gone again (expired and purged in between): claim on the next poll.
+    return _stored(row) if row else StoredResponse(request_hash, None, None, b"")
+
+
+def read_key(db: Session, key: str) -> StoredResponse | None:
+    """The live row holding `key`, or None if it can be claimed. A plain
+    read, so polling does not take SQLite's write lock."""
+    row = db.scalars(
+        select(IdempotencyKey).where(IdempotencyKey.key == key, ~_dead())
+    ).first()
+    return _stored(row) if row else None
+
+
+def complete_key(db: Session, key: str, response: StoredResponse) -> None:
+    # A claim taken over after its lease ran out may already be completed.
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+        .values(
+            status_code=response.status_code,
+            content_type=response.content_type,
+            response_body=response.body,
+        )
+    )
+    db.commit()
+
+
+def release_key(db: Session, key: str) -> None:
+    """Drop an unfinished claim so the request can be retried."""
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)
+        )
+    )
+    db.commit()
+
+
+def purge_expired_keys(db: Session) -> int:
+    result = db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.created_at < _expired_before())
+    )
+    db.commit()
+    return result.rowcount
+
+
+async def _run_store(fn, *args):
+    if database.AsyncSessionLocal is not None:
+        async with database.AsyncSessionLocal() as db:
+            return await database.run_db(db, fn, *args)
+    db = database.SessionLocal()
+    try:
+        return await database.run_db(db, fn, *args)
+    finally:
+        db.close()
+
+
+# ----------------------------
+# Middleware
+# ----------------------------
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _request_hash(scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (
+        scope["method"].encode(),
+        scope["path"].encode(),
+        scope["query_string"],
+    ):
+        digest.update(part)
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """Replay stored responses for POSTs to `paths` that carry an
+    Idempotency-Key header; other requests pass straight through."""
+
+    def __init__(self, app, paths: Collection[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.cache: TTLCache[StoredResponse] = TTLCache(
+            IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL_SECONDS
+        )
+        # Keys this worker is running or claiming, set when they finish.
+        self._inflight: dict[str, asyncio.Event] = {}
+        self._last_purge = time.monotonic()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        header = IDEMPOTENCY_KEY_HEADER.lower().encode()
+        key = next((v for k, v in scope["headers"] if k == header), None)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        key = key.decode("latin-1")
+        if not 0 < len(key) <= MAX_KEY_LENGTH:
+            await self._error(
+                scope,
+                receive,
+                send,
+                400,
+                f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters.",
+            )
+            return
+
+        body = await _read_body(receive)
+        request_hash = _request_hash(scope, body)
+        stored = await self._stored_or_claim(key, request_hash)
+        if stored is None:
+            await self._run(scope, body, receive, send, key, request_hash)
+        elif stored.status_code is None:
+            await self._error(
+                scope,
+                receive,
+                send,
+                409,
+                f"A request with this {IDEMPOTENCY_KEY_HEADER} is still in progress.",
+            )
+        elif stored.request_hash != request_hash:
+            await self._error(
+                scope,
+                receive,
+                send,
+                422,
+                f"This {IDEMPOTENCY_KEY_HEADER} was already used for a different "
+                "request.",
+            )
+        else:
+            await self._replay(stored, send)
+
+    async def _stored_or_claim(
+        self, key: str, request_hash: str
+    ) -> StoredResponse | None:
+        """
+        The finished response stored for `key`, None once this request holds
+        the claim, or an in-progress StoredResponse after waiting too long.
+        """
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            stored = self.cache.get(key)
+            if stored is not None:
+                return stored
+            event = self._inflight.get(key)
+            if event is not None:
+                try:
+                    await asyncio.wait_for(
+                        event.wait(), max(0.0, deadline - time.monotonic())
+                    )
+                except asyncio.TimeoutError:
+                    return StoredResponse(request_hash, None, None, b"")
+                continue
+
+            event = self._inflight[key] = asyncio.Event()
+            try:
+                stored = await _run_store(claim_key, key, request_hash)
+            except BaseException:
+                del self._inflight[key]
+                event.set()
+                raise
+            if stored is None:
+                return None  # claimed; _run sets the event when done
+            del self._inflight[key]
+            event.set()
+            # Claimed by a request in another worker: read the row until it
+            # finishes, or is released or abandoned and can be claimed.
+            while stored is not None and stored.status_code is None:
+                if time.monotonic() >= deadline:
+                    return stored
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+                stored = await _run_store(read_key, key)
+            if stored is not None:
+                if len(stored.body) <= IDEMPOTENCY_MAX_CACHED_BYTES:
+                    self.cache.set(key, stored)
+                return stored
+
+    async def _run(self, scope, body, receive, send, key, request_hash) -> None:
+        status_code: int | None = None
+        content_type: str | None = None
+        chunks: list[bytes] = []
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def send_and_capture(message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            try:
+                await self.app(scope, receive_body, send_and_capture)
+            except BaseException:
+                await _run_store(release_key, key)
+                raise
+            if status_code is None or status_code >= 500:
+                await _run_store(release_key, key)
+                return
+            stored = StoredResponse(
+                request_hash, status_code, content_type, b"".join(chunks)
+            )
+            await _run_store(complete_key, key, stored)
+            if len(stored.body) <= IDEMPOTENCY_MAX_CACHED_BYTES:
+                self.cache.set(key, stored)
+        finally:
+            self._inflight.pop(key).set()
+        if time.monotonic() - self._last_purge > PURGE_INTERVAL_SECONDS:
+            self._last_purge = time.monotonic()
+            await _run_store(purge_expired_keys)
+
+    @staticmethod
+    async def _replay(stored: StoredResponse, send) -> None:
+        headers = [
+            (b"content-length", str(len(stored.body)).encode()),
+            (REPLAYED_HEADER.lower().encode(), b"true"),
+        ]
+        if stored.content_type:
+            headers.append((b"content-type", stored.content_type.encode("latin-1")))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": stored.status_code,
+                "headers": headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": stored.body})
+
+    @staticmethod
+    async def _error(scope, receive, send, status_code: int, detail: str) -> None:
+        await JSONResponse({"detail": detail}, status_code=status_code)(
+            scope, receive, send
+        )
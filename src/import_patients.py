@@ -0,0 +1,39 @@
+"""
+Import patients from a CSV or NDJSON file.
+
+    python -m src.import_patients patients.csv
+    python -m src.import_patients patients.ndjson --chunk-size 5000
+"""
+
+import argparse
+from pathlib import Path
+
+from src.database import SessionLocal
+from src.models import appointment, doctor, patient  # noqa: F401
+from src.services.patient_import_service import (
+    IMPORT_CHUNK_SIZE,
+    import_patients,
+    iter_records,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import patients.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="defaults to the file extension (.csv, otherwise NDJSON)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "ndjson")
+
+    with args.path.open(newline="", encoding="utf-8-sig") as f, SessionLocal() as db:
+        report = import_patients(db, iter_records(f, fmt), args.chunk_size)
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
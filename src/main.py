@@ -1,30 +1,184 @@
+import logging
 from contextlib import asynccontextmanager
-from datetime import date
+from datetime import date, datetime, time
+from typing import Iterator, Literal
 
-from fastapi import Depends, FastAPI, Query
-from sqlalchemy.orm import Session
+from anyio import from_thread
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import models  # noqa: F401
-from src.database import Base, engine, get_db
-from src.schemas.appointment_pydantic import AppointmentCreate, AppointmentRead
+from src.admin import require_admin
+from src.database import (
+    DB_PROFILE,
+    READ_DATABASE_URL,
+    DbSession,
+    async_engine,
+    async_read_engine,
+    create_tables,
+    dispose_engines,
+    engine,
+    get_db,
+    get_read_db,
+    read_engine,
+    run_db,
+)
+from src.idempotency import IdempotencyMiddleware
+from src.metrics import CONTENT_TYPE, MetricsMiddleware, instrument_engine, registry
+from src.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from src.profiling import ProfilingMiddleware, profile_path, record_sql
+from src.read_routing import (
+    READ_YOUR_WRITES_SECONDS,
+    ReadYourWritesMiddleware,
+    wants_primary,
+)
+from src.schemas.admin_pydantic import (
+    EntityCacheStatsRead,
+    ScheduleIndexStatsRead,
+    SlowQueryRead,
+)
+from src.schemas.appointment_pydantic import (
+    AppointmentBulkCreate,
+    AppointmentBulkResult,
+    AppointmentCreate,
+    AppointmentExpandedRead,
+    AppointmentRead,
+    AppointmentSeriesCreate,
+    AppointmentSeriesRead,
+)
+from src.schemas.availability_pydantic import AvailabilityRead, EarliestSlotsRead
 from src.schemas.doctor_pydantic import DoctorCreate, DoctorRead
-from src.schemas.patient_pydantic import PatientCreate, PatientRead
+from src.schemas.patient_pydantic import (
+    PatientCreate,
+    PatientImportReport,
+    PatientRead,
+)
+from src.serialization import RowsJSONResponse
+from src.services.appointment_export_service import (
+    MEDIA_TYPES,
+    export_appointments,
+    export_appointments_async,
+)
+from src.services.appointment_series_service import (
+    cancel_appointment_series,
+    create_appointment_series,
+    get_appointment_series,
+)
 from src.services.appointment_service import (
+    appointment_day_fingerprint,
     create_appointment,
+    create_appointments_bulk,
     get_appointment,
+    list_appointment_rows_by_date,
     list_appointments_by_date,
+    parse_expand,
+    schedule_index,
+)
+from src.services.availability_service import find_earliest_slots, get_availability
+from src.services.doctor_service import (
+    create_doctor,
+    doctor_cache,
+    doctor_list_fingerprint,
+    get_doctor,
+    list_doctor_rows,
+)
+from src.services.patient_import_service import (
+    import_chunk,
+    iter_chunks,
+    iter_records,
+    iter_text_lines,
+)
+from src.services.patient_service import (
+    DEFAULT_SEARCH_LIMIT,
+    MAX_SEARCH_LIMIT,
+    create_patient,
+    get_patient,
+    list_patient_rows,
+    patient_cache,
+    search_patient_rows,
 )
-from src.services.doctor_service import create_doctor, get_doctor, list_doctors
-from src.services.patient_service import create_patient, get_patient, list_patients
+from src.slow_queries import record_slow_queries, slow_query_log
+from src.versions import (
+    DOCTORS_SCOPE,
+    appointment_day_scope,
+    if_none_match,
+    list_versions,
+)
+
+# Startup messages go to uvicorn's log, which is configured when serving.
+logger = logging.getLogger("uvicorn.error")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
+    logger.info(
+        "Database %s (%s), profile %s",
+        engine.dialect.name,
+        "async" if async_engine is not None else "sync",
+        DB_PROFILE.describe(),
+    )
+    if READ_DATABASE_URL:
+        logger.info("Reads go to the replica at %s", read_engine.url)
+    await create_tables()
     yield
+    # Closing every connection lets SQLite checkpoint and remove its WAL.
+    await dispose_engines()
 
 
 app = FastAPI(title="Patient encounter system", lifespan=lifespan)
+# Retried creates with the same Idempotency-Key get the first response back.
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=(
+        "/patients",
+        "/doctors",
+        "/appointments",
+        "/appointments/bulk",
+        "/appointments/series",
+    ),
+)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+if READ_DATABASE_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+_engines = {engine, read_engine}
+_engines.update(e.sync_engine for e in (async_engine, async_read_engine) if e)
+for _engine in _engines:
+    instrument_engine(_engine)
+    record_sql(_engine)
+    record_slow_queries(_engine)
+
+
+def _next_cursor_headers(next_cursor: str | None) -> dict[str, str] | None:
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor is not None else None
+
+
+async def _list_etag(
+    request: Request, db: DbSession, scope: str, fingerprint_fn, *args
+) -> str | None:
+    """
+    ETag of a list read, None if there is none to send. The fingerprint is
+    read in the same session as the list. A replica read waits until the
+    last bump of `scope` is READ_YOUR_WRITES_SECONDS old, so a lagging
+    replica's older rows are never tagged with the new version.
+    """
+    if not list_versions.enabled:
+        return None
+    on_primary = READ_DATABASE_URL is None or wants_primary(
+        request.headers, request.cookies
+    )
+    settle = 0.0 if on_primary else READ_YOUR_WRITES_SECONDS
+    fingerprint = await run_db(db, fingerprint_fn, *args)
+    return list_versions.etag(scope, fingerprint, settle)
+
+
+def _not_modified(request: Request, etag: str | None) -> Response | None:
+    if etag is not None and if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
 
 
 @app.get("/")
@@ -37,50 +191,307 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get(
+    "/admin/profiles/{profile_id}",
+    include_in_schema=False,
+    dependencies=[Depends(require_admin)],
+)
+def admin_get_profile(
+    profile_id: str, fmt: Literal["text", "pstats"] = Query("text", alias="format")
+):
+    path = profile_path(profile_id, ".txt" if fmt == "text" else ".pstats")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    if fmt == "text":
+        return PlainTextResponse(path.read_text(encoding="utf-8"))
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+@app.get(
+    "/admin/slow-queries",
+    response_model=list[SlowQueryRead],
+    include_in_schema=False,
+    dependencies=[Depends(require_admin)],
+)
+def admin_list_slow_queries(limit: int | None = Query(default=None, ge=1)):
+    return slow_query_log.entries(limit)
+
+
+@app.delete(
+    "/admin/slow-queries",
+    status_code=204,
+    include_in_schema=False,
+    dependencies=[Depends(require_admin)],
+)
+def admin_clear_slow_queries():
+    slow_query_log.clear()
+
+
+@app.get(
+    "/admin/entity-caches",
+    response_model=dict[str, EntityCacheStatsRead],
+    include_in_schema=False,
+    dependencies=[Depends(require_admin)],
+)
+def admin_entity_cache_stats():
+    return {cache.name: cache.stats() for cache in (patient_cache, doctor_cache)}
+
+
+@app.get(
+    "/admin/schedule-index",
+    response_model=ScheduleIndexStatsRead,
+    include_in_schema=False,
+    dependencies=[Depends(require_admin)],
+)
+def admin_schedule_index_stats():
+    return schedule_index.stats()
+
+
 @app.post("/patients", response_model=PatientRead, status_code=201)
-def api_create_patient(payload: PatientCreate, db: Session = Depends(get_db)):
-    return create_patient(db, payload)
+async def api_create_patient(payload: PatientCreate, db: DbSession = Depends(get_db)):
+    return await run_db(db, create_patient, payload)
+
+
+@app.post("/patients/import", response_model=PatientImportReport)
+async def api_import_patients(
+    request: Request,
+    fmt: Literal["csv", "ndjson"] = Query(default="ndjson", alias="format"),
+    db: DbSession = Depends(get_db),
+):
+    """
+    Import patients from a CSV (with header row) or NDJSON request body.
+    The body is consumed as it arrives: records are parsed in a worker
+    thread that pulls body chunks on demand, and each chunk of records is
+    written through the session before the next one is read.
+    """
+    body = request.stream()
+
+    async def next_chunk() -> bytes | None:
+        try:
+            return await body.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def chunks() -> Iterator[bytes]:
+        while (chunk := from_thread.run(next_chunk)) is not None:
+            yield chunk
+
+    record_chunks = iter_chunks(iter_records(iter_text_lines(chunks()), fmt))
+    report = PatientImportReport()
+    while chunk := await run_in_threadpool(next, record_chunks, None):
+        await run_db(db, import_chunk, chunk, report)
+    return report
 
 
 @app.get("/patients", response_model=list[PatientRead])
-def api_list_patients(db: Session = Depends(get_db)):
-    return list_patients(db)
+async def api_list_patients(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(default=None),
+    db: DbSession = Depends(get_read_db),
+):
+    rows, next_cursor = await run_db(db, list_patient_rows, limit, after)
+    return RowsJSONResponse(rows, PatientRead, _next_cursor_headers(next_cursor))
+
+
+@app.get("/patients/search", response_model=list[PatientRead])
+async def api_search_patients(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: DbSession = Depends(get_read_db),
+):
+    """
+    Prefix search on last name, first name and email: every word of `q`
+    must start one of them. Best matches first, at most `limit` of them.
+    """
+    rows = await run_db(db, search_patient_rows, q, limit)
+    return RowsJSONResponse(rows, PatientRead)
 
 
+# Served from the entity cache and read from the primary on a miss. Lookups
+# on a replica session (availability) may use the cache but never fill it,
+# so it never holds a lagging replica's copy of a row for a whole TTL.
 @app.get("/patients/{patient_id}", response_model=PatientRead)
-def api_get_patient(patient_id: int, db: Session = Depends(get_db)):
-    return get_patient(db, patient_id)
+async def api_get_patient(patient_id: int, db: DbSession = Depends(get_db)):
+    return await run_db(db, get_patient, patient_id)
 
 
 @app.post("/doctors", response_model=DoctorRead, status_code=201)
-def api_create_doctor(payload: DoctorCreate, db: Session = Depends(get_db)):
-    return create_doctor(db, payload)
+async def api_create_doctor(payload: DoctorCreate, db: DbSession = Depends(get_db)):
+    return await run_db(db, create_doctor, payload)
 
 
 @app.get("/doctors", response_model=list[DoctorRead])
-def api_list_doctors(db: Session = Depends(get_db)):
-    return list_doctors(db)
+async def api_list_doctors(
+    request: Request,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(default=None),
+    specialization: str | None = Query(default=None, min_length=1, max_length=100),
+    db: DbSession = Depends(get_read_db),
+):
+    etag = await _list_etag(request, db, DOCTORS_SCOPE, doctor_list_fingerprint)
+    if (not_modified := _not_modified(request, etag)) is not None:
+        return not_modified
+    rows, next_cursor = await run_db(db, list_doctor_rows, limit, after, specialization)
+    headers = _next_cursor_headers(next_cursor) or {}
+    if etag is not None:
+        headers["ETag"] = etag
+    return RowsJSONResponse(rows, DoctorRead, headers)
+
 
+@app.get("/doctors/earliest-slots", response_model=EarliestSlotsRead)
+async def api_find_earliest_slots(
+    specialization: str = Query(min_length=1, max_length=100),
+    not_before: datetime = Query(alias="from"),
+    slot_minutes: int = 30,
+    limit: int = 5,
+    work_start: time = time(9, 0),
+    work_end: time = time(17, 0),
+    db: DbSession = Depends(get_read_db),
+):
+    return await run_db(
+        db,
+        find_earliest_slots,
+        specialization,
+        not_before,
+        slot_minutes,
+        limit,
+        work_start,
+        work_end,
+    )
 
+
+# Entity cache, primary on a miss; see api_get_patient.
 @app.get("/doctors/{doctor_id}", response_model=DoctorRead)
-def api_get_doctor(doctor_id: int, db: Session = Depends(get_db)):
-    return get_doctor(db, doctor_id)
+async def api_get_doctor(doctor_id: int, db: DbSession = Depends(get_db)):
+    return await run_db(db, get_doctor, doctor_id)
+
+
+@app.get("/doctors/{doctor_id}/availability", response_model=AvailabilityRead)
+async def api_get_doctor_availability(
+    doctor_id: int,
+    start_date: date = Query(alias="from"),
+    end_date: date = Query(alias="to"),
+    slot_minutes: int = 30,
+    work_start: time = time(9, 0),
+    work_end: time = time(17, 0),
+    db: DbSession = Depends(get_read_db),
+):
+    return await run_db(
+        db,
+        get_availability,
+        doctor_id,
+        start_date,
+        end_date,
+        slot_minutes,
+        work_start,
+        work_end,
+    )
 
 
 @app.post("/appointments", status_code=201, response_model=AppointmentRead)
-def api_create_appointment(payload: AppointmentCreate, db: Session = Depends(get_db)):
-    return create_appointment(db, payload)
+async def api_create_appointment(
+    payload: AppointmentCreate, db: DbSession = Depends(get_db)
+):
+    return await run_db(db, create_appointment, payload)
 
 
-@app.get("/appointments", response_model=list[AppointmentRead])
-def api_list_appointments(
+@app.post("/appointments/bulk", response_model=AppointmentBulkResult)
+async def api_create_appointments_bulk(
+    payload: AppointmentBulkCreate, db: DbSession = Depends(get_db)
+):
+    return await run_db(db, create_appointments_bulk, payload.items)
+
+
+@app.post("/appointments/series", status_code=201, response_model=AppointmentSeriesRead)
+async def api_create_appointment_series(
+    payload: AppointmentSeriesCreate, db: DbSession = Depends(get_db)
+):
+    return await run_db(db, create_appointment_series, payload)
+
+
+@app.get("/appointments/series/{series_id}", response_model=AppointmentSeriesRead)
+async def api_get_appointment_series(
+    series_id: int, db: DbSession = Depends(get_read_db)
+):
+    return await run_db(db, get_appointment_series, series_id)
+
+
+@app.delete("/appointments/series/{series_id}", response_model=AppointmentSeriesRead)
+async def api_cancel_appointment_series(
+    series_id: int, db: DbSession = Depends(get_db)
+):
+    return await run_db(db, cancel_appointment_series, series_id)
+
+
+@app.get(
+    "/appointments",
+    response_model=list[AppointmentExpandedRead],
+    response_model_exclude_unset=True,
+)
+async def api_list_appointments(
+    request: Request,
+    response: Response,
     date: date,
     doctor_id: int | None = Query(default=None, gt=0),
-    db: Session = Depends(get_db),
+    expand: str | None = Query(default=None, description="patient,doctor"),
+    db: DbSession = Depends(get_read_db),
 ):
-    return list_appointments_by_date(db, date, doctor_id)
+    expand_set = parse_expand(expand)
+    # Expanded patients and doctors never change, so the day's version
+    # covers the expanded listing too.
+    etag = await _list_etag(
+        request,
+        db,
+        appointment_day_scope(date, doctor_id),
+        appointment_day_fingerprint,
+        date,
+        doctor_id,
+    )
+    if (not_modified := _not_modified(request, etag)) is not None:
+        return not_modified
+    headers = {"ETag": etag} if etag is not None else None
+    if expand_set:
+        if headers:
+            response.headers.update(headers)
+        return await run_db(db, list_appointments_by_date, date, doctor_id, expand_set)
+    rows = await run_db(db, list_appointment_rows_by_date, date, doctor_id)
+    return RowsJSONResponse(rows, AppointmentRead, headers)
 
 
-@app.get("/appointments/{appointment_id}", response_model=AppointmentRead)
-def api_get_appointment(appointment_id: int, db: Session = Depends(get_db)):
-    return get_appointment(db, appointment_id)
+@app.get("/appointments/export", response_class=StreamingResponse)
+async def api_export_appointments(
+    range_start: datetime = Query(alias="from"),
+    range_end: datetime = Query(alias="to"),
+    doctor_id: int | None = Query(default=None, gt=0),
+    patient_id: int | None = Query(default=None, gt=0),
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    gzip: bool = False,
+    db: DbSession = Depends(get_read_db),
+):
+    args = (range_start, range_end, fmt, doctor_id, patient_id, gzip)
+    if isinstance(db, AsyncSession):
+        body = await export_appointments_async(db, *args)
+    else:
+        body = await run_in_threadpool(export_appointments, db, *args)
+    headers = {"Content-Disposition": f'attachment; filename="appointments.{fmt}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+@app.get(
+    "/appointments/{appointment_id}",
+    response_model=AppointmentExpandedRead,
+    response_model_exclude_unset=True,
+)
+async def api_get_appointment(
+    appointment_id: int,
+    expand: str | None = Query(default=None, description="patient,doctor"),
+    db: DbSession = Depends(get_read_db),
+):
+    return await run_db(db, get_appointment, appointment_id, parse_expand(expand))
@@ -0,0 +1,308 @@
+"""
+Request and database metrics in the Prometheus text exposition format.
+
+MetricsMiddleware times every HTTP request and labels it with the matched
+route template (`/patients/{patient_id}`, not the raw path) so the number
+of series stays bounded. SQLAlchemy cursor events on the instrumented
+engines count queries and their time. Pool checkout wait is measured
+around `connect()` by the pool class from timed_pool_class(), which
+src/database.py passes to every engine it creates. Both are attributed to the request that ran
+them through a context variable; that variable follows the request into
+the threadpool and into AsyncSession.run_sync.
+
+The exposition is rendered by hand: it is a few lines of text and does
+not need a client library.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, Sequence
+
+from sqlalchemy import Engine, event, make_url
+from sqlalchemy.pool import Pool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Label for queries and pool checkouts that happen outside a request
+# (startup, CLI scripts).
+NO_ROUTE = "<none>"
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass
+class RequestStats:
+    scope: dict | None = None
+    queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_endpoint() -> str | None:
+    """`METHOD /route/template` of the request being served, if any."""
+    stats = _current.get()
+    if stats is None or stats.scope is None:
+        return None
+    route = stats.scope.get("route")
+    return f"{stats.scope['method']} {getattr(route, 'path', UNMATCHED_ROUTE)}"
+
+
+class Histogram:
+    """Fixed-bucket histogram; callers hold the registry lock."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield _fmt(bound), total
+        yield "+Inf", total + self.counts[-1]
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else f"{value:g}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency: dict[tuple[str, str], Histogram] = {}
+            self._query_counts: dict[tuple[str, str], Histogram] = {}
+            self._requests: dict[tuple[str, str, str], int] = defaultdict(int)
+            self._db_queries: dict[tuple[str, str], int] = defaultdict(int)
+            self._db_seconds: dict[tuple[str, str], float] = defaultdict(float)
+            self._pool_wait_total: dict[tuple[str, str], float] = defaultdict(float)
+            self._pool_wait = Histogram(POOL_WAIT_BUCKETS)
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        stats: RequestStats,
+    ) -> None:
+        key = (method, route)
+        with self._lock:
+            if key not in self._latency:
+                self._latency[key] = Histogram(LATENCY_BUCKETS)
+                self._query_counts[key] = Histogram(QUERY_COUNT_BUCKETS)
+            self._latency[key].observe(seconds)
+            self._query_counts[key].observe(stats.queries)
+            self._requests[(method, route, str(status))] += 1
+            self._db_queries[key] += stats.queries
+            self._db_seconds[key] += stats.db_seconds
+            self._pool_wait_total[key] += stats.pool_wait_seconds
+
+    def observe_query(self, seconds: float) -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+            return
+        with self._lock:
+            self._db_queries[("", NO_ROUTE)] += 1
+            self._db_seconds[("", NO_ROUTE)] += seconds
+
+    def observe_pool_wait(self, seconds: float) -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.pool_wait_seconds += seconds
+        with self._lock:
+            self._pool_wait.observe(seconds)
+            if stats is None:
+                self._pool_wait_total[("", NO_ROUTE)] += seconds
+
+    def render(self) -> str:
+        out: list[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: str, hist: Histogram) -> None:
+            sep = "," if labels else ""
+            braces = f"{{{labels}}}" if labels else ""
+            for le, count in hist.cumulative():
+                out.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {count}')
+            out.append(f"{name}_sum{braces} {hist.sum}")
+            out.append(f"{name}_count{braces} {sum(hist.counts)}")
+
+        with self._lock:
+            header(
+                "http_requests_total", "counter", "HTTP requests by route and status."
+            )
+            for (method, route, status), count in sorted(self._requests.items()):
+                labels = _labels(method=method, route=route, status=status)
+                out.append(f"http_requests_total{{{labels}}} {count}")
+
+            header(
+                "http_request_duration_seconds",
+                "histogram",
+                "HTTP request latency by route.",
+            )
+            for (method, route), hist in sorted(self._latency.items()):
+                histogram(
+                    "http_request_duration_seconds",
+                    _labels(method=method, route=route),
+                    hist,
+                )
+
+            header(
+                "http_request_db_queries",
+                "histogram",
+                "SQL statements executed per request.",
+            )
+            for (method, route), hist in sorted(self._query_counts.items()):
+                histogram(
+                    "http_request_db_queries", _labels(method=method, route=route), hist
+                )
+
+            header("db_queries_total", "counter", "SQL statements executed.")
+            for (method, route), count in sorted(self._db_queries.items()):
+                labels = _labels(method=method, route=route)
+                out.append(f"db_queries_total{{{labels}}} {count}")
+
+            header(
+                "db_query_duration_seconds_total",
+                "counter",
+                "Cumulative time spent executing SQL statements.",
+            )
+            for (method, route), seconds in sorted(self._db_seconds.items()):
+                labels = _labels(method=method, route=route)
+                out.append(f"db_query_duration_seconds_total{{{labels}}} {seconds}")
+
+            header(
+                "db_pool_wait_seconds_total",
+                "counter",
+                "Cumulative time spent waiting for a pooled connection.",
+            )
+            for (method, route), seconds in sorted(self._pool_wait_total.items()):
+                labels = _labels(method=method, route=route)
+                out.append(f"db_pool_wait_seconds_total{{{labels}}} {seconds}")
+
+            header(
+                "db_pool_wait_seconds",
+                "histogram",
+                "Time to check a connection out of the pool.",
+            )
+            histogram("db_pool_wait_seconds", "", self._pool_wait)
+        return "\n".join(out) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+@lru_cache(maxsize=None)
+def _timed(pool_class: type[Pool]) -> type[Pool]:
+    class TimedPool(pool_class):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                registry.observe_pool_wait(time.perf_counter() - started)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+def timed_pool_class(url: str) -> type[Pool]:
+    """
+    The pool class create_engine() would pick for `url`, with checkout wait
+    timed. Pass it as `poolclass`: Engine.dispose() recreates the pool from
+    the same class, so the timing survives a dispose.
+    """
+    parsed = make_url(url)
+    return _timed(parsed.get_dialect().get_pool_class(parsed))
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count queries on a sync Engine (for an AsyncEngine pass its
+    `sync_engine`). Pool waits come from timed_pool_class()."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        registry.observe_query(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None:
+            starts = context.connection.info.get("query_start")
+            if starts:
+                registry.observe_query(time.perf_counter() - starts.pop())
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed response bodies (and the queries
+    that feed them) are inside the measured span."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            registry.observe_request(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - started,
+                stats,
+            )
@@ -1,7 +1,10 @@
-from sqlalchemy import DateTime, ForeignKey, Index, Integer, text
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
+from src.models.appointment_series import AppointmentSeries
 
 
 class Appointment(Base):
@@ -16,12 +19,41 @@ class Appointment(Base):
     )
     start_time_utc: Mapped["DateTime"] = mapped_column(DateTime, nullable=False)
     duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Derived from start_time_utc + duration_minutes; stored so interval
+    # queries can be answered from ix_doctor_start_end.
+    end_time_utc: Mapped["DateTime"] = mapped_column(DateTime, nullable=False)
     created_at: Mapped["DateTime"] = mapped_column(
         DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
+    # Set for occurrences booked through a recurring series.
+    series_id: Mapped[int | None] = mapped_column(
+        ForeignKey("vamsi_appointment_series.id", ondelete="RESTRICT"),
+        nullable=True,
+    )
 
     patient = relationship("Patient", back_populates="appointments")
     doctor = relationship("Doctor", back_populates="appointments")
+    series = relationship(AppointmentSeries, back_populates="appointments")
+
+
+Index(
+    "ix_doctor_start_end",
+    Appointment.doctor_id,
+    Appointment.start_time_utc,
+    Appointment.end_time_utc,
+)
+Index("ix_appointment_start_time", Appointment.start_time_utc)
+Index("ix_appointment_series_start", Appointment.series_id, Appointment.start_time_utc)
 
 
-Index("ix_doctor_start_time", Appointment.doctor_id, Appointment.start_time_utc)
+def appointment_end(start: datetime, duration_minutes: int) -> datetime:
+    """End timestamp for rows written with Core inserts."""
+    return start + timedelta(minutes=duration_minutes)
+
+
+@event.listens_for(Appointment, "before_insert")
+@event.listens_for(Appointment, "before_update")
+def _sync_end_time(mapper, connection, target: Appointment) -> None:
+    target.end_time_utc = appointment_end(
+        target.start_time_utc, target.duration_minutes
+    )
@@ -0,0 +1,36 @@
+from sqlalchemy import DateTime, ForeignKey, Integer, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.database import Base
+
+
+class AppointmentSeries(Base):
+    """A recurring booking; its occurrences are rows in vamsi_appointments."""
+
+    __tablename__ = "vamsi_appointment_series"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    patient_id: Mapped[int] = mapped_column(
+        ForeignKey("vamsi_patients.id", ondelete="RESTRICT"), nullable=False
+    )
+    doctor_id: Mapped[int] = mapped_column(
+        ForeignKey("vamsi_doctors.id", ondelete="RESTRICT"), nullable=False
+    )
+    # The recurrence rule as requested: the first start, then every
+    # interval_days until `occurrences` have been booked.
+    start_time_utc: Mapped["DateTime"] = mapped_column(DateTime, nullable=False)
+    duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    interval_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    occurrences: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped["DateTime"] = mapped_column(
+        DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+    )
+    # Set when the series is cancelled; its future appointments are deleted.
+    cancelled_at: Mapped["DateTime | None"] = mapped_column(DateTime, nullable=True)
+
+    appointments = relationship(
+        "Appointment",
+        back_populates="series",
+        order_by="Appointment.start_time_utc",
+        passive_deletes=True,
+    )
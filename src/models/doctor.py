@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, DateTime, String, text
+from sqlalchemy import Boolean, DateTime, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -17,3 +17,6 @@ class Doctor(Base):
     appointments = relationship(
         "Appointment", back_populates="doctor", passive_deletes=True
     )
+
+
+Index("ix_doctor_specialization_active", Doctor.specialization, Doctor.is_active)
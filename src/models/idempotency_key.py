@@ -0,0 +1,26 @@
+from sqlalchemy import DateTime, Index, Integer, LargeBinary, String
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class IdempotencyKey(Base):
+    """The stored response of a POST sent with an Idempotency-Key header."""
+
+    __tablename__ = "vamsi_idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # SHA-256 of the method, path, query string and body of the first request.
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # NULL while the first request is still running.
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # Bulk responses outgrow MySQL's 64 KiB BLOB.
+    response_body: Mapped[bytes | None] = mapped_column(
+        LargeBinary().with_variant(mysql.MEDIUMBLOB(), "mysql"), nullable=True
+    )
+    created_at: Mapped["DateTime"] = mapped_column(DateTime, nullable=False)
+
+
+Index("ix_idempotency_created", IdempotencyKey.created_at)
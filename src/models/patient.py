@@ -1,12 +1,55 @@
-from sqlalchemy import DateTime, String, UniqueConstraint, text
+from sqlalchemy import DateTime, Index, String, UniqueConstraint, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
 
+# SQLite serves patient search from an FTS5 index over the names and the
+# local part of the email (the domain is in almost every row and would only
+# slow matching down). Triggers keep it in step with vamsi_patients, so
+# every write path (ORM, Core bulk inserts, raw SQL) updates it in the same
+# transaction. `prefix` indexes 1-6 character prefixes, so type-ahead terms
+# are single index lookups instead of merges over every matching token.
+PATIENT_FTS_TABLE = "vamsi_patients_fts"
+_FTS_EMAIL = "substr(new.email, 1, instr(new.email, '@') - 1)"
+PATIENT_FTS_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {PATIENT_FTS_TABLE} USING fts5(
+        last_name, first_name, email,
+        prefix='1 2 3 4 5 6', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vamsi_patients_fts_ai
+    AFTER INSERT ON vamsi_patients BEGIN
+        INSERT INTO {PATIENT_FTS_TABLE}(rowid, last_name, first_name, email)
+        VALUES (new.id, new.last_name, new.first_name, {_FTS_EMAIL});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vamsi_patients_fts_ad
+    AFTER DELETE ON vamsi_patients BEGIN
+        DELETE FROM {PATIENT_FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vamsi_patients_fts_au
+    AFTER UPDATE OF id, last_name, first_name, email ON vamsi_patients BEGIN
+        DELETE FROM {PATIENT_FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {PATIENT_FTS_TABLE}(rowid, last_name, first_name, email)
+        VALUES (new.id, new.last_name, new.first_name, {_FTS_EMAIL});
+    END
+    """,
+)
+
 
 class Patient(Base):
     __tablename__ = "vamsi_patients"
-    __table_args__ = (UniqueConstraint("email", name="uq_patient_email"),)
+    __table_args__ = (
+        UniqueConstraint("email", name="uq_patient_email"),
+        # Prefix search on other databases: `LIKE 'abc%'` range scans.
+        Index("ix_patient_last_first", "last_name", "first_name"),
+        Index("ix_patient_first_name", "first_name"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     first_name: Mapped[str] = mapped_column(String(100), nullable=False)
     last_name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -26,3 +69,16 @@ class Patient(Base):
     appointments = relationship(
         "Appointment", back_populates="patient", passive_deletes=True
     )
+
+
+@event.listens_for(Patient.__table__, "after_create")
+def _create_search_index(table, connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        for statement in PATIENT_FTS_DDL:
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Patient.__table__, "after_drop")
+def _drop_search_index(table, connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {PATIENT_FTS_TABLE}")
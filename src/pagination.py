@@ -0,0 +1,63 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    """
+    Cursors are opaque to clients; internally they carry the last id of the
+    previous page. Anything that does not decode to that shape is a 400.
+    """
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        last_id = None
+    if not isinstance(last_id, int) or isinstance(last_id, bool) or last_id < 0:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    return last_id
+
+
+def keyset_page(
+    db: Session,
+    stmt: Select[Any],
+    id_column: InstrumentedAttribute[int],
+    limit: int,
+    after: str | None,
+    as_rows: bool = False,
+) -> tuple[list[Any], str | None]:
+    """
+    Run `stmt` as one keyset page ordered by `id_column`.
+
+    Seeks past the cursor with `id > last_id` instead of OFFSET, so every
+    page is a bounded primary-key range scan however deep the client pages.
+    One extra row is fetched to tell whether a next page exists. With
+    `as_rows` the page holds result rows (for column selects that must
+    include `id_column`) instead of ORM instances.
+    """
+    last_id = decode_cursor(after)
+    if last_id is not None:
+        stmt = stmt.where(id_column > last_id)
+    result = db.execute(stmt.order_by(id_column).limit(limit + 1))
+    rows = list(result if as_rows else result.scalars())
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(getattr(rows[-1], id_column.key))
+    return rows, None
@@ -0,0 +1,190 @@
+"""
+Opt-in profiling of individual requests.
+
+With PROFILING_ENABLED=1 a request carrying `X-Profile: 1` (or `?profile=1`)
+and a valid X-Admin-Token runs its service calls under cProfile. Every SQL
+statement it executes is recorded with its duration and the service
+function that issued it. The response gets an `X-Profile-Id` header. The
+profile is written to PROFILE_DIR as `<id>.pstats` (for `python -m pstats`
+or snakeviz) and `<id>.txt` (SQL by caller, then the top functions by
+cumulative time). GET /admin/profiles/{id} returns either file.
+
+Profiling wraps what `run_db` executes, because that is where a request
+spends its time. In DB_ASYNC mode the service runs in a greenlet on the
+event loop, so the profile can also pick up other requests' code that ran
+while this one waited on the database.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+from urllib.parse import parse_qs
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine, event
+
+from src import admin
+
+T = TypeVar("T")
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+PROFILE_DIR = Path(
+    os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "pes-profiles"))
+)
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+REPORT_TOP_FUNCTIONS = 40
+SERVICE_PACKAGE = "src.services."
+
+
+@dataclass
+class SqlRecord:
+    caller: str
+    statement: str
+    seconds: float
+
+
+@dataclass
+class RequestProfile:
+    id: str
+    method: str
+    path: str
+    profiler: cProfile.Profile = field(default_factory=cProfile.Profile)
+    sql: list[SqlRecord] = field(default_factory=list)
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def profiled(fn: Callable[..., T]) -> Callable[..., T]:
+    """`fn` run under the current request's profiler, if there is one."""
+    profile = _current.get()
+    if profile is None:
+        return fn
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        return profile.profiler.runcall(fn, *args, **kwargs)
+
+    return run
+
+
+def _service_caller() -> str:
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(SERVICE_PACKAGE):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<outside services>"
+
+
+def record_sql(engine: Engine) -> None:
+    """Record SQL for profiled requests (for an AsyncEngine pass its
+    `sync_engine`)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        if profile is not None and conn.info.get("profile_start"):
+            seconds = time.perf_counter() - conn.info["profile_start"].pop()
+            profile.sql.append(SqlRecord(_service_caller(), statement, seconds))
+
+
+def _report(profile: RequestProfile, elapsed: float) -> str:
+    out = io.StringIO()
+    out.write(f"{profile.method} {profile.path}  {elapsed * 1000:.1f} ms\n\n")
+
+    by_caller: dict[str, list[SqlRecord]] = defaultdict(list)
+    for record in profile.sql:
+        by_caller[record.caller].append(record)
+    total_sql = sum(r.seconds for r in profile.sql)
+    out.write(f"SQL: {len(profile.sql)} statements, {total_sql * 1000:.1f} ms\n")
+    for caller, records in sorted(
+        by_caller.items(), key=lambda item: -sum(r.seconds for r in item[1])
+    ):
+        caller_ms = sum(r.seconds for r in records) * 1000
+        out.write(f"\n  {caller}  ({len(records)} statements, {caller_ms:.1f} ms)\n")
+        for record in records:
+            statement = " ".join(record.statement.split())
+            out.write(f"    {record.seconds * 1000:8.2f} ms  {statement}\n")
+
+    out.write("\n")
+    stats = pstats.Stats(profile.profiler, stream=out)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_TOP_FUNCTIONS)
+    return out.getvalue()
+
+
+def save(profile: RequestProfile, elapsed: float) -> None:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profile.profiler.dump_stats(PROFILE_DIR / f"{profile.id}.pstats")
+    (PROFILE_DIR / f"{profile.id}.txt").write_text(
+        _report(profile, elapsed), encoding="utf-8"
+    )
+
+
+def profile_path(profile_id: str, suffix: str) -> Path | None:
+    """Saved file for `profile_id`, or None (ids are uuid4 hex only)."""
+    if len(profile_id) != 32 or not all(c in "0123456789abcdef" for c in profile_id):
+        return None
+    path = PROFILE_DIR / f"{profile_id}{suffix}"
+    return path if path.is_file() else None
+
+
+def _wants_profile(scope) -> bool:
+    headers = dict(scope["headers"])
+    query = parse_qs(scope.get("query_string", b"").decode())
+    if headers.get(PROFILE_HEADER.encode()) != b"1" and query.get("profile") != ["1"]:
+        return False
+    token = headers.get(admin.ADMIN_TOKEN_HEADER.lower().encode())
+    return admin.is_admin_token(token.decode() if token else None)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not PROFILING_ENABLED
+            or scope["type"] != "http"
+            or not _wants_profile(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(uuid.uuid4().hex, scope["method"], scope["path"])
+        token = _current.set(profile)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (PROFILE_ID_HEADER.lower().encode(), profile.id.encode()),
+                ]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current.reset(token)
+            await run_in_threadpool(save, profile, time.perf_counter() - started)
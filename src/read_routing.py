@@ -0,0 +1,66 @@
+"""
+Read-your-writes for replica routing.
+
+With READ_DATABASE_URL set, GET routes read from the replica, which may lag
+the primary. A client that has just written must still see its write, so a
+successful write response sets a `pes_read_primary_until` cookie holding
+the time READ_YOUR_WRITES_SECONDS from now. Until then that client's reads
+go to the primary. Clients without a cookie jar can send
+`X-Read-Primary: 1` on a read instead.
+"""
+
+import os
+import time
+from http.cookies import SimpleCookie
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+READ_PRIMARY_COOKIE = "pes_read_primary_until"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def wants_primary(headers: dict[str, str], cookies: dict[str, str]) -> bool:
+    """Whether a read with these headers and cookies must see the primary."""
+    if headers.get(READ_PRIMARY_HEADER.lower()) == "1":
+        return True
+    try:
+        return float(cookies.get(READ_PRIMARY_COOKIE, "")) > time.time()
+    except ValueError:
+        return False
+
+
+def _read_primary_cookie() -> bytes:
+    cookie = SimpleCookie()
+    cookie[READ_PRIMARY_COOKIE] = f"{time.time() + READ_YOUR_WRITES_SECONDS:.3f}"
+    morsel = cookie[READ_PRIMARY_COOKIE]
+    morsel["max-age"] = int(READ_YOUR_WRITES_SECONDS) + 1
+    morsel["path"] = "/"
+    morsel["httponly"] = True
+    morsel["samesite"] = "Lax"
+    return morsel.OutputString().encode()
+
+
+class ReadYourWritesMiddleware:
+    """Mark clients that just wrote so their next reads go to the primary."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            READ_YOUR_WRITES_SECONDS <= 0
+            or scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", _read_primary_cookie()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -4,7 +4,10 @@ from src.database import engine
 
 with engine.begin() as conn:
     conn.execute(text("DROP TABLE IF EXISTS vamsi_appointments"))
+    conn.execute(text("DROP TABLE IF EXISTS vamsi_appointment_series"))
     conn.execute(text("DROP TABLE IF EXISTS vamsi_patients"))
+    conn.execute(text("DROP TABLE IF EXISTS vamsi_patients_fts"))
     conn.execute(text("DROP TABLE IF EXISTS vamsi_doctors"))
+    conn.execute(text("DROP TABLE IF EXISTS vamsi_idempotency_keys"))
 
 print("All tables dropped successfully.")
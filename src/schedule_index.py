@@ -0,0 +1,375 @@
+"""
+Process-local index of each doctor's upcoming appointments.
+
+For every doctor it has seen, the index keeps the appointments from a day
+before now to SCHEDULE_INDEX_HORIZON_DAYS ahead in three parallel arrays
+sorted by start: start (microseconds since the epoch, int64), duration
+(minutes, uint16) and id (int64). That is 18 bytes per appointment with
+no per-appointment Python objects, so 5,000 doctors with 90 days of full
+shifts fit in about 75 MB (see benchmarks/bench_schedule_index.py).
+
+- A doctor is loaded from vamsi_appointments with one range query the
+  first time the doctor is asked for. Loads only read the primary: a
+  lagging replica can still hold deleted appointments. A lookup through
+  a replica session answers from a fresh loaded schedule or returns None.
+- Bookings made by this process are added after they commit. When
+  appointments are deleted, the doctor is dropped in every worker through
+  an invalidation log, as for the entity cache, and reloaded on next use.
+- After SCHEDULE_INDEX_RECONCILE_SECONDS the next lookup reloads the doctor
+  from the database. That picks up bookings made by other workers and rows
+  changed outside the app. `reconcile_drift` counts the appointments the
+  reload added or dropped.
+- The least recently used doctors are dropped beyond
+  SCHEDULE_INDEX_MAX_DOCTORS.
+
+The index can lag other workers' bookings but never contains an
+appointment the database lacks (unless it was deleted behind the app's
+back since the last reload). A hit is therefore a real conflict, while a
+miss still needs the database.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.cache import ENTITY_CACHE_DIR, InvalidationLog
+from src.database import is_replica
+from src.models.appointment import Appointment
+
+SCHEDULE_INDEX_ENABLED = os.getenv("SCHEDULE_INDEX_ENABLED", "0").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+SCHEDULE_INDEX_HORIZON_DAYS = int(os.getenv("SCHEDULE_INDEX_HORIZON_DAYS", "90"))
+SCHEDULE_INDEX_RECONCILE_SECONDS = float(
+    os.getenv("SCHEDULE_INDEX_RECONCILE_SECONDS", "30")
+)
+SCHEDULE_INDEX_MAX_DOCTORS = int(os.getenv("SCHEDULE_INDEX_MAX_DOCTORS", "10000"))
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+_MINUTE_US = 60_000_000
+_DAY_US = 86_400_000_000
+
+Interval = tuple[datetime, datetime]
+
+
+def _to_us(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _US
+
+
+def _from_us(value: int) -> datetime:
+    return _EPOCH + value * _US
+
+
+class DoctorSchedule:
+    """One doctor's appointments in [window_start, window_end), by start."""
+
+    __slots__ = ("starts", "minutes", "ids", "window_start", "window_end", "loaded_at")
+
+    def __init__(self, window_start: int, window_end: int, loaded_at: float):
+        self.starts = array("q")
+        self.minutes = array("H")
+        self.ids = array("q")
+        self.window_start = window_start
+        self.window_end = window_end
+        self.loaded_at = loaded_at
+
+    def add(self, start: int, minutes: int, appointment_id: int) -> None:
+        if not self.window_start <= start < self.window_end:
+            return
+        i = bisect_left(self.starts, start)
+        # Same start: keep id order, and never add an id twice.
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.ids[i] == appointment_id:
+                return
+            if self.ids[i] > appointment_id:
+                break
+            i += 1
+        self.starts.insert(i, start)
+        self.minutes.insert(i, minutes)
+        self.ids.insert(i, appointment_id)
+
+    def covers(self, start: int, end: int, max_minutes: int) -> bool:
+        # Rows that start up to max_minutes before `start` can still overlap.
+        return (
+            start - max_minutes * _MINUTE_US >= self.window_start
+            and end <= self.window_end
+        )
+
+    def overlapping(self, start: int, end: int, max_minutes: int) -> Iterable[int]:
+        """Positions of the appointments overlapping [start, end)."""
+        lo = bisect_right(self.starts, start - max_minutes * _MINUTE_US)
+        hi = bisect_left(self.starts, end)
+        for i in range(lo, hi):
+            if self.starts[i] + self.minutes[i] * _MINUTE_US > start:
+                yield i
+
+    def nbytes(self) -> int:
+        return sum(
+            sys.getsizeof(a) for a in (self.starts, self.minutes, self.ids)
+        ) + sys.getsizeof(self)
+
+
+class ScheduleIndex:
+    def __init__(
+        self,
+        max_duration: timedelta,
+        enabled: bool = SCHEDULE_INDEX_ENABLED,
+        horizon_days: int = SCHEDULE_INDEX_HORIZON_DAYS,
+        reconcile_seconds: float = SCHEDULE_INDEX_RECONCILE_SECONDS,
+        max_doctors: int = SCHEDULE_INDEX_MAX_DOCTORS,
+        directory: Path = ENTITY_CACHE_DIR,
+    ):
+        self.enabled = enabled
+        self.max_minutes = int(max_duration.total_seconds() // 60)
+        self.horizon_days = horizon_days
+        self.reconcile_seconds = reconcile_seconds
+        self.max_doctors = max_doctors
+        # Only the dict is guarded. Loads run without the lock, because in
+        # DB_ASYNC mode they suspend on the event loop thread.
+        self._lock = threading.Lock()
+        self._doctors: OrderedDict[int, DoctorSchedule] = OrderedDict()
+        # Bookings that committed while their doctor was being (re)loaded.
+        self._pending: dict[int, list[tuple[int, int, int]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.reconcile_drift = 0
+        # Bumped by every invalidation; a load that overlapped one may have
+        # read deleted rows and is not kept.
+        self._generation = 0
+        self._log = InvalidationLog(directory / "schedules.log")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._doctors.clear()
+
+    def _sync(self) -> None:
+        changed = self._log.poll()
+        if changed == []:
+            return
+        with self._lock:
+            self._generation += 1
+            if changed is None:
+                self._doctors.clear()
+                return
+            for key in changed:
+                try:
+                    self._doctors.pop(int(key), None)
+                except ValueError:
+                    self._doctors.clear()
+
+    def invalidate(self, doctor_id: int) -> None:
+        """Drop `doctor_id` here and in every other worker; call after
+        committing a delete of its appointments."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._doctors.pop(doctor_id, None)
+            self._generation += 1
+        self._log.publish(doctor_id)
+
+    def _get(self, doctor_id: int) -> DoctorSchedule | None:
+        with self._lock:
+            schedule = self._doctors.get(doctor_id)
+            if schedule is not None:
+                self._doctors.move_to_end(doctor_id)
+            return schedule
+
+    def _window(self) -> tuple[int, int]:
+        # A day back, so today's day view is covered after the morning.
+        now = _to_us(datetime.now(timezone.utc))
+        return (
+            now - _DAY_US - self.max_minutes * _MINUTE_US,
+            now + self.horizon_days * _DAY_US,
+        )
+
+    def _load(self, db: Session, doctor_id: int) -> DoctorSchedule:
+        window_start, window_end = self._window()
+        with self._lock:
+            self._pending.setdefault(doctor_id, [])
+            generation = self._generation
+        rows = db.execute(
+            select(
+                Appointment.start_time_utc,
+                Appointment.duration_minutes,
+                Appointment.id,
+            )
+            .where(
+                Appointment.doctor_id == doctor_id,
+                Appointment.start_time_utc >= _from_us(window_start),
+                Appointment.start_time_utc < _from_us(window_end),
+            )
+            .order_by(Appointment.start_time_utc, Appointment.id)
+        )
+        schedule = DoctorSchedule(window_start, window_end, time.monotonic())
+        for start, minutes, appointment_id in rows:
+            schedule.starts.append(_to_us(start))
+            schedule.minutes.append(minutes)
+            schedule.ids.append(appointment_id)
+
+        with self._lock:
+            for entry in self._pending.pop(doctor_id, ()):
+                schedule.add(*entry)
+            if generation != self._generation:
+                return schedule
+            previous = self._doctors.get(doctor_id)
+            if previous is not None:
+                # Only the span both loads cover can be compared.
+                old = {
+                    appointment_id
+                    for start, appointment_id in zip(previous.starts, previous.ids)
+                    if window_start <= start < previous.window_end
+                }
+                new = {
+                    appointment_id
+                    for start, appointment_id in zip(schedule.starts, schedule.ids)
+                    if start < previous.window_end
+                }
+                self.reconcile_drift += len(old ^ new)
+            self._doctors[doctor_id] = schedule
+            self._doctors.move_to_end(doctor_id)
+            while len(self._doctors) > self.max_doctors:
+                self._doctors.popitem(last=False)
+            self.loads += 1
+        return schedule
+
+    def _stale(self, schedule: DoctorSchedule) -> bool:
+        return time.monotonic() - schedule.loaded_at > self.reconcile_seconds
+
+    def collides(self, doctor_id: int, start: datetime, end: datetime) -> bool:
+        """
+        True if the index already holds an appointment of `doctor_id`
+        overlapping [start, end). Answers from memory only; False when the
+        doctor is not loaded or the interval is outside its window.
+        """
+        if not self.enabled:
+            return False
+        self._sync()
+        start_us, end_us = _to_us(start), _to_us(end)
+        with self._lock:
+            schedule = self._doctors.get(doctor_id)
+            if schedule is None or not schedule.covers(
+                start_us, end_us, self.max_minutes
+            ):
+                return False
+            return any(
+                True for _ in schedule.overlapping(start_us, end_us, self.max_minutes)
+            )
+
+    def _intervals(
+        self, schedule: DoctorSchedule, start_us: int, end_us: int
+    ) -> list[Interval]:
+        return [
+            (
+                _from_us(schedule.starts[i]),
+                _from_us(schedule.starts[i] + schedule.minutes[i] * _MINUTE_US),
+            )
+            for i in schedule.overlapping(start_us, end_us, self.max_minutes)
+        ]
+
+    def intervals(
+        self, db: Session, doctor_id: int, range_start: datetime, range_end: datetime
+    ) -> list[Interval] | None:
+        """
+        Booked (start, end) pairs of `doctor_id` overlapping the range, sorted
+        by start, loading or reconciling the doctor first if needed. None when
+        disabled, when the range is outside the indexed horizon, or when `db`
+        reads a replica and the doctor would have to be (re)loaded.
+        """
+        if not self.enabled:
+            return None
+        self._sync()
+        start_us, end_us = _to_us(range_start), _to_us(range_end)
+        window_start, window_end = self._window()
+        if (
+            start_us - self.max_minutes * _MINUTE_US < window_start
+            or end_us > window_end
+        ):
+            self.misses += 1
+            return None
+        schedule = self._get(doctor_id)
+        if (
+            schedule is None
+            or self._stale(schedule)
+            or not schedule.covers(start_us, end_us, self.max_minutes)
+        ):
+            if is_replica(db):
+                self.misses += 1
+                return None
+            schedule = self._load(db, doctor_id)
+        self.hits += 1
+        with self._lock:
+            return self._intervals(schedule, start_us, end_us)
+
+    def cached_intervals(
+        self, doctor_ids: Iterable[int], range_start: datetime, range_end: datetime
+    ) -> dict[int, list[Interval]]:
+        """intervals() for the doctors already loaded and fresh; others are
+        left out for the caller to read from the database."""
+        if not self.enabled:
+            return {}
+        self._sync()
+        start_us, end_us = _to_us(range_start), _to_us(range_end)
+        found: dict[int, list[Interval]] = {}
+        with self._lock:
+            for doctor_id in doctor_ids:
+                schedule = self._doctors.get(doctor_id)
+                if (
+                    schedule is not None
+                    and not self._stale(schedule)
+                    and schedule.covers(start_us, end_us, self.max_minutes)
+                ):
+                    found[doctor_id] = self._intervals(schedule, start_us, end_us)
+        if found:
+            self.hits += len(found)
+        return found
+
+    def record(self, db: Session, appointments: Iterable[Appointment]) -> None:
+        """Add committed appointments; loads doctors not indexed yet."""
+        if not self.enabled:
+            return
+        cold: set[int] = set()
+        with self._lock:
+            for appt in appointments:
+                entry = (_to_us(appt.start_time_utc), appt.duration_minutes, appt.id)
+                if appt.doctor_id in self._pending:
+                    self._pending[appt.doctor_id].append(entry)
+                schedule = self._doctors.get(appt.doctor_id)
+                if schedule is None:
+                    cold.add(appt.doctor_id)
+                else:
+                    schedule.add(*entry)
+        for doctor_id in cold:
+            self._load(db, doctor_id)
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            schedules = list(self._doctors.values())
+            return {
+                "enabled": self.enabled,
+                "doctors": len(schedules),
+                "appointments": sum(len(s.starts) for s in schedules),
+                "bytes": sum(s.nbytes() for s in schedules),
+                "horizon_days": self.horizon_days,
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "reconcile_drift": self.reconcile_drift,
+            }
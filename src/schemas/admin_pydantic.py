@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from pydantic import BaseModel, field_serializer
+
+
+def _as_utc_tzaware(dt: datetime) -> datetime:
+    if dt.tzinfo is None or dt.tzinfo.utcoffset(dt) is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+class SlowQueryRead(BaseModel):
+    recorded_at: datetime
+    duration_ms: float
+    endpoint: str | None
+    statement: str
+    # One dict per parameter set (up to 5 for executemany); None when the
+    # statement was raw driver SQL.
+    parameters: list[dict[str, Any]] | None
+    executemany: bool = False
+    plan: list[str] | None = None
+
+    @field_serializer("recorded_at", when_used="json")
+    def _ser_dt(self, v: datetime) -> datetime:
+        return _as_utc_tzaware(v)
+
+
+class EntityCacheStatsRead(BaseModel):
+    enabled: bool
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class ScheduleIndexStatsRead(BaseModel):
+    enabled: bool
+    doctors: int
+    appointments: int
+    # Array and per-doctor object sizes, not counting the dict entries.
+    bytes: int
+    horizon_days: int
+    hits: int
+    misses: int
+    loads: int
+    # Appointments a periodic reload added or dropped compared to memory.
+    reconcile_drift: int
@@ -1,6 +1,15 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from pydantic import BaseModel, Field, field_serializer, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    field_serializer,
+    field_validator,
+    model_validator,
+)
+
+from src.schemas.doctor_pydantic import DoctorRead
+from src.schemas.patient_pydantic import PatientRead
 
 
 def _as_utc_tzaware(dt: datetime) -> datetime:
@@ -30,9 +39,119 @@ class AppointmentRead(BaseModel):
     start_time_utc: datetime
     duration_minutes: int
     created_at: datetime
+    series_id: int | None = None
 
     model_config = {"from attributes": True}
 
     @field_serializer("start_time_utc", "created_at", when_used="json")
     def _ser_dt(self, v: datetime) -> datetime:
         return _as_utc_tzaware(v)
+
+
+class AppointmentExpandedRead(AppointmentRead):
+    # Only present in responses when requested with ?expand=patient,doctor.
+    patient: PatientRead | None = None
+    doctor: DoctorRead | None = None
+
+
+MAX_BULK_APPOINTMENTS = 1000
+
+
+class AppointmentBulkCreate(BaseModel):
+    items: list[AppointmentCreate] = Field(
+        min_length=1, max_length=MAX_BULK_APPOINTMENTS
+    )
+
+
+class AppointmentBulkItemResult(BaseModel):
+    index: int
+    status_code: int
+    appointment: AppointmentRead | None = None
+    detail: str | None = None
+
+
+class AppointmentBulkResult(BaseModel):
+    created: int
+    results: list[AppointmentBulkItemResult]
+
+
+MAX_SERIES_OCCURRENCES = 104  # two years of weekly visits
+
+
+class AppointmentSeriesCreate(BaseModel):
+    """
+    A slot repeated every `interval_days`, either `count` times or up to
+    and including `until_utc`. Occurrences keep the first one's UTC time.
+    """
+
+    patient_id: int
+    doctor_id: int
+    start_time_utc: datetime
+    duration_minutes: int = Field(ge=15, le=180)
+    interval_days: int = Field(default=7, ge=1, le=365)
+    count: int | None = Field(default=None, ge=1, le=MAX_SERIES_OCCURRENCES)
+    until_utc: datetime | None = None
+
+    @field_validator("start_time_utc", "until_utc")
+    @classmethod
+    def require_tz_and_normalize_to_utc(cls, v: datetime | None) -> datetime | None:
+        if v is None:
+            return v
+        if v.tzinfo is None or v.tzinfo.utcoffset(v) is None:
+            raise ValueError("start_time_utc and until_utc must be timezone-aware.")
+        return v.astimezone(timezone.utc)
+
+    @model_validator(mode="after")
+    def require_count_or_until(self) -> "AppointmentSeriesCreate":
+        if (self.count is None) == (self.until_utc is None):
+            raise ValueError("Give exactly one of count and until_utc.")
+        if self.until_utc is not None:
+            if self.until_utc < self.start_time_utc:
+                raise ValueError("until_utc must not be before start_time_utc.")
+            if len(self.occurrence_starts()) > MAX_SERIES_OCCURRENCES:
+                raise ValueError(
+                    f"A series has at most {MAX_SERIES_OCCURRENCES} occurrences."
+                )
+        return self
+
+    def occurrence_starts(self) -> list[datetime]:
+        step = timedelta(days=self.interval_days)
+        if self.count is not None:
+            return [self.start_time_utc + i * step for i in range(self.count)]
+        count = (self.until_utc - self.start_time_utc) // step + 1
+        return [
+            self.start_time_utc + i * step
+            for i in range(min(count, MAX_SERIES_OCCURRENCES + 1))
+        ]
+
+
+class AppointmentSeriesRead(BaseModel):
+    id: int
+    patient_id: int
+    doctor_id: int
+    start_time_utc: datetime
+    duration_minutes: int
+    interval_days: int
+    occurrences: int
+    created_at: datetime
+    cancelled_at: datetime | None
+    # Booked occurrences by start; after cancellation only the past ones.
+    appointments: list[AppointmentRead]
+
+    model_config = {"from attributes": True}
+
+    @field_serializer("start_time_utc", "created_at", "cancelled_at", when_used="json")
+    def _ser_dt(self, v: datetime | None) -> datetime | None:
+        return None if v is None else _as_utc_tzaware(v)
+
+
+class AppointmentSeriesConflict(BaseModel):
+    # Position of the occurrence in the expanded series, from 0.
+    occurrence: int
+    start_time_utc: datetime
+    end_time_utc: datetime
+    conflicting_appointment_id: int
+
+    @field_serializer("start_time_utc", "end_time_utc", when_used="json")
+    def _ser_dt(self, v: datetime) -> datetime:
+        return _as_utc_tzaware(v)
@@ -0,0 +1,36 @@
+from datetime import date, datetime, timezone
+
+from pydantic import BaseModel, field_serializer
+
+
+def _as_utc_tzaware(dt: datetime) -> datetime:
+    if dt.tzinfo is None or dt.tzinfo.utcoffset(dt) is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+class SlotRead(BaseModel):
+    start_time_utc: datetime
+    end_time_utc: datetime
+
+    @field_serializer("start_time_utc", "end_time_utc", when_used="json")
+    def _ser_dt(self, v: datetime) -> datetime:
+        return _as_utc_tzaware(v)
+
+
+class AvailabilityRead(BaseModel):
+    doctor_id: int
+    start_date: date
+    end_date: date
+    slot_minutes: int
+    slots: list[SlotRead]
+
+
+class DoctorSlotRead(SlotRead):
+    doctor_id: int
+
+
+class EarliestSlotsRead(BaseModel):
+    specialization: str
+    slot_minutes: int
+    slots: list[DoctorSlotRead]
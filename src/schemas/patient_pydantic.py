@@ -28,3 +28,15 @@ class PatientRead(BaseModel):
     @field_serializer("created_at", "updated_at", when_used="json")
     def _ser_dt(self, v: datetime) -> datetime:
         return _as_utc_tzaware(v)
+
+
+class PatientImportReject(BaseModel):
+    row: int
+    detail: str
+
+
+class PatientImportReport(BaseModel):
+    processed: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    rejects: list[PatientImportReject] = Field(default_factory=list)
@@ -0,0 +1,180 @@
+"""
+Streaming export of appointments over an arbitrary time range.
+
+Rows are read through a server-side cursor (`yield_per`) and encoded batch by
+batch, so the first bytes go out as soon as the first batch is fetched and
+memory stays flat however many rows match.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.models.appointment import Appointment
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = (
+    "id",
+    "patient_id",
+    "doctor_id",
+    "start_time_utc",
+    "duration_minutes",
+    "created_at",
+    "series_id",
+)
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+_DATETIME_FIELDS = {"start_time_utc", "created_at"}
+
+
+def _as_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _format_dt(dt: datetime) -> str:
+    # Same representation the JSON API uses for UTC datetimes.
+    return _as_utc(dt).isoformat().replace("+00:00", "Z")
+
+
+def export_statement(
+    range_start: datetime,
+    range_end: datetime,
+    doctor_id: Optional[int] = None,
+    patient_id: Optional[int] = None,
+) -> Select[Any]:
+    """Appointments starting in [range_start, range_end), by start time."""
+    range_start, range_end = _as_utc(range_start), _as_utc(range_end)
+    if range_end <= range_start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'.")
+
+    stmt = select(*(getattr(Appointment, name) for name in EXPORT_FIELDS)).where(
+        Appointment.start_time_utc >= range_start,
+        Appointment.start_time_utc < range_end,
+    )
+    if doctor_id is not None:
+        stmt = stmt.where(Appointment.doctor_id == doctor_id)
+    if patient_id is not None:
+        stmt = stmt.where(Appointment.patient_id == patient_id)
+    return stmt.order_by(Appointment.start_time_utc, Appointment.id).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+
+
+def _row_dicts(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    return [
+        {
+            name: (_format_dt(value) if name in _DATETIME_FIELDS else value)
+            for name, value in zip(EXPORT_FIELDS, row)
+        }
+        for row in rows
+    ]
+
+
+class ExportEncoder:
+    """
+    Turns batches of rows into output bytes: a preamble, one chunk per
+    batch and a trailer. Optionally gzips the stream, flushing per chunk so
+    the client sees data as soon as it is encoded.
+    """
+
+    def __init__(self, fmt: str = "ndjson", gzip: bool = False):
+        self.fmt = fmt
+        # wbits=31 selects the gzip container instead of raw zlib.
+        self._compressor = zlib.compressobj(wbits=31) if gzip else None
+        self._buffer = io.StringIO()
+        self._csv = csv.DictWriter(
+            self._buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n"
+        )
+
+    def _out(self, data: bytes) -> bytes:
+        if self._compressor is None:
+            return data
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def start(self) -> bytes:
+        if self.fmt != "csv":
+            return b""
+        self._csv.writeheader()
+        return self._out(self._take())
+
+    def encode(self, rows: Iterable[Any]) -> bytes:
+        batch = _row_dicts(rows)
+        if self.fmt == "csv":
+            self._csv.writerows(batch)
+            return self._out(self._take())
+        return self._out(
+            "".join(
+                json.dumps(row, separators=(",", ":")) + "\n" for row in batch
+            ).encode()
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush() if self._compressor is not None else b""
+
+    def _take(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+def export_appointments(
+    db: Session,
+    range_start: datetime,
+    range_end: datetime,
+    fmt: str = "ndjson",
+    doctor_id: Optional[int] = None,
+    patient_id: Optional[int] = None,
+    gzip: bool = False,
+) -> Iterator[bytes]:
+    """
+    Validate the request, start the query and return the encoded byte
+    stream. Validation errors are raised here, before any bytes are
+    produced.
+    """
+    stmt = export_statement(range_start, range_end, doctor_id, patient_id)
+    result = db.execute(stmt)
+    encoder = ExportEncoder(fmt, gzip)
+
+    def body() -> Iterator[bytes]:
+        yield encoder.start()
+        for rows in result.partitions():
+            yield encoder.encode(rows)
+        yield encoder.finish()
+
+    return body()
+
+
+async def export_appointments_async(
+    db: AsyncSession,
+    range_start: datetime,
+    range_end: datetime,
+    fmt: str = "ndjson",
+    doctor_id: Optional[int] = None,
+    patient_id: Optional[int] = None,
+    gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    """export_appointments for AsyncSession, streaming with `stream()`."""
+    stmt = export_statement(range_start, range_end, doctor_id, patient_id)
+    result = await db.stream(stmt)
+    encoder = ExportEncoder(fmt, gzip)
+
+    async def body() -> AsyncIterator[bytes]:
+        yield encoder.start()
+        async for rows in result.partitions():
+            yield encoder.encode(rows)
+        yield encoder.finish()
+
+    return body()
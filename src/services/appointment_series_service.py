@@ -0,0 +1,192 @@
+"""
+Recurring appointment series.
+
+A series is booked in one transaction: the doctor is locked once, every
+occurrence is checked against the doctor's existing appointments from one
+range query, and either all occurrences are inserted or none are and the
+409 lists each conflicting occurrence. Cancelling a series deletes its
+future occurrences and keeps the past ones as history.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, selectinload
+
+from src.models.appointment import Appointment
+from src.models.appointment_series import AppointmentSeries
+from src.schemas.appointment_pydantic import (
+    AppointmentSeriesConflict,
+    AppointmentSeriesCreate,
+    AppointmentSeriesRead,
+)
+from src.services.appointment_service import (
+    MAX_DURATION_MINUTES,
+    _as_utc,
+    _bump_day_versions,
+    _ensure_patient_exists,
+    _lock_doctors,
+    _require_timezone_aware,
+    _validate_duration,
+    schedule_index,
+)
+
+
+def _series_conflicts(
+    db: Session, doctor_id: int, starts: Sequence[datetime], duration: timedelta
+) -> list[AppointmentSeriesConflict]:
+    """
+    Occurrences overlapping an existing appointment of the doctor. One
+    range query covers the whole series; occurrences are at least a day
+    apart, so a single forward pass over the booked rows finds them all.
+    """
+    max_duration = timedelta(minutes=MAX_DURATION_MINUTES)
+    rows = db.execute(
+        select(Appointment.id, Appointment.start_time_utc, Appointment.end_time_utc)
+        .where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.start_time_utc > starts[0] - max_duration,
+            Appointment.start_time_utc < starts[-1] + duration,
+        )
+        .order_by(Appointment.start_time_utc)
+    ).all()
+
+    conflicts = []
+    j = 0
+    for occurrence, start in enumerate(starts):
+        end = start + duration
+        while j < len(rows) and _as_utc(rows[j].start_time_utc) <= start - max_duration:
+            j += 1
+        k = j
+        while k < len(rows) and _as_utc(rows[k].start_time_utc) < end:
+            if _as_utc(rows[k].end_time_utc) > start:
+                conflicts.append(
+                    AppointmentSeriesConflict(
+                        occurrence=occurrence,
+                        start_time_utc=start,
+                        end_time_utc=end,
+                        conflicting_appointment_id=rows[k].id,
+                    )
+                )
+                break
+            k += 1
+    return conflicts
+
+
+def create_appointment_series(
+    db: Session, data: AppointmentSeriesCreate
+) -> AppointmentSeriesRead:
+    """
+    Book every occurrence of `data`, checked with the same rules and in the
+    same order as create_appointment (400, 404, 400 for a past first
+    occurrence, 409). A 409 carries the conflicting occurrences in
+    `detail.conflicts`.
+    """
+    if data.patient_id <= 0 or data.doctor_id <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail="patient_id and doctor_id must be positive integers.",
+        )
+
+    _require_timezone_aware(data.start_time_utc)
+    _validate_duration(data.duration_minutes)
+    starts = data.occurrence_starts()
+    duration = timedelta(minutes=data.duration_minutes)
+
+    # Held from here until commit, as for a single booking.
+    doctor_found = bool(_lock_doctors(db, [data.doctor_id]))
+    try:
+        _ensure_patient_exists(db, data.patient_id)
+        if not doctor_found:
+            raise HTTPException(status_code=404, detail="Doctor not found.")
+
+        if starts[0] <= datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=400, detail="Appointment must be scheduled in the future."
+            )
+
+        conflicts = _series_conflicts(db, data.doctor_id, starts, duration)
+        if conflicts:
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "message": "Doctor has conflicting appointments.",
+                    "conflicts": [c.model_dump(mode="json") for c in conflicts],
+                },
+            )
+    except HTTPException:
+        db.rollback()  # release the doctor lock right away
+        raise
+
+    series = AppointmentSeries(
+        patient_id=data.patient_id,
+        doctor_id=data.doctor_id,
+        start_time_utc=starts[0],
+        duration_minutes=data.duration_minutes,
+        interval_days=data.interval_days,
+        occurrences=len(starts),
+    )
+    series.appointments = [
+        Appointment(
+            patient_id=data.patient_id,
+            doctor_id=data.doctor_id,
+            start_time_utc=start,  # stored in UTC
+            duration_minutes=data.duration_minutes,
+        )
+        for start in starts
+    ]
+    db.add(series)
+    db.commit()
+    result = get_appointment_series(db, series.id)
+    _bump_day_versions((series.doctor_id, start) for start in starts)
+    schedule_index.record(db, series.appointments)
+    return result
+
+
+def _load_series(db: Session, series_id: int) -> AppointmentSeries:
+    series = db.scalars(
+        select(AppointmentSeries)
+        .options(selectinload(AppointmentSeries.appointments))
+        .where(AppointmentSeries.id == series_id)
+    ).first()
+    if not series:
+        raise HTTPException(status_code=404, detail="Appointment series not found.")
+    return series
+
+
+def get_appointment_series(db: Session, series_id: int) -> AppointmentSeriesRead:
+    return AppointmentSeriesRead.model_validate(
+        _load_series(db, series_id), from_attributes=True
+    )
+
+
+def cancel_appointment_series(db: Session, series_id: int) -> AppointmentSeriesRead:
+    """
+    Delete the series' appointments that have not started yet and mark it
+    cancelled. Cancelling again changes nothing.
+    """
+    series = _load_series(db, series_id)
+    if series.cancelled_at is None:
+        now_utc = datetime.now(timezone.utc)
+        cancelled = [
+            (appt.doctor_id, appt.start_time_utc)
+            for appt in series.appointments
+            if _as_utc(appt.start_time_utc) > now_utc
+        ]
+        db.execute(
+            delete(Appointment)
+            .where(
+                Appointment.series_id == series_id,
+                Appointment.start_time_utc > now_utc,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        series.cancelled_at = now_utc
+        db.commit()
+        _bump_day_versions(cancelled)
+        schedule_index.invalidate(series.doctor_id)
+        db.expire_all()
+        series = _load_series(db, series_id)
+    return AppointmentSeriesRead.model_validate(series, from_attributes=True)
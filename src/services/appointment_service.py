@@ -1,16 +1,36 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from datetime import date, datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Collection, Iterable, List, Optional, Sequence
 
 from fastapi import HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, Select, exists, func, select, update
+from sqlalchemy.orm import Session, selectinload
 
+from src.cache import EntityCache
 from src.models.appointment import Appointment
 from src.models.doctor import Doctor
 from src.models.patient import Patient
-from src.schemas.appointment_pydantic import AppointmentCreate
+from src.schedule_index import ScheduleIndex
+from src.schemas.appointment_pydantic import (
+    AppointmentBulkItemResult,
+    AppointmentBulkResult,
+    AppointmentCreate,
+    AppointmentExpandedRead,
+    AppointmentRead,
+)
+from src.schemas.doctor_pydantic import DoctorRead
+from src.schemas.patient_pydantic import PatientRead
+from src.serialization import read_columns
+from src.services.patient_service import get_patient, patient_cache
+from src.versions import appointment_day_scope, fingerprint, list_versions
+
+MIN_DURATION_MINUTES = 15
+MAX_DURATION_MINUTES = 180
+EXPANDABLE = frozenset({"patient", "doctor"})
+
+schedule_index = ScheduleIndex(max_duration=timedelta(minutes=MAX_DURATION_MINUTES))
 
 
 def _as_utc(dt: datetime) -> datetime:
@@ -24,6 +44,18 @@ def _as_utc(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
+def _bump_day_versions(slots: Iterable[tuple[int, datetime]]) -> None:
+    """Change the ETags of the by-date listings that (doctor_id, start)
+    slots appear in; call after the commit that added or removed them."""
+    scopes: set[str] = set()
+    for doctor_id, start in slots:
+        day = _as_utc(start).date()
+        scopes.update(
+            (appointment_day_scope(day), appointment_day_scope(day, doctor_id))
+        )
+    list_versions.bump(*sorted(scopes))
+
+
 def _require_timezone_aware(dt: datetime) -> None:
     if dt.tzinfo is None or dt.tzinfo.utcoffset(dt) is None:
         raise HTTPException(
@@ -33,7 +65,7 @@ def _require_timezone_aware(dt: datetime) -> None:
 
 
 def _validate_duration(minutes: int) -> None:
-    if minutes < 15 or minutes > 180:
+    if minutes < MIN_DURATION_MINUTES or minutes > MAX_DURATION_MINUTES:
         raise HTTPException(
             status_code=400,
             detail="duration_minutes must be between 15 and 180 minutes.",
@@ -41,15 +73,87 @@ def _validate_duration(minutes: int) -> None:
 
 
 def _ensure_patient_exists(db: Session, patient_id: int) -> None:
-    exists = db.scalar(select(Patient.id).where(Patient.id == patient_id))
-    if not exists:
-        raise HTTPException(status_code=404, detail="Patient not found.")
+    # Served from the patient cache when warm; raises 404 otherwise.
+    get_patient(db, patient_id)
+
+
+def _existing_ids(
+    db: Session,
+    model: type[Patient] | type[Doctor],
+    ids: set[int],
+    cache: EntityCache,
+) -> set[int]:
+    """Ids that exist, answering from `cache` first and one IN query after."""
+    known = {key for key in ids if cache.get(key) is not None}
+    missing = ids - known
+    if missing:
+        known.update(db.scalars(select(model.id).where(model.id.in_(missing))))
+    return known
 
 
-def _ensure_doctor_exists(db: Session, doctor_id: int) -> None:
-    exists = db.scalar(select(Doctor.id).where(Doctor.id == doctor_id))
-    if not exists:
-        raise HTTPException(status_code=404, detail="Doctor not found.")
+def _lock_doctors(db: Session, doctor_ids: Iterable[int]) -> set[int]:
+    """
+    Take the booking lock for each doctor and return the ids that exist.
+
+    The lock is the doctor row itself, held until the session commits or
+    rolls back, so check-then-insert for one doctor is serialized while
+    bookings for other doctors proceed in parallel. Rows are locked in id
+    order so that batches touching several doctors cannot deadlock.
+
+    This must be the first statement of the transaction: under MySQL's
+    REPEATABLE READ the snapshot used by the later conflict check is taken
+    at the first plain read, and it has to postdate the lock.
+
+    SQLite has no row locks and ignores FOR UPDATE. There a no-op UPDATE
+    starts the transaction with the database write lock instead, which
+    serializes all bookings; SQLite only allows one writer at a time anyway.
+    """
+    ids = sorted(set(doctor_ids))
+    if not ids:
+        return set()
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(
+            update(Doctor)
+            .where(Doctor.id.in_(ids))
+            .values(id=Doctor.id)
+            .execution_options(synchronize_session=False)
+        )
+        return set(db.scalars(select(Doctor.id).where(Doctor.id.in_(ids))))
+    return set(
+        db.scalars(
+            select(Doctor.id)
+            .where(Doctor.id.in_(ids))
+            .order_by(Doctor.id)
+            .with_for_update()
+        )
+    )
+
+
+def _has_conflict(
+    db: Session, doctor_id: int, new_start: datetime, new_end: datetime
+) -> bool:
+    """
+    Overlap rule: new_start < existing_end AND new_end > existing_start.
+
+    No appointment lasts longer than MAX_DURATION_MINUTES, so anything that
+    starts before new_start - MAX_DURATION_MINUTES has already ended. That
+    lower bound keeps the lookup a short range scan on ix_doctor_start_end
+    no matter how much history the doctor has, and the stored end_time_utc
+    lets the database answer it from the index alone.
+    """
+    window_start = new_start - timedelta(minutes=MAX_DURATION_MINUTES)
+    return bool(
+        db.scalar(
+            select(
+                exists().where(
+                    Appointment.doctor_id == doctor_id,
+                    Appointment.start_time_utc > window_start,
+                    Appointment.start_time_utc < new_end,
+                    Appointment.end_time_utc > new_start,
+                )
+            )
+        )
+    )
 
 
 # ----------------------------
@@ -63,7 +167,10 @@ def create_appointment(db: Session, data: AppointmentCreate) -> Appointment:
     - timezone-aware datetime
     - future-only
     - duration 15–180
-    - no overlap for same doctor (409)
+    - no overlap for same doctor (409), checked under the doctor's lock
+
+    A slot the schedule index already knows to be taken is refused before
+    the lock is taken; everything else is decided by the database.
     """
     # Validate IDs are positive (PDF mentions this; schema likely also enforces)
     if data.patient_id <= 0 or data.doctor_id <= 0:
@@ -75,37 +182,36 @@ def create_appointment(db: Session, data: AppointmentCreate) -> Appointment:
     _require_timezone_aware(data.start_time_utc)
     _validate_duration(data.duration_minutes)
 
-    _ensure_patient_exists(db, data.patient_id)
-    _ensure_doctor_exists(db, data.doctor_id)
-
     new_start = _as_utc(data.start_time_utc)
-    now_utc = datetime.now(timezone.utc)
-
-    if new_start <= now_utc:
+    new_end = new_start + timedelta(minutes=data.duration_minutes)
+    if new_start > datetime.now(timezone.utc) and schedule_index.collides(
+        data.doctor_id, new_start, new_end
+    ):
+        _ensure_patient_exists(db, data.patient_id)  # 404 still comes first
         raise HTTPException(
-            status_code=400, detail="Appointment must be scheduled in the future."
+            status_code=409, detail="Doctor has a conflicting appointment."
         )
 
-    new_end = new_start + timedelta(minutes=data.duration_minutes)
+    # Held from here until commit so concurrent bookings for this doctor
+    # cannot both pass the conflict check.
+    doctor_found = bool(_lock_doctors(db, [data.doctor_id]))
+    try:
+        _ensure_patient_exists(db, data.patient_id)
+        if not doctor_found:
+            raise HTTPException(status_code=404, detail="Doctor not found.")
 
-    # Fetch candidate existing appointments for same doctor.
-    # We only need ones that start before our new_end to overlap potentially.
-    candidates = db.scalars(
-        select(Appointment).where(
-            Appointment.doctor_id == data.doctor_id,
-            Appointment.start_time_utc < new_end,  # potential overlap
-        )
-    ).all()
-
-    # Overlap rule: new_start < existing_end AND new_end > existing_start
-    for appt in candidates:
-        ex_start = _as_utc(appt.start_time_utc)
-        ex_end = ex_start + timedelta(minutes=appt.duration_minutes)
+        if new_start <= datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=400, detail="Appointment must be scheduled in the future."
+            )
 
-        if new_start < ex_end and new_end > ex_start:
+        if _has_conflict(db, data.doctor_id, new_start, new_end):
             raise HTTPException(
                 status_code=409, detail="Doctor has a conflicting appointment."
             )
+    except HTTPException:
+        db.rollback()  # release the doctor lock right away
+        raise
 
     obj = Appointment(
         patient_id=data.patient_id,
@@ -116,14 +222,202 @@ def create_appointment(db: Session, data: AppointmentCreate) -> Appointment:
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    _bump_day_versions([(obj.doctor_id, obj.start_time_utc)])
+    schedule_index.record(db, [obj])
     return obj
 
 
-def get_appointment(db: Session, appointment_id: int) -> Appointment:
-    appt = db.scalar(select(Appointment).where(Appointment.id == appointment_id))
+def _sweep_conflicts(
+    existing: Sequence[tuple[datetime, datetime]],
+    requested: Iterable[tuple[datetime, datetime, int]],
+) -> dict[int, str]:
+    """
+    Single pass over one doctor's intervals, both sorted by start.
+
+    `existing` are booked (start, end) pairs, `requested` are
+    (start, end, index) batch items. A request is rejected if it overlaps a
+    booked interval or an earlier-starting request that was already
+    accepted; ties go to the lower batch index. Returns index -> reason for
+    the rejected requests.
+    """
+    rejected: dict[int, str] = {}
+    j = 0
+    booked_end: datetime | None = None  # max end of booked rows starting <= start
+    accepted_end: datetime | None = None
+
+    for start, end, index in sorted(requested, key=lambda r: (r[0], r[2])):
+        while j < len(existing) and existing[j][0] <= start:
+            if booked_end is None or existing[j][1] > booked_end:
+                booked_end = existing[j][1]
+            j += 1
+
+        if (booked_end is not None and booked_end > start) or (
+            j < len(existing) and existing[j][0] < end
+        ):
+            rejected[index] = "Doctor has a conflicting appointment."
+        elif accepted_end is not None and accepted_end > start:
+            rejected[index] = "Conflicts with an earlier appointment in this batch."
+        else:
+            accepted_end = end
+    return rejected
+
+
+def create_appointments_bulk(
+    db: Session, items: Sequence[AppointmentCreate]
+) -> AppointmentBulkResult:
+    """
+    Book a batch of appointments, reporting a status per item.
+
+    Items are checked with the same rules and in the same order as
+    create_appointment (400, then 404, then 400 for past slots, then 409),
+    but each lookup runs once for the whole batch: one query for patient
+    ids, one for doctor ids and one for the booked intervals of every
+    affected doctor in the batch's time span. Every doctor in the batch is
+    locked up front, and all accepted items are inserted in the same
+    transaction.
+    """
+    results: list[AppointmentBulkItemResult | None] = [None] * len(items)
+    pending: dict[int, tuple[datetime, datetime]] = {}
+
+    def reject(index: int, status_code: int, detail: str) -> None:
+        results[index] = AppointmentBulkItemResult(
+            index=index, status_code=status_code, detail=detail
+        )
+        pending.pop(index, None)
+
+    for index, data in enumerate(items):
+        # AppointmentCreate has already rejected naive times and bad
+        # durations for the whole batch with a 422.
+        if data.patient_id <= 0 or data.doctor_id <= 0:
+            reject(index, 400, "patient_id and doctor_id must be positive integers.")
+            continue
+        start = _as_utc(data.start_time_utc)
+        pending[index] = (start, start + timedelta(minutes=data.duration_minutes))
+
+    patient_ids = {items[i].patient_id for i in pending}
+    doctor_ids = {items[i].doctor_id for i in pending}
+    known_doctors = _lock_doctors(db, doctor_ids)
+    known_patients = _existing_ids(db, Patient, patient_ids, patient_cache)
+
+    now_utc = datetime.now(timezone.utc)
+    for index, (start, _) in list(pending.items()):
+        if items[index].patient_id not in known_patients:
+            reject(index, 404, "Patient not found.")
+        elif items[index].doctor_id not in known_doctors:
+            reject(index, 404, "Doctor not found.")
+        elif start <= now_utc:
+            reject(index, 400, "Appointment must be scheduled in the future.")
+
+    requested: dict[int, list[tuple[datetime, datetime, int]]] = defaultdict(list)
+    for index, (start, end) in pending.items():
+        requested[items[index].doctor_id].append((start, end, index))
+
+    if requested:
+        span_start = min(start for start, _ in pending.values())
+        span_end = max(end for _, end in pending.values())
+        booked: dict[int, list[tuple[datetime, datetime]]] = defaultdict(list)
+        rows = db.execute(
+            select(
+                Appointment.doctor_id,
+                Appointment.start_time_utc,
+                Appointment.end_time_utc,
+            )
+            .where(
+                Appointment.doctor_id.in_(requested.keys()),
+                Appointment.start_time_utc
+                > span_start - timedelta(minutes=MAX_DURATION_MINUTES),
+                Appointment.start_time_utc < span_end,
+                Appointment.end_time_utc > span_start,
+            )
+            .order_by(Appointment.doctor_id, Appointment.start_time_utc)
+        )
+        for doctor_id, start, end in rows:
+            booked[doctor_id].append((_as_utc(start), _as_utc(end)))
+
+        for doctor_id, doctor_requests in requested.items():
+            rejected = _sweep_conflicts(booked[doctor_id], doctor_requests)
+            for index, detail in rejected.items():
+                reject(index, 409, detail)
+
+    created: dict[int, Appointment] = {
+        index: Appointment(
+            patient_id=items[index].patient_id,
+            doctor_id=items[index].doctor_id,
+            start_time_utc=start,  # stored in UTC
+            duration_minutes=items[index].duration_minutes,
+        )
+        for index, (start, _) in pending.items()
+    }
+    if created:
+        db.add_all(created.values())
+        db.flush()
+        # Read the ids before commit expires the objects; reading them after
+        # would refresh each object with its own SELECT.
+        ids = [obj.id for obj in created.values()]
+        db.commit()
+        # Reload the committed rows (created_at) in one round trip.
+        db.scalars(select(Appointment).where(Appointment.id.in_(ids))).all()
+        _bump_day_versions(
+            (obj.doctor_id, obj.start_time_utc) for obj in created.values()
+        )
+        schedule_index.record(db, created.values())
+    else:
+        db.rollback()  # nothing to insert; release the doctor locks
+
+    for index, obj in created.items():
+        results[index] = AppointmentBulkItemResult(
+            index=index,
+            status_code=201,
+            appointment=AppointmentRead.model_validate(obj, from_attributes=True),
+        )
+    return AppointmentBulkResult(created=len(created), results=results)
+
+
+def parse_expand(value: Optional[str]) -> frozenset[str]:
+    """`?expand=patient,doctor` -> {"patient", "doctor"}; 400 on unknown names."""
+    if not value:
+        return frozenset()
+    requested = frozenset(part.strip() for part in value.split(",") if part.strip())
+    unknown = requested - EXPANDABLE
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown expand value(s): {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(sorted(EXPANDABLE))}.",
+        )
+    return requested
+
+
+def _with_expanded(stmt, expand: Collection[str]):
+    # One extra SELECT ... WHERE id IN (...) per relationship, however many
+    # appointments the page holds.
+    for name in sorted(expand):
+        stmt = stmt.options(selectinload(getattr(Appointment, name)))
+    return stmt
+
+
+def _to_read(appt: Appointment, expand: Collection[str]) -> AppointmentExpandedRead:
+    # Built from a dict so that relationships which were not requested stay
+    # unset (and out of the response) instead of being lazy-loaded.
+    data = {name: getattr(appt, name) for name in AppointmentRead.model_fields}
+    if "patient" in expand:
+        data["patient"] = PatientRead.model_validate(appt.patient, from_attributes=True)
+    if "doctor" in expand:
+        data["doctor"] = DoctorRead.model_validate(appt.doctor, from_attributes=True)
+    return AppointmentExpandedRead.model_validate(data)
+
+
+def get_appointment(
+    db: Session, appointment_id: int, expand: Collection[str] = ()
+) -> AppointmentExpandedRead:
+    appt = db.scalar(
+        _with_expanded(
+            select(Appointment).where(Appointment.id == appointment_id), expand
+        )
+    )
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found.")
-    return appt
+    return _to_read(appt, expand)
 
 
 def list_appointments(db: Session) -> List[Appointment]:
@@ -132,21 +426,14 @@ def list_appointments(db: Session) -> List[Appointment]:
     ).all()
 
 
-def list_appointments_by_date(
-    db: Session, target_date: date, doctor_id: Optional[int] = None
-) -> List[Appointment]:
-    """
-    PDF-required contract:
-      GET /appointments?date=YYYY-MM-DD&doctor_id(optional)
-
-    We interpret "date" in UTC day boundaries.
-    """
+def _on_date(stmt: Select, target_date: date, doctor_id: Optional[int]) -> Select:
+    # "date" is a UTC day.
     start_dt = datetime(
         target_date.year, target_date.month, target_date.day, tzinfo=timezone.utc
     )
     end_dt = start_dt + timedelta(days=1)
 
-    stmt = select(Appointment).where(
+    stmt = stmt.where(
         Appointment.start_time_utc >= start_dt,
         Appointment.start_time_utc < end_dt,
     )
@@ -158,5 +445,42 @@ def list_appointments_by_date(
             )
         stmt = stmt.where(Appointment.doctor_id == doctor_id)
 
-    stmt = stmt.order_by(Appointment.start_time_utc.asc())
-    return db.scalars(stmt).all()
+    return stmt.order_by(Appointment.start_time_utc.asc())
+
+
+def list_appointments_by_date(
+    db: Session,
+    target_date: date,
+    doctor_id: Optional[int] = None,
+    expand: Collection[str] = (),
+) -> List[AppointmentExpandedRead]:
+    """
+    PDF-required contract:
+      GET /appointments?date=YYYY-MM-DD&doctor_id(optional)
+
+    We interpret "date" in UTC day boundaries. `expand` embeds the patient
+    and/or doctor of each row, loaded with one query per relationship.
+    """
+    stmt = _with_expanded(_on_date(select(Appointment), target_date, doctor_id), expand)
+    return [_to_read(appt, expand) for appt in db.scalars(stmt)]
+
+
+def appointment_day_fingerprint(
+    db: Session, target_date: date, doctor_id: Optional[int] = None
+) -> str:
+    """Fingerprint of one day's appointments (of one doctor) for the
+    GET /appointments?date= ETag; an index-only aggregate over the day."""
+    stmt = _on_date(
+        select(func.count(), func.max(Appointment.id)), target_date, doctor_id
+    ).order_by(None)
+    count, max_id = db.execute(stmt).one()
+    return fingerprint(count, max_id)
+
+
+def list_appointment_rows_by_date(
+    db: Session, target_date: date, doctor_id: Optional[int] = None
+) -> List[Row]:
+    """list_appointments_by_date as AppointmentRead-shaped column rows for
+    encode_rows()."""
+    stmt = select(*read_columns(AppointmentRead, Appointment))
+    return db.execute(_on_date(stmt, target_date, doctor_id)).all()
@@ -0,0 +1,292 @@
+"""
+Free-slot computation for doctors.
+
+Booked intervals are loaded once per request from ix_doctor_start_end and
+subtracted from the working-hour windows in a single sweep. Slots are then
+cut out of each free gap arithmetically, so the cost grows with the number
+of gaps and slots returned, not with the number of candidate slots tested.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.schemas.availability_pydantic import (
+    AvailabilityRead,
+    DoctorSlotRead,
+    EarliestSlotsRead,
+    SlotRead,
+)
+from src.services.appointment_service import (
+    MAX_DURATION_MINUTES,
+    MIN_DURATION_MINUTES,
+    _as_utc,
+    _validate_duration,
+    schedule_index,
+)
+from src.services.doctor_service import get_doctor
+
+MAX_AVAILABILITY_DAYS = 90
+MAX_EARLIEST_SLOTS = 50
+# The earliest-slot search loads busy intervals this many days at a time and
+# only widens the horizon when it has not found enough slots yet.
+SEARCH_WINDOW_DAYS = 7
+SLOT_GRANULARITY = timedelta(minutes=MIN_DURATION_MINUTES)
+
+Interval = tuple[datetime, datetime]
+
+
+def working_windows(
+    start_date: date, end_date: date, work_start: time, work_end: time
+) -> Iterator[Interval]:
+    """[work_start, work_end) in UTC for every day from start_date to end_date."""
+    day = start_date
+    while day <= end_date:
+        yield (
+            datetime.combine(day, work_start, tzinfo=timezone.utc),
+            datetime.combine(day, work_end, tzinfo=timezone.utc),
+        )
+        day += timedelta(days=1)
+
+
+def free_gaps(
+    windows: Iterable[Interval], busy: Sequence[Interval]
+) -> Iterator[tuple[datetime, datetime, datetime]]:
+    """
+    Subtract `busy` (sorted by start) from `windows` (sorted, disjoint).
+    Yields (gap_start, gap_end, window_start); the window start is the
+    anchor that slot boundaries are aligned to.
+    """
+    j = 0
+    for window_start, window_end in windows:
+        # Busy intervals that ended before this window cannot matter again.
+        while j < len(busy) and busy[j][1] <= window_start:
+            j += 1
+        cursor = window_start
+        k = j
+        while k < len(busy) and busy[k][0] < window_end:
+            busy_start, busy_end = busy[k]
+            if busy_start > cursor:
+                yield cursor, busy_start, window_start
+            cursor = max(cursor, busy_end)
+            k += 1
+        if cursor < window_end:
+            yield cursor, window_end, window_start
+
+
+def slots_in_gaps(
+    gaps: Iterable[tuple[datetime, datetime, datetime]],
+    slot: timedelta,
+    not_before: datetime,
+    granularity: timedelta = SLOT_GRANULARITY,
+) -> Iterator[Interval]:
+    """
+    Back-to-back slots of length `slot` filling each gap, starting at the
+    first `granularity` boundary (counted from the window start) inside it.
+    """
+    for gap_start, gap_end, anchor in gaps:
+        gap_start = max(gap_start, not_before)
+        first = anchor + -((anchor - gap_start) // granularity) * granularity
+        for i in range(max(0, (gap_end - first) // slot)):
+            start = first + i * slot
+            yield start, start + slot
+
+
+def booked_intervals_by_doctor(
+    db: Session,
+    doctor_ids: Iterable[int],
+    range_start: datetime,
+    range_end: datetime,
+) -> dict[int, list[Interval]]:
+    """
+    Booked (start, end) pairs overlapping the range for each doctor, sorted
+    by start. Doctors in the schedule index are answered from memory, the
+    rest from one range query on ix_doctor_start_end.
+    """
+    doctor_ids = list(doctor_ids)
+    busy: dict[int, list[Interval]] = defaultdict(list)
+    busy.update(schedule_index.cached_intervals(doctor_ids, range_start, range_end))
+    doctor_ids = [doctor_id for doctor_id in doctor_ids if doctor_id not in busy]
+    if not doctor_ids:
+        return busy
+    rows = db.execute(
+        select(
+            Appointment.doctor_id,
+            Appointment.start_time_utc,
+            Appointment.end_time_utc,
+        )
+        .where(
+            Appointment.doctor_id.in_(doctor_ids),
+            Appointment.start_time_utc
+            > range_start - timedelta(minutes=MAX_DURATION_MINUTES),
+            Appointment.start_time_utc < range_end,
+            Appointment.end_time_utc > range_start,
+        )
+        .order_by(Appointment.doctor_id, Appointment.start_time_utc)
+    )
+    for doctor_id, start, end in rows:
+        busy[doctor_id].append((_as_utc(start), _as_utc(end)))
+    return busy
+
+
+def booked_intervals(
+    db: Session, doctor_id: int, range_start: datetime, range_end: datetime
+) -> list[Interval]:
+    """Booked (start, end) pairs overlapping the range, sorted by start.
+    Loads the doctor into the schedule index when the range is inside it."""
+    indexed = schedule_index.intervals(db, doctor_id, range_start, range_end)
+    if indexed is not None:
+        return indexed
+    return booked_intervals_by_doctor(db, [doctor_id], range_start, range_end)[
+        doctor_id
+    ]
+
+
+def _validate_request(
+    start_date: date,
+    end_date: date,
+    slot_minutes: int,
+    work_start: time,
+    work_end: time,
+) -> None:
+    _validate_duration(slot_minutes)
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=400, detail="end_date must not be before start_date."
+        )
+    if (end_date - start_date).days >= MAX_AVAILABILITY_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range must not exceed {MAX_AVAILABILITY_DAYS} days.",
+        )
+    if work_end <= work_start:
+        raise HTTPException(
+            status_code=400, detail="work_end must be after work_start."
+        )
+
+
+def get_availability(
+    db: Session,
+    doctor_id: int,
+    start_date: date,
+    end_date: date,
+    slot_minutes: int = 30,
+    work_start: time = time(9, 0),
+    work_end: time = time(17, 0),
+) -> AvailabilityRead:
+    """
+    Free slots of `slot_minutes` for one doctor between start_date and
+    end_date (inclusive, UTC days) within the daily working hours. Past
+    slots are never offered.
+    """
+    _validate_request(start_date, end_date, slot_minutes, work_start, work_end)
+    doctor = get_doctor(db, doctor_id)
+
+    slots: list[SlotRead] = []
+    if doctor.is_active:
+        windows = list(working_windows(start_date, end_date, work_start, work_end))
+        busy = booked_intervals(db, doctor_id, windows[0][0], windows[-1][1])
+        slots = [
+            SlotRead(start_time_utc=start, end_time_utc=end)
+            for start, end in slots_in_gaps(
+                free_gaps(windows, busy),
+                timedelta(minutes=slot_minutes),
+                datetime.now(timezone.utc),
+            )
+        ]
+    return AvailabilityRead(
+        doctor_id=doctor_id,
+        start_date=start_date,
+        end_date=end_date,
+        slot_minutes=slot_minutes,
+        slots=slots,
+    )
+
+
+def _tag_slots(
+    doctor_id: int, slots: Iterable[Interval]
+) -> Iterator[tuple[datetime, int, datetime]]:
+    for start, end in slots:
+        yield start, doctor_id, end
+
+
+def find_earliest_slots(
+    db: Session,
+    specialization: str,
+    not_before: datetime,
+    slot_minutes: int = 30,
+    limit: int = 5,
+    work_start: time = time(9, 0),
+    work_end: time = time(17, 0),
+) -> EarliestSlotsRead:
+    """
+    The `limit` earliest free slots across all active doctors of a
+    specialization, ordered by start time (then doctor id).
+
+    The horizon is searched SEARCH_WINDOW_DAYS at a time. For each window the
+    busy intervals of every candidate doctor are loaded with one query, each
+    doctor's free slots are generated lazily and the per-doctor streams are
+    merged with a heap, so only as many slots as requested are materialized
+    and no doctor's history outside the window is read.
+    """
+    _validate_duration(slot_minutes)
+    if work_end <= work_start:
+        raise HTTPException(
+            status_code=400, detail="work_end must be after work_start."
+        )
+    if not 1 <= limit <= MAX_EARLIEST_SLOTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"limit must be between 1 and {MAX_EARLIEST_SLOTS}.",
+        )
+
+    doctor_ids = list(
+        db.scalars(
+            select(Doctor.id)
+            .where(Doctor.specialization == specialization, Doctor.is_active)
+            .order_by(Doctor.id)
+        )
+    )
+    not_before = max(_as_utc(not_before), datetime.now(timezone.utc))
+    slot = timedelta(minutes=slot_minutes)
+
+    found: list[DoctorSlotRead] = []
+    first_day = not_before.date()
+    last_day = first_day + timedelta(days=MAX_AVAILABILITY_DAYS - 1)
+    window_first = first_day
+    while doctor_ids and len(found) < limit and window_first <= last_day:
+        window_last = min(
+            window_first + timedelta(days=SEARCH_WINDOW_DAYS - 1), last_day
+        )
+        windows = list(working_windows(window_first, window_last, work_start, work_end))
+        busy = booked_intervals_by_doctor(db, doctor_ids, windows[0][0], windows[-1][1])
+        streams = [
+            _tag_slots(
+                doctor_id,
+                slots_in_gaps(
+                    free_gaps(windows, busy.get(doctor_id, [])), slot, not_before
+                ),
+            )
+            for doctor_id in doctor_ids
+        ]
+        for start, doctor_id, end in islice(heapq.merge(*streams), limit - len(found)):
+            found.append(
+                DoctorSlotRead(
+                    doctor_id=doctor_id, start_time_utc=start, end_time_utc=end
+                )
+            )
+        window_first = window_last + timedelta(days=1)
+
+    return EarliestSlotsRead(
+        specialization=specialization, slot_minutes=slot_minutes, slots=found
+    )
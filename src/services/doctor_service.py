@@ -1,9 +1,17 @@
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import Row, Select, func, select
 from sqlalchemy.orm import Session
 
+from src.cache import EntityCache
+from src.database import is_replica
 from src.models.doctor import Doctor
-from src.schemas.doctor_pydantic import DoctorCreate
+from src.pagination import DEFAULT_PAGE_SIZE, keyset_page
+from src.schemas.doctor_pydantic import DoctorCreate, DoctorRead
+from src.serialization import read_columns
+from src.versions import DOCTORS_SCOPE, fingerprint, list_versions
+
+# Read models of doctors by id; see src/cache.py for cross-worker invalidation.
+doctor_cache: EntityCache[DoctorRead] = EntityCache("doctors")
 
 
 def create_doctor(db: Session, doctor_create: DoctorCreate) -> Doctor:
@@ -15,15 +23,60 @@ def create_doctor(db: Session, doctor_create: DoctorCreate) -> Doctor:
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    doctor_cache.invalidate(obj.id)
+    list_versions.bump(DOCTORS_SCOPE)
     return obj
 
 
-def get_doctor(db: Session, doctor_id: int) -> Doctor:
+def _load_doctor(db: Session, doctor_id: int) -> DoctorRead | None:
     obj = db.get(Doctor, doctor_id)
+    if not obj:
+        return None
+    return DoctorRead.model_validate(obj, from_attributes=True)
+
+
+def get_doctor(db: Session, doctor_id: int) -> DoctorRead:
+    # A replica's copy may lag, so it is served but never cached.
+    obj = doctor_cache.get_or_load(
+        doctor_id, lambda: _load_doctor(db, doctor_id), fill=not is_replica(db)
+    )
     if not obj:
         raise HTTPException(status_code=404, detail="Doctor not found.")
     return obj
 
 
-def list_doctors(db: Session) -> list[Doctor]:
-    return list(db.scalars(select(Doctor).order_by(Doctor.id)))
+def list_doctors(
+    db: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    specialization: str | None = None,
+) -> tuple[list[Doctor], str | None]:
+    """
+    One keyset page of doctors by id, plus the cursor for the next page.
+    Filtering by specialization uses ix_doctor_specialization_active.
+    """
+    stmt = _filter_doctors(select(Doctor), specialization)
+    return keyset_page(db, stmt, Doctor.id, limit, after)
+
+
+def list_doctor_rows(
+    db: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    specialization: str | None = None,
+) -> tuple[list[Row], str | None]:
+    """list_doctors as DoctorRead-shaped column rows for encode_rows()."""
+    stmt = _filter_doctors(select(*read_columns(DoctorRead, Doctor)), specialization)
+    return keyset_page(db, stmt, Doctor.id, limit, after, as_rows=True)
+
+
+def doctor_list_fingerprint(db: Session) -> str:
+    """Fingerprint of the doctors table for the GET /doctors ETag."""
+    count, max_id = db.execute(select(func.count(), func.max(Doctor.id))).one()
+    return fingerprint(count, max_id)
+
+
+def _filter_doctors(stmt: Select, specialization: str | None) -> Select:
+    if specialization is not None:
+        stmt = stmt.where(Doctor.specialization == specialization)
+    return stmt
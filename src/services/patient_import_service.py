@@ -0,0 +1,186 @@
+"""
+Bulk patient import from CSV or NDJSON.
+
+Records are consumed lazily and written in fixed-size chunks, so memory use
+depends on the chunk size, not on the size of the input.
+"""
+
+import codecs
+import csv
+import json
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.models.patient import Patient
+from src.schemas.patient_pydantic import (
+    PatientCreate,
+    PatientImportReject,
+    PatientImportReport,
+)
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_REJECTS = 1000
+
+# (row number, parsed record or None, parse error or None)
+Record = tuple[int, dict[str, Any] | None, str | None]
+
+
+def iter_text_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode a stream of UTF-8 byte chunks into lines (endings kept)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def iter_ndjson_records(lines: Iterable[str]) -> Iterator[Record]:
+    for row, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "Each line must be a JSON object."
+            continue
+        yield row, record, None
+
+
+def iter_csv_records(lines: Iterable[str]) -> Iterator[Record]:
+    """CSV with a header row; empty cells are treated as missing values."""
+    reader = csv.DictReader(lines)
+    for row, record in enumerate(reader, start=1):
+        yield row, {k: (v if v != "" else None) for k, v in record.items()}, None
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[Record]:
+    if fmt == "csv":
+        return iter_csv_records(lines)
+    return iter_ndjson_records(lines)
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}"
+        for err in exc.errors()
+    )
+
+
+def _insert_rows(db: Session, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Multi-row insert of a chunk. If a concurrent writer claimed one of the
+    emails after our check, fall back to row-by-row savepoints so only the
+    duplicates are rejected. Returns the rows that hit the unique constraint.
+    """
+    try:
+        db.execute(insert(Patient), rows)
+        db.commit()
+        return []
+    except IntegrityError:
+        db.rollback()
+
+    duplicates = []
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(Patient), [row])
+        except IntegrityError:
+            duplicates.append(row)
+    db.commit()
+    return duplicates
+
+
+def import_chunk(db: Session, chunk: list[Record], report: PatientImportReport) -> None:
+    def reject(row: int, detail: str) -> None:
+        report.rejected += 1
+        if len(report.rejects) < MAX_REPORTED_REJECTS:
+            report.rejects.append(PatientImportReject(row=row, detail=detail))
+
+    candidates: dict[str, tuple[int, dict[str, Any]]] = {}
+    for row, record, error in chunk:
+        report.processed += 1
+        if error is not None:
+            reject(row, error)
+            continue
+        try:
+            data = PatientCreate.model_validate(record)
+        except ValidationError as exc:
+            reject(row, _validation_detail(exc))
+            continue
+        if data.phone is None:
+            reject(row, "phone: Field required")
+            continue
+
+        email = data.email.strip().lower()
+        if email in candidates:
+            reject(row, "Duplicate email in import.")
+            continue
+        candidates[email] = (
+            row,
+            {
+                "first_name": data.first_name,
+                "last_name": data.last_name,
+                "email": email,
+                "phone": data.phone,
+            },
+        )
+
+    if not candidates:
+        return
+
+    # One lookup against uq_patient_email for the whole chunk.
+    existing = set(
+        db.scalars(select(Patient.email).where(Patient.email.in_(candidates.keys())))
+    )
+    for email in existing:
+        row, _ = candidates.pop(email)
+        reject(row, "Patient with this email already exists.")
+
+    if not candidates:
+        return
+
+    rows = [values for _, values in candidates.values()]
+    duplicates = _insert_rows(db, rows)
+    for values in duplicates:
+        row, _ = candidates[values["email"]]
+        reject(row, "Patient with this email already exists.")
+    report.inserted += len(rows) - len(duplicates)
+
+
+def iter_chunks(
+    records: Iterable[Record], chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Iterator[list[Record]]:
+    records = iter(records)
+    while chunk := list(islice(records, chunk_size)):
+        yield chunk
+
+
+def import_patients(
+    db: Session,
+    records: Iterable[Record],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> PatientImportReport:
+    """
+    Validate records with PatientCreate and insert them chunk by chunk.
+
+    Each chunk costs one SELECT for its emails and one multi-row INSERT,
+    committed on its own, so a failure part way through keeps the chunks
+    already written. Per-row rejects are counted in full but only the first
+    MAX_REPORTED_REJECTS are listed.
+    """
+    report = PatientImportReport()
+    for chunk in iter_chunks(records, chunk_size):
+        import_chunk(db, chunk, report)
+    return report
@@ -1,10 +1,31 @@
+import re
+
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import Row, case, column, or_, select, table, text
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from src.models.patient import Patient
-from src.schemas.patient_pydantic import PatientCreate
+from src.cache import EntityCache
+from src.database import is_replica
+from src.models.patient import PATIENT_FTS_TABLE, Patient
+from src.pagination import DEFAULT_PAGE_SIZE, keyset_page
+from src.schemas.patient_pydantic import PatientCreate, PatientRead
+from src.serialization import read_columns
+
+# Read models of patients by id; see src/cache.py for cross-worker invalidation.
+patient_cache: EntityCache[PatientRead] = EntityCache("patients")
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Matches ranked per search on SQLite (see _fts_search); at least
+# MAX_SEARCH_LIMIT, and small enough to rank in a few milliseconds.
+SEARCH_CANDIDATES = 500
+# Search terms are runs of letters and digits, as FTS5's unicode61 tokenizer
+# splits them: "o'brien" is "o" and "brien", "ana.ng@x.com" is "ana" and
+# "ng". An email domain is dropped, since only the local part is indexed.
+_SEARCH_TERM = re.compile(r"[^\W_]+")
+_EMAIL_DOMAIN = re.compile(r"@\S*")
+_patients_fts = table(PATIENT_FTS_TABLE, column("rowid"))
 
 
 def create_patient(db: Session, patient_create: PatientCreate) -> Patient:
@@ -35,15 +56,102 @@ def create_patient(db: Session, patient_create: PatientCreate) -> Patient:
             detail="Duplicate email",
         )
     db.refresh(obj)
+    patient_cache.invalidate(obj.id)
     return obj
 
 
-def get_patient(db: Session, patient_id: int) -> Patient:
+def _load_patient(db: Session, patient_id: int) -> PatientRead | None:
     obj = db.get(Patient, patient_id)
+    if obj is None:
+        return None
+    return PatientRead.model_validate(obj, from_attributes=True)
+
+
+def get_patient(db: Session, patient_id: int) -> PatientRead:
+    # A replica's copy may lag, so it is served but never cached.
+    obj = patient_cache.get_or_load(
+        patient_id, lambda: _load_patient(db, patient_id), fill=not is_replica(db)
+    )
     if obj is None:
         raise HTTPException(status_code=404, detail="Patient not found.")
     return obj
 
 
-def list_patients(db: Session) -> list[Patient]:
-    return list(db.scalars(select(Patient).order_by(Patient.id)))
+def list_patients(
+    db: Session, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None
+) -> tuple[list[Patient], str | None]:
+    """One keyset page of patients by id, plus the cursor for the next page."""
+    return keyset_page(db, select(Patient), Patient.id, limit, after)
+
+
+def list_patient_rows(
+    db: Session, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None
+) -> tuple[list[Row], str | None]:
+    """list_patients as PatientRead-shaped column rows for encode_rows()."""
+    stmt = select(*read_columns(PatientRead, Patient))
+    return keyset_page(db, stmt, Patient.id, limit, after, as_rows=True)
+
+
+def _search_terms(query: str) -> list[str]:
+    return _SEARCH_TERM.findall(_EMAIL_DOMAIN.sub(" ", query.lower()))
+
+
+def _search_order(first_term: str) -> tuple:
+    # By the column the first term starts (last name, first name, email),
+    # then alphabetically.
+    rank = case(
+        (Patient.last_name.like(f"{first_term}%"), 0),
+        (Patient.first_name.like(f"{first_term}%"), 1),
+        else_=2,
+    )
+    return rank, Patient.last_name, Patient.first_name, Patient.id
+
+
+def _fts_search(terms: list[str]):
+    # Every term must prefix-match a token in some column. Only the first
+    # SEARCH_CANDIDATES matches by rowid are ranked: FTS5 streams those
+    # without visiting the rest, where a bm25 score has to count every match
+    # first. They are ranked like _prefix_search.
+    match = " ".join(f'"{term}"*' for term in terms)
+    candidates = (
+        select(_patients_fts.c.rowid)
+        .where(text(f"{PATIENT_FTS_TABLE} MATCH :match").bindparams(match=match))
+        .limit(SEARCH_CANDIDATES)
+        .subquery()
+    )
+    return (
+        select(*read_columns(PatientRead, Patient))
+        .join(candidates, candidates.c.rowid == Patient.id)
+        .order_by(*_search_order(terms[0]))
+    )
+
+
+def _prefix_search(terms: list[str]):
+    # Every term must prefix one of the columns; each LIKE 'term%' is a
+    # range scan on ix_patient_last_first, ix_patient_first_name or
+    # uq_patient_email. Terms never contain LIKE wildcards (see
+    # _SEARCH_TERM).
+    columns = (Patient.last_name, Patient.first_name, Patient.email)
+    stmt = select(*read_columns(PatientRead, Patient))
+    for term in terms:
+        stmt = stmt.where(or_(*(col.like(f"{term}%") for col in columns)))
+    return stmt.order_by(*_search_order(terms[0]))
+
+
+def search_patient_rows(
+    db: Session, query: str, limit: int = DEFAULT_SEARCH_LIMIT
+) -> list[Row]:
+    """
+    Patients whose last name, first name or email start with the words of
+    `query`, best match first, as PatientRead-shaped column rows for
+    encode_rows(). SQLite answers from the vamsi_patients_fts index; other
+    databases from prefix range scans on the name and email indexes.
+    """
+    terms = _search_terms(query)
+    if not terms:
+        return []
+    if db.get_bind().dialect.name == "sqlite":
+        stmt = _fts_search(terms)
+    else:
+        stmt = _prefix_search(terms)
+    return db.execute(stmt.limit(limit)).all()
@@ -0,0 +1,173 @@
+"""
+Slow-query log.
+
+Statements on the instrumented engines that take at least
+SLOW_QUERY_THRESHOLD_MS go into a ring buffer of the last
+SLOW_QUERY_LOG_SIZE entries. Each entry holds the SQL, its bound
+parameters with PII redacted, the duration and the endpoint that ran it.
+Reads and writes also get the database's plan: `EXPLAIN QUERY PLAN` on
+SQLite, `EXPLAIN` elsewhere. The plan runs on the same connection, right
+after the statement, with the same parameters, except for streamed
+results (`stream_results`, `yield_per`): their cursor is still open on that
+connection, so they go unexplained. Plans are cached per
+statement text, so a hot slow query is explained once rather than on
+every repetition. GET /admin/slow-queries lists the buffer.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from src.metrics import current_endpoint
+from src.schemas.admin_pydantic import SlowQueryRead
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+PLAN_CACHE_SIZE = 256
+# Parameters bound to these columns never leave the process in clear text.
+# `match` is the patient search's FTS query, made of names and emails;
+# `response_body` is a stored idempotent response, such as a patient.
+PII_FIELDS = frozenset(
+    {"email", "phone", "first_name", "last_name", "match", "response_body"}
+)
+REDACTED = "<redacted>"
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+MAX_LOGGED_PARAMETER_SETS = 5
+
+# `email_1`, and `email_1_1`, `email_1_2`, ... once an IN list is expanded.
+_BIND_SUFFIX = re.compile(r"(_\d+)+$")
+
+
+def _redact(params: dict[str, Any]) -> dict[str, Any]:
+    return {
+        name: REDACTED if _BIND_SUFFIX.sub("", name) in PII_FIELDS else value
+        for name, value in params.items()
+    }
+
+
+def _loggable(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _parameters(context, executemany: bool) -> list[dict[str, Any]] | None:
+    """Bound parameters by name, redacted; None for raw driver SQL, where
+    the names (and so the PII columns) are unknown."""
+    compiled = getattr(context, "compiled_parameters", None)
+    if not compiled or getattr(context, "compiled", None) is None:
+        return None
+    sets = compiled[:MAX_LOGGED_PARAMETER_SETS] if executemany else compiled[:1]
+    return [
+        {name: _loggable(value) for name, value in _redact(params).items()}
+        for params in sets
+    ]
+
+
+class SlowQueryLog:
+    def __init__(self, maxlen: int = SLOW_QUERY_LOG_SIZE):
+        self._lock = threading.Lock()
+        self._entries: deque[SlowQueryRead] = deque(maxlen=maxlen)
+        self._plans: OrderedDict[str, list[str]] = OrderedDict()
+
+    def add(self, entry: SlowQueryRead) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self, limit: int | None = None) -> list[SlowQueryRead]:
+        """Newest first."""
+        with self._lock:
+            newest = list(reversed(self._entries))
+        return newest[:limit] if limit is not None else newest
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+    def cached_plan(self, statement: str) -> list[str] | None:
+        with self._lock:
+            plan = self._plans.get(statement)
+            if plan is not None:
+                self._plans.move_to_end(statement)
+            return plan
+
+    def cache_plan(self, statement: str, plan: list[str]) -> None:
+        with self._lock:
+            self._plans[statement] = plan
+            if len(self._plans) > PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+
+
+slow_query_log = SlowQueryLog()
+
+
+def _streams(context) -> bool:
+    """Whether the statement's rows are still being fetched from an open
+    (possibly server-side) cursor, which EXPLAIN must not disturb."""
+    options = getattr(context, "execution_options", None) or {}
+    return bool(options.get("stream_results") or options.get("yield_per"))
+
+
+def _explain(conn, statement: str, parameters) -> list[str] | None:
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    plan = slow_query_log.cached_plan(statement)
+    if plan is not None:
+        return plan
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        plan = [" | ".join(str(col) for col in row) for row in cursor.fetchall()]
+    except Exception as exc:  # the plan is best effort; never fail the request
+        plan = [f"EXPLAIN failed: {exc}"]
+    finally:
+        cursor.close()
+    slow_query_log.cache_plan(statement, plan)
+    return plan
+
+
+def record_slow_queries(engine: Engine) -> None:
+    """Log slow statements on a sync Engine (for an AsyncEngine pass its
+    `sync_engine`)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+        if elapsed_ms < SLOW_QUERY_THRESHOLD_MS:
+            return
+        slow_query_log.add(
+            SlowQueryRead(
+                recorded_at=datetime.now(timezone.utc),
+                duration_ms=round(elapsed_ms, 3),
+                endpoint=current_endpoint(),
+                statement=statement,
+                parameters=_parameters(context, executemany),
+                executemany=executemany,
+                plan=(
+                    None
+                    if executemany or _streams(context)
+                    else _explain(conn, statement, parameters)
+                ),
+            )
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None:
+            starts = context.connection.info.get("slow_query_start")
+            if starts:
+                starts.pop()
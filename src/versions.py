@@ -0,0 +1,166 @@
+"""
+Versions of list endpoint results, shared by the workers on a host.
+
+Writes that change what a list endpoint returns bump a scope, such as
+`doctors` or `appointments:2026-10-19:42`, by appending it to a version log
+in ENTITY_CACHE_DIR. The version of a scope is the log position just after
+its last bump, prefixed with a random token written when the log file was
+created. Every worker reading the log therefore derives the same version
+without coordinating. A replaced log changes every version at once.
+
+The log only sees writes made by the app on this host. The ETag therefore
+also carries a fingerprint of the rows in scope (their count and highest
+id, read with one indexed aggregate), so rows inserted or deleted by
+anything else (src/generate_data.py, a script, another host) still change
+it. An UPDATE made outside the app is not seen.
+
+GET /doctors and GET /appointments?date= send the ETag and answer a
+matching If-None-Match with 304 before running the list query.
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+
+from src.cache import ENTITY_CACHE_DIR
+
+LIST_ETAGS_ENABLED = os.getenv("LIST_ETAGS_ENABLED", "1").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+MAX_LOG_BYTES = 1 << 20
+
+DOCTORS_SCOPE = "doctors"
+
+
+def appointment_day_scope(day: date, doctor_id: int | None = None) -> str:
+    """Scope of GET /appointments?date=`day`, optionally for one doctor."""
+    scope = f"appointments:{day.isoformat()}"
+    return scope if doctor_id is None else f"{scope}:{doctor_id}"
+
+
+def fingerprint(count: int, max_id: int | None) -> str:
+    """Changes whenever a row is inserted into or deleted from a scope."""
+    return f"{count:x}-{max_id or 0:x}"
+
+
+def if_none_match(header: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison)."""
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+class VersionLog:
+    """
+    Append-only file of `scope timestamp` lines after a `#token` header.
+    Appends are single short writes with O_APPEND, as in InvalidationLog.
+    Past MAX_LOG_BYTES a writer swaps in a fresh file with a new token.
+    """
+
+    def __init__(self, path: Path, enabled: bool = LIST_ETAGS_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._inode: int | None = None
+        self._offset = 0
+        self._token = "0"
+        # scope -> (log position after its last bump, time of that bump)
+        self._bumped: dict[str, tuple[int, float]] = {}
+
+    def _new_file(self, replace: bool) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fresh = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}.tmp")
+        fresh.write_text(f"#{uuid.uuid4().hex}\n")
+        try:
+            if replace:
+                os.replace(fresh, self.path)
+            else:
+                os.link(fresh, self.path)
+        except FileExistsError:
+            pass  # another worker created it first
+        finally:
+            fresh.unlink(missing_ok=True)
+
+    def bump(self, *scopes: str) -> None:
+        """Record that the results of `scopes` changed; call after commit."""
+        if not self.enabled or not scopes:
+            return
+        try:
+            if self.path.stat().st_size > MAX_LOG_BYTES:
+                self._new_file(replace=True)
+        except FileNotFoundError:
+            self._new_file(replace=False)
+        # Seconds truncated to the millisecond: a stamp rounded up would lie
+        # in the future and keep etag() from treating the bump as settled.
+        ms = time.time_ns() // 1_000_000
+        stamp = f"{ms // 1000}.{ms % 1000:03d}"
+        data = "".join(f"{scope} {stamp}\n" for scope in scopes).encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def reset(self) -> None:
+        """Change every version at once, e.g. after a bulk load."""
+        if self.enabled:
+            self._new_file(replace=True)
+
+    def _poll(self) -> None:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            self._inode, self._offset, self._token = None, 0, "0"
+            self._bumped.clear()
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            # A log created without a header line still gets its own token.
+            self._inode, self._offset, self._token = st.st_ino, 0, f"{st.st_ino:x}"
+            self._bumped.clear()
+        if st.st_size == self._offset:
+            return
+        with self.path.open("rb") as f:
+            if os.fstat(f.fileno()).st_ino != self._inode:
+                return  # replaced since the stat; picked up next time
+            f.seek(self._offset)
+            data = f.read(st.st_size - self._offset)
+        # Only consume complete lines; a concurrent append may be partial.
+        consumed = data.rfind(b"\n") + 1
+        position = self._offset
+        for line in data[:consumed].splitlines(keepends=True):
+            position += len(line)
+            text = line.decode().strip()
+            if text.startswith("#"):
+                self._token = text[1:]
+                continue
+            scope, _, stamp = text.partition(" ")
+            self._bumped[scope] = (position, float(stamp or 0))
+        self._offset += consumed
+
+    def etag(
+        self, scope: str, fingerprint: str = "", settle_seconds: float = 0.0
+    ) -> str | None:
+        """
+        Strong ETag for the current version of `scope` and the `fingerprint`
+        of its rows. None when disabled, or when the last bump is under
+        `settle_seconds` old (a lagging replica may not have the rows it
+        stands for yet).
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._poll()
+            position, bumped_at = self._bumped.get(scope, (0, 0.0))
+            token = self._token
+        if settle_seconds > 0 and time.time() - bumped_at < settle_seconds:
+            return None
+        return f'"{token}.{position:x}.{fingerprint}"'
+
+
+list_versions = VersionLog(ENTITY_CACHE_DIR / "list-versions.log")
@@ -1,3 +1,4 @@
+import json
 import uuid
 from datetime import date as date_type  # noqa: F401
 from datetime import datetime, timedelta, timezone
@@ -311,3 +312,627 @@ def test_get_appointments_by_date_bad_doctor_id_400_or_422():
     target_date = _tomorrow_date()
     r = client.get(f"/appointments?date={target_date}&doctor_id=-1")
     assert r.status_code in (400, 422)
+
+
+def test_appointment_overlapping_tail_of_earlier_appointment_returns_409():
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+
+    start = datetime.fromisoformat(_future_time(24 * 60))
+    r1 = client.post(
+        "/appointments",
+        json={
+            "patient_id": pid,
+            "doctor_id": did,
+            "start_time_utc": start.isoformat(),
+            "duration_minutes": 180,
+        },
+    )
+    assert r1.status_code == 201, r1.text
+
+    # starts inside the 3-hour appointment, well after its start
+    r2 = client.post(
+        "/appointments",
+        json={
+            "patient_id": pid,
+            "doctor_id": did,
+            "start_time_utc": (start + timedelta(minutes=170)).isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    assert r2.status_code == 409, r2.text
+
+
+def test_back_to_back_appointments_do_not_conflict():
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+
+    start = datetime.fromisoformat(_future_time(24 * 60))
+    for offset, duration in ((0, 60), (60, 30), (-15, 15)):
+        r = client.post(
+            "/appointments",
+            json={
+                "patient_id": pid,
+                "doctor_id": did,
+                "start_time_utc": (start + timedelta(minutes=offset)).isoformat(),
+                "duration_minutes": duration,
+            },
+        )
+        assert r.status_code == 201, r.text
+
+
+def test_appointment_end_time_is_stored_on_create():
+    from src.database import SessionLocal
+    from src.models.appointment import Appointment
+
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+    r = client.post(
+        "/appointments",
+        json={
+            "patient_id": pid,
+            "doctor_id": did,
+            "start_time_utc": _future_time(600),
+            "duration_minutes": 45,
+        },
+    )
+    assert r.status_code == 201, r.text
+
+    with SessionLocal() as db:
+        appt = db.get(Appointment, r.json()["id"])
+        assert appt.end_time_utc - appt.start_time_utc == timedelta(minutes=45)
+
+
+# ----------------------------
+# Keyset pagination
+# ----------------------------
+
+
+def _walk_pages(path: str, limit: int) -> list[int]:
+    ids: list[int] = []
+    params = {"limit": limit}
+    while True:
+        r = client.get(path, params=params)
+        assert r.status_code == 200, r.text
+        page = r.json()
+        assert len(page) <= limit
+        ids.extend(item["id"] for item in page)
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+        params = {"limit": limit, "after": cursor}
+
+
+def test_list_doctors_pages_with_cursor():
+    created = {_create_doctor_id() for _ in range(3)}
+    ids = _walk_pages("/doctors", limit=2)
+    assert ids == sorted(set(ids))
+    assert created <= set(ids)
+
+
+def test_list_patients_pages_with_cursor():
+    created = {_create_patient_id() for _ in range(3)}
+    ids = _walk_pages("/patients", limit=2)
+    assert ids == sorted(set(ids))
+    assert created <= set(ids)
+
+
+def test_list_patients_rejects_bad_cursor_400():
+    r = client.get("/patients", params={"after": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+def test_list_doctors_rejects_oversized_limit_422():
+    r = client.get("/doctors", params={"limit": 100000})
+    assert r.status_code == 422
+
+
+# ----------------------------
+# Bulk booking
+# ----------------------------
+
+
+def _slot(day_offset: int, hour: int, minute: int = 0) -> datetime:
+    base = datetime.now(timezone.utc) + timedelta(days=day_offset)
+    return base.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def test_bulk_appointments_per_item_results():
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+    other_did = _create_doctor_id()
+
+    booked = client.post(
+        "/appointments",
+        json={
+            "patient_id": pid,
+            "doctor_id": did,
+            "start_time_utc": _slot(3, 9).isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+    assert booked.status_code == 201, booked.text
+
+    items = [
+        # 0: free slot
+        (pid, did, _slot(3, 11), 30),
+        # 1: overlaps the booked 09:00-10:00 appointment
+        (pid, did, _slot(3, 9, 30), 30),
+        # 2: overlaps item 0 in the same batch
+        (pid, did, _slot(3, 11, 15), 30),
+        # 3: same wall time as item 0 but a different doctor
+        (pid, other_did, _slot(3, 11), 30),
+        # 4: unknown patient
+        (999999999, did, _slot(3, 14), 30),
+        # 5: unknown doctor
+        (pid, 999999999, _slot(3, 14), 30),
+        # 6: in the past
+        (pid, did, _slot(-1, 9), 30),
+        # 7: back-to-back with the booked appointment
+        (pid, did, _slot(3, 10), 30),
+    ]
+    r = client.post(
+        "/appointments/bulk",
+        json={
+            "items": [
+                {
+                    "patient_id": p,
+                    "doctor_id": d,
+                    "start_time_utc": start.isoformat(),
+                    "duration_minutes": duration,
+                }
+                for p, d, start, duration in items
+            ]
+        },
+    )
+    assert r.status_code == 200, r.text
+    body = r.json()
+    statuses = [item["status_code"] for item in body["results"]]
+    assert statuses == [201, 409, 409, 201, 404, 404, 400, 201]
+    assert body["created"] == 3
+    assert [item["index"] for item in body["results"]] == list(range(len(items)))
+
+    created_id = body["results"][0]["appointment"]["id"]
+    r = client.get(f"/appointments/{created_id}")
+    assert r.status_code == 200
+    assert r.json()["doctor_id"] == did
+
+
+def test_bulk_appointments_reload_in_one_query():
+    from sqlalchemy import event
+
+    from src.database import engine
+
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+    items = [
+        {
+            "patient_id": pid,
+            "doctor_id": did,
+            "start_time_utc": _slot(5, 8 + i // 2, 30 * (i % 2)).isoformat(),
+            "duration_minutes": 30,
+        }
+        for i in range(20)
+    ]
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        r = client.post("/appointments/bulk", json={"items": items})
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert r.status_code == 200, r.text
+    assert r.json()["created"] == 20
+    appointment_selects = [
+        s
+        for s in statements
+        if s.lstrip().upper().startswith("SELECT") and "FROM vamsi_appointments" in s
+    ]
+    assert len(appointment_selects) == 2  # conflict check + reload
+
+
+def test_bulk_appointments_rejects_empty_batch_422():
+    r = client.post("/appointments/bulk", json={"items": []})
+    assert r.status_code == 422
+
+
+def test_bulk_appointments_reject_whole_batch_with_a_naive_time_422():
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+    good = {
+        "patient_id": pid,
+        "doctor_id": did,
+        "start_time_utc": _slot(6, 9).isoformat(),
+        "duration_minutes": 30,
+    }
+    naive = {**good, "start_time_utc": _slot(6, 11).replace(tzinfo=None).isoformat()}
+    r = client.post("/appointments/bulk", json={"items": [good, naive]})
+    assert r.status_code == 422
+    r = client.get(
+        "/appointments",
+        params={"date": _slot(6, 9).date().isoformat(), "doctor_id": did},
+    )
+    assert r.json() == []
+
+
+# ----------------------------
+# Recurring series
+# ----------------------------
+
+
+def _series(pid: int, did: int, start: datetime, **rule) -> dict:
+    return {
+        "patient_id": pid,
+        "doctor_id": did,
+        "start_time_utc": start.isoformat(),
+        "duration_minutes": 45,
+        **rule,
+    }
+
+
+def test_series_books_every_occurrence_or_reports_conflicts():
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+    blocker = _book(pid, did, _slot(16, 9, 30))
+
+    r = client.post(
+        "/appointments/series", json=_series(pid, did, _slot(2, 9), count=4)
+    )
+    assert r.status_code == 409, r.text
+    assert r.json()["detail"]["conflicts"] == [
+        {
+            "occurrence": 2,
+            "start_time_utc": _slot(16, 9).isoformat().replace("+00:00", "Z"),
+            "end_time_utc": _slot(16, 9, 45).isoformat().replace("+00:00", "Z"),
+            "conflicting_appointment_id": blocker["id"],
+        }
+    ]
+    r = client.get(
+        "/appointments", params={"date": _slot(2, 9).date(), "doctor_id": did}
+    )
+    assert r.json() == []  # nothing from the rejected series was booked
+
+    r = client.post(
+        "/appointments/series",
+        json=_series(pid, did, _slot(2, 11), until_utc=_slot(23, 11).isoformat()),
+    )
+    assert r.status_code == 201, r.text
+    series = r.json()
+    assert series["occurrences"] == 4 and series["cancelled_at"] is None
+    starts = [appt["start_time_utc"] for appt in series["appointments"]]
+    assert starts == [
+        _slot(days, 11).isoformat().replace("+00:00", "Z") for days in (2, 9, 16, 23)
+    ]
+    assert {appt["series_id"] for appt in series["appointments"]} == {series["id"]}
+    assert client.get(f"/appointments/series/{series['id']}").json() == series
+
+
+def test_series_cancel_frees_future_occurrences():
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+    series = client.post(
+        "/appointments/series",
+        json=_series(pid, did, _slot(3, 14), count=3, interval_days=14),
+    ).json()
+
+    r = client.delete(f"/appointments/series/{series['id']}")
+    assert r.status_code == 200, r.text
+    assert r.json()["cancelled_at"] is not None and r.json()["appointments"] == []
+    assert client.delete(f"/appointments/series/{series['id']}").json() == r.json()
+    _book(pid, did, _slot(17, 14))  # the slot is free again
+
+    assert client.delete("/appointments/series/999999999").status_code == 404
+
+
+def test_series_validates_recurrence_rule_422():
+    pid, did = 1, 1
+    start = _slot(2, 9)
+    for rule in (
+        {},
+        {"count": 2, "until_utc": _slot(9, 9).isoformat()},
+        {"count": 105},
+        {"until_utc": _slot(1, 9).isoformat()},
+        {"interval_days": 1, "until_utc": _slot(200, 9).isoformat()},
+    ):
+        r = client.post("/appointments/series", json=_series(pid, did, start, **rule))
+        assert r.status_code == 422, rule
+
+
+# ----------------------------
+# Bulk patient import
+# ----------------------------
+
+
+def test_import_patients_ndjson_reports_rejects():
+    existing = _unique_email()
+    r = client.post(
+        "/patients",
+        json={
+            "first_name": "Existing",
+            "last_name": "Patient",
+            "email": existing,
+            "phone": "9999999999",
+        },
+    )
+    assert r.status_code == 201
+
+    new_email = _unique_email()
+    lines = [
+        {"first_name": "A", "last_name": "One", "email": new_email, "phone": "1"},
+        {"first_name": "B", "last_name": "Two", "email": "bad", "phone": "2"},
+        {"first_name": "C", "last_name": "Dup", "email": new_email.upper()},
+        {"first_name": "D", "last_name": "Old", "email": existing, "phone": "4"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n{not json\n"
+    r = client.post("/patients/import?format=ndjson", content=body)
+    assert r.status_code == 200, r.text
+    report = r.json()
+    assert report["processed"] == 5
+    assert report["inserted"] == 1
+    assert report["rejected"] == 4
+    assert sorted(reject["row"] for reject in report["rejects"]) == [2, 3, 4, 5]
+
+
+def test_import_patients_csv():
+    emails = [_unique_email(), _unique_email()]
+    body = "first_name,last_name,email,phone\n" + "".join(
+        f'Csv,"Patient, {i}",{email},12345\n' for i, email in enumerate(emails)
+    )
+    r = client.post(
+        "/patients/import?format=csv",
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["inserted"] == 2
+
+    duplicate = client.post(
+        "/patients",
+        json={
+            "first_name": "Csv",
+            "last_name": "Again",
+            "email": emails[0],
+            "phone": "12345",
+        },
+    )
+    assert duplicate.status_code == 400
+
+
+# ----------------------------
+# Appointment export
+# ----------------------------
+
+
+def _book(pid: int, did: int, start: datetime, duration: int = 30) -> dict:
+    r = client.post(
+        "/appointments",
+        json={
+            "patient_id": pid,
+            "doctor_id": did,
+            "start_time_utc": start.isoformat(),
+            "duration_minutes": duration,
+        },
+    )
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def test_export_appointments_ndjson_matches_api_representation():
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+    booked = [_book(pid, did, _slot(5 + day, 10)) for day in range(3)]
+
+    r = client.get(
+        "/appointments/export",
+        params={
+            "from": _slot(5, 0).isoformat(),
+            "to": _slot(7, 0).isoformat(),
+            "doctor_id": did,
+        },
+    )
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert rows == booked[:2]
+
+
+def test_export_appointments_csv_gzip():
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+    booked = _book(pid, did, _slot(9, 10))
+
+    r = client.get(
+        "/appointments/export",
+        params={
+            "from": _slot(9, 0).isoformat(),
+            "to": _slot(10, 0).isoformat(),
+            "patient_id": pid,
+            "format": "csv",
+            "gzip": "true",
+        },
+    )
+    assert r.status_code == 200, r.text
+    assert r.headers["content-encoding"] == "gzip"
+    header, *lines = r.text.splitlines()
+    assert header == (
+        "id,patient_id,doctor_id,start_time_utc,duration_minutes,created_at,series_id"
+    )
+    assert [line.split(",")[0] for line in lines] == [str(booked["id"])]
+
+
+def test_export_appointments_rejects_inverted_range_400():
+    r = client.get(
+        "/appointments/export",
+        params={"from": _slot(2, 0).isoformat(), "to": _slot(1, 0).isoformat()},
+    )
+    assert r.status_code == 400
+
+
+# ----------------------------
+# Doctor availability
+# ----------------------------
+
+
+def test_doctor_availability_excludes_booked_time():
+    pid = _create_patient_id()
+    did = _create_doctor_id()
+    day = _slot(3, 0)
+    _book(pid, did, day.replace(hour=10), duration=45)
+
+    r = client.get(
+        f"/doctors/{did}/availability",
+        params={
+            "from": day.date().isoformat(),
+            "to": day.date().isoformat(),
+            "slot_minutes": 30,
+            "work_start": "09:00",
+            "work_end": "12:00",
+        },
+    )
+    assert r.status_code == 200, r.text
+    starts = [slot["start_time_utc"][11:16] for slot in r.json()["slots"]]
+    assert starts == ["09:00", "09:30", "10:45", "11:15"]
+
+
+def test_doctor_availability_validates_slot_and_range():
+    did = _create_doctor_id()
+    day = _slot(3, 0).date()
+    r = client.get(
+        f"/doctors/{did}/availability",
+        params={"from": day.isoformat(), "to": day.isoformat(), "slot_minutes": 10},
+    )
+    assert r.status_code == 400
+    r = client.get(
+        f"/doctors/{did}/availability",
+        params={
+            "from": day.isoformat(),
+            "to": (day + timedelta(days=120)).isoformat(),
+        },
+    )
+    assert r.status_code == 400
+
+
+def test_doctor_availability_unknown_doctor_404():
+    day = _slot(3, 0).date().isoformat()
+    r = client.get("/doctors/999999999/availability", params={"from": day, "to": day})
+    assert r.status_code == 404
+
+
+# ----------------------------
+# Specialization search
+# ----------------------------
+
+
+def _create_doctor(specialization: str, is_active: bool = True) -> int:
+    r = client.post(
+        "/doctors",
+        json={
+            "full_name": _unique_name("Dr"),
+            "specialization": specialization,
+            "is_active": is_active,
+        },
+    )
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def test_list_doctors_filters_by_specialization():
+    specialization = _unique_name("Spec")
+    ids = [_create_doctor(specialization) for _ in range(2)]
+    _create_doctor("Cardiology")
+
+    r = client.get("/doctors", params={"specialization": specialization})
+    assert r.status_code == 200
+    assert [doctor["id"] for doctor in r.json()] == ids
+
+
+def test_earliest_slots_across_doctors_of_a_specialization():
+    specialization = _unique_name("Spec")
+    first = _create_doctor(specialization)
+    second = _create_doctor(specialization)
+    _create_doctor(specialization, is_active=False)
+    pid = _create_patient_id()
+
+    day = _slot(4, 0)
+    # first doctor is busy 09:00-10:00, second doctor 09:00-09:30
+    _book(pid, first, day.replace(hour=9), duration=60)
+    _book(pid, second, day.replace(hour=9), duration=30)
+
+    r = client.get(
+        "/doctors/earliest-slots",
+        params={
+            "specialization": specialization,
+            "from": day.isoformat(),
+            "slot_minutes": 30,
+            "limit": 3,
+            "work_start": "09:00",
+            "work_end": "11:00",
+        },
+    )
+    assert r.status_code == 200, r.text
+    slots = [
+        (slot["doctor_id"], slot["start_time_utc"][11:16]) for slot in r.json()["slots"]
+    ]
+    assert slots == [(second, "09:30"), (first, "10:00"), (second, "10:00")]
+
+
+def test_earliest_slots_unknown_specialization_is_empty():
+    r = client.get(
+        "/doctors/earliest-slots",
+        params={"specialization": _unique_name("None"), "from": _future_time(0)},
+    )
+    assert r.status_code == 200
+    assert r.json()["slots"] == []
+
+
+def test_list_appointments_expand_embeds_rows_in_fixed_queries():
+    from sqlalchemy import event
+
+    from src.database import engine
+
+    pids = [_create_patient_id() for _ in range(3)]
+    dids = [_create_doctor_id() for _ in range(3)]
+    for i, (pid, did) in enumerate(zip(pids, dids)):
+        _book(pid, did, _slot(211, 9 + i))
+    day = _slot(211, 9).date().isoformat()
+
+    plain = client.get(f"/appointments?date={day}")
+    assert plain.status_code == 200
+    assert all("patient" not in row and "doctor" not in row for row in plain.json())
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        r = client.get(f"/appointments?date={day}&expand=patient,doctor")
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert r.status_code == 200
+    # ETag fingerprint + appointments + one IN query per relationship
+    assert len(statements) == 4
+
+    rows = {row["id"]: row for row in r.json()}
+    for row in plain.json():
+        expanded = rows[row["id"]]
+        assert {k: expanded[k] for k in row} == row
+        assert expanded["patient"]["id"] == row["patient_id"]
+        assert expanded["doctor"]["id"] == row["doctor_id"]
+
+
+def test_get_appointment_expand_and_unknown_expand_400():
+    appt = _book(_create_patient_id(), _create_doctor_id(), _slot(212, 10))
+
+    r = client.get(f"/appointments/{appt['id']}?expand=doctor")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["doctor"]["id"] == appt["doctor_id"] and "patient" not in body
+    assert client.get(f"/appointments/{appt['id']}").json() == appt
+
+    r = client.get(f"/appointments/{appt['id']}?expand=doctor,notes")
+    assert r.status_code == 400
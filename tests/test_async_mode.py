@@ -0,0 +1,87 @@
+"""
+DB_ASYNC is read at import time, so the async configuration is exercised in
+a fresh interpreter against its own SQLite file.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+SCRIPT = textwrap.dedent("""
+    import json
+    from datetime import datetime, timedelta, timezone
+
+    from fastapi.testclient import TestClient
+
+    from src import database
+    from src.main import app
+
+    assert database.DB_ASYNC and database.async_engine is not None
+
+    with TestClient(app) as client:
+        p = client.post(
+            "/patients",
+            json={"first_name": "A", "last_name": "B",
+                  "email": "async@example.com", "phone": "1"},
+        )
+        assert p.status_code == 201, p.text
+        d = client.post("/doctors", json={"full_name": "Dr A", "specialization": "X"})
+        assert d.status_code == 201, d.text
+
+        start = (datetime.now(timezone.utc) + timedelta(days=1)).replace(
+            hour=10, minute=0, second=0, microsecond=0
+        )
+        payload = {
+            "patient_id": p.json()["id"],
+            "doctor_id": d.json()["id"],
+            "start_time_utc": start.isoformat(),
+            "duration_minutes": 30,
+        }
+        a = client.post("/appointments", json=payload)
+        assert a.status_code == 201, a.text
+        assert client.post("/appointments", json=payload).status_code == 409
+
+        bulk = client.post("/appointments/bulk", json={"items": [payload]})
+        assert bulk.json()["results"][0]["status_code"] == 409
+
+        assert client.get(f"/patients/{p.json()['id']}").status_code == 200
+        assert client.get("/doctors", params={"limit": 1}).json()[0]["id"] == 1
+        day = client.get("/appointments", params={"date": start.date().isoformat()})
+        assert [row["id"] for row in day.json()] == [a.json()["id"]]
+
+        export = client.get(
+            "/appointments/export",
+            params={"from": start.isoformat(),
+                    "to": (start + timedelta(days=1)).isoformat()},
+        )
+        assert [json.loads(line) for line in export.text.splitlines()] == [a.json()]
+
+        imported = client.post(
+            "/patients/import",
+            content=json.dumps({"first_name": "C", "last_name": "D",
+                                "email": "async2@example.com", "phone": "2"}),
+        )
+        assert imported.json()["inserted"] == 1, imported.text
+    print("ok")
+    """)
+
+
+def test_endpoints_in_async_mode(tmp_path: Path):
+    env = {
+        **os.environ,
+        "DB_ASYNC": "1",
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'async.db'}",
+    }
+    env.pop("ASYNC_DATABASE_URL", None)
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-c", SCRIPT],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "ok"
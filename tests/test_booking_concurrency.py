@@ -0,0 +1,62 @@
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+
+from src.database import SessionLocal
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.schemas.appointment_pydantic import AppointmentCreate
+from src.services.appointment_service import create_appointment
+
+THREADS = 8
+
+
+def _seed_patient_and_doctor() -> tuple[int, int]:
+    with SessionLocal() as db:
+        patient = Patient(
+            first_name="Race",
+            last_name="Patient",
+            email=f"race_{uuid.uuid4().hex[:10]}@example.com",
+            phone="9999999999",
+        )
+        doctor = Doctor(full_name="Race Doctor", specialization="General")
+        db.add_all([patient, doctor])
+        db.commit()
+        return patient.id, doctor.id
+
+
+def test_concurrent_bookings_for_same_slot_create_exactly_one():
+    patient_id, doctor_id = _seed_patient_and_doctor()
+    start = (datetime.now(timezone.utc) + timedelta(days=40)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    barrier = threading.Barrier(THREADS)
+    statuses: list[int] = []
+
+    def book(offset_minutes: int) -> None:
+        data = AppointmentCreate(
+            patient_id=patient_id,
+            doctor_id=doctor_id,
+            start_time_utc=start + timedelta(minutes=offset_minutes),
+            duration_minutes=60,
+        )
+        with SessionLocal() as db:
+            barrier.wait()
+            try:
+                create_appointment(db, data)
+                statuses.append(201)
+            except HTTPException as exc:
+                statuses.append(exc.status_code)
+
+    # Every request overlaps every other one.
+    threads = [
+        threading.Thread(target=book, args=(5 * (i % 4),)) for i in range(THREADS)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(statuses) == [201] + [409] * (THREADS - 1)
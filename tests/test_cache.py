@@ -0,0 +1,106 @@
+from fastapi.testclient import TestClient
+
+from src import admin
+from src import cache as cache_module
+from src.cache import EntityCache, TTLCache
+from src.main import app
+from src.services.doctor_service import doctor_cache
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"  # 2 is now least recently used
+    cache.set(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a" and cache.get(3) == "c"
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("k", 1)
+    clock.now = 4.9
+    assert cache.get("k") == 1
+    clock.now = 5.0
+    assert cache.get("k") is None
+
+
+def test_ttl_cache_drops_value_loaded_before_invalidation():
+    cache = TTLCache(maxsize=10, ttl=60)
+    generation = cache.generation()
+    cache.invalidate("k")  # a writer got in while the value was loading
+    cache.set("k", "stale", generation)
+    assert cache.get("k") is None
+
+
+def test_invalidation_reaches_other_workers(tmp_path):
+    worker_a = EntityCache("doctors", directory=tmp_path, enabled=True)
+    worker_b = EntityCache("doctors", directory=tmp_path, enabled=True)
+    worker_a.get_or_load(7, lambda: "v1")
+    worker_b.get_or_load(7, lambda: "v1")
+
+    worker_a.invalidate(7)
+
+    assert worker_b.get_or_load(7, lambda: "v2") == "v2"
+    assert worker_a.get_or_load(7, lambda: "v2") == "v2"
+
+
+def test_replaced_log_clears_other_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "MAX_LOG_BYTES", 3)
+    log_path = tmp_path / "patients.log"
+    log_path.touch()  # so the readers start from a real inode, not 0
+    worker_a = EntityCache("patients", directory=tmp_path, enabled=True)
+    worker_b = EntityCache("patients", directory=tmp_path, enabled=True)
+    worker_b.get_or_load(1, lambda: "old")
+    inode = log_path.stat().st_ino
+    for key in (100, 101):
+        worker_a.invalidate(key)  # "100\n" is past the limit: the second rotates
+
+    assert log_path.stat().st_ino != inode
+    assert log_path.read_text() == "101\n"
+    assert worker_b.get(1) is None
+
+
+def test_get_doctor_is_served_from_cache():
+    r = client.post("/doctors", json={"full_name": "Dr Cache", "specialization": "X"})
+    assert r.status_code == 201
+    doctor_id = r.json()["id"]
+
+    before = doctor_cache.stats()
+    assert client.get(f"/doctors/{doctor_id}").json() == r.json()
+    assert client.get(f"/doctors/{doctor_id}").json() == r.json()
+    after = doctor_cache.stats()
+    assert after["hits"] - before["hits"] >= 1
+
+
+def test_entity_cache_stats_endpoint(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "cache-token")
+    headers = {"X-Admin-Token": "cache-token"}
+    assert client.get("/admin/entity-caches").status_code == 403
+
+    doctor_id = client.post(
+        "/doctors", json={"full_name": "Dr Stats", "specialization": "X"}
+    ).json()["id"]
+    before = client.get("/admin/entity-caches", headers=headers).json()
+    client.get(f"/doctors/{doctor_id}")
+    client.get(f"/doctors/{doctor_id}")
+    after = client.get("/admin/entity-caches", headers=headers).json()
+
+    assert set(after) == {"patients", "doctors"}
+    assert after["doctors"]["enabled"] is True
+    assert after["doctors"]["misses"] - before["doctors"]["misses"] == 1
+    assert after["doctors"]["hits"] - before["doctors"]["hits"] == 1
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine
+
+from src.db_profiles import PROFILES, apply_sqlite_pragmas, select_profile
+
+
+def test_profile_follows_database_url_and_name():
+    assert select_profile("sqlite:///./app.db", "balanced").sqlite_pragmas
+    mysql = select_profile("mysql+pymysql://u:p@db/app", "balanced")
+    assert mysql is PROFILES["mysql"]["balanced"]
+    assert not mysql.pool_pre_ping and not mysql.sqlite_pragmas
+    assert select_profile("postgresql://u:p@db/app", "balanced").name == "baseline"
+    with pytest.raises(ValueError, match="Unknown DB_PROFILE"):
+        select_profile("sqlite:///./app.db", "fast")
+
+
+def test_default_profile_is_baseline(monkeypatch):
+    monkeypatch.delenv("DB_PROFILE", raising=False)
+    assert select_profile("sqlite:///./app.db") is PROFILES["sqlite"]["baseline"]
+    monkeypatch.setenv("DB_PROFILE", "balanced")
+    assert select_profile("sqlite:///./app.db") is PROFILES["sqlite"]["balanced"]
+
+
+@pytest.mark.parametrize(
+    "name, journal_mode, synchronous",
+    [("baseline", "delete", 2), ("balanced", "wal", 1), ("durable", "wal", 2)],
+)
+def test_sqlite_pragmas_are_applied_on_connect(
+    tmp_path, name, journal_mode, synchronous
+):
+    profile = select_profile("sqlite://", name)
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    engine = create_engine(url, **profile.engine_kwargs(url))
+    apply_sqlite_pragmas(engine, profile)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == journal_mode
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == synchronous
+    engine.dispose()
+
+
+def test_baseline_passes_only_pre_ping_and_memory_sqlite_gets_no_pool_sizing():
+    for url in ("sqlite:///./app.db", "mysql+pymysql://u:p@db/app"):
+        assert select_profile(url, "baseline").engine_kwargs(url) == {
+            "pool_pre_ping": True
+        }
+    mysql = select_profile("mysql+pymysql://u:p@db/app", "balanced")
+    assert mysql.engine_kwargs("mysql+pymysql://u:p@db/app")["max_overflow"] == 20
+    for url in ("sqlite://", "sqlite:///:memory:", "sqlite+aiosqlite://"):
+        assert "pool_size" not in mysql.engine_kwargs(url)
+    for name in PROFILES["sqlite"]:
+        url = "sqlite:///:memory:"
+        engine = create_engine(url, **select_profile(url, name).engine_kwargs(url))
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+        engine.dispose()
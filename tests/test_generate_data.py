@@ -0,0 +1,36 @@
+import random
+from datetime import datetime, timezone
+from itertools import islice
+
+from src.generate_data import appointment_rows
+
+TODAY = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _rows(seed: int) -> list[dict]:
+    rows = appointment_rows(
+        random.Random(seed),
+        doctor_ids=range(1, 6),
+        patient_ids=range(1, 101),
+        first_day=TODAY.replace(day=1, month=12, year=2025),
+        days=45,
+        today=TODAY,
+        future_days=14,
+    )
+    return list(islice(rows, 5000))
+
+
+def test_generated_appointments_are_deterministic():
+    assert _rows(7) == _rows(7)
+    assert _rows(7) != _rows(8)
+
+
+def test_generated_schedules_never_overlap_per_doctor():
+    rows = _rows(3)
+    assert rows
+    last_end: dict[int, datetime] = {}
+    for row in sorted(rows, key=lambda r: (r["doctor_id"], r["start_time_utc"])):
+        previous = last_end.get(row["doctor_id"])
+        assert previous is None or previous <= row["start_time_utc"]
+        assert 1 <= row["patient_id"] <= 100
+        last_end[row["doctor_id"]] = row["end_time_utc"]
@@ -0,0 +1,130 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi.testclient import TestClient
+
+from src import idempotency, main
+from src.database import SessionLocal
+from src.idempotency import REPLAYED_HEADER, claim_key
+from src.main import app
+from src.models.idempotency_key import IdempotencyKey
+
+client = TestClient(app)
+
+
+def _key() -> dict[str, str]:
+    return {"Idempotency-Key": uuid.uuid4().hex}
+
+
+def _patient() -> dict:
+    return {
+        "first_name": "Retry",
+        "last_name": "Patient",
+        "email": f"retry_{uuid.uuid4().hex[:10]}@example.com",
+        "phone": "9999999999",
+    }
+
+
+def test_retried_booking_gets_the_original_response():
+    pid = client.post("/patients", json=_patient()).json()["id"]
+    did = client.post(
+        "/doctors", json={"full_name": "Dr Retry", "specialization": "X"}
+    ).json()["id"]
+    start = (datetime.now(timezone.utc) + timedelta(days=4)).replace(
+        hour=10, minute=0, second=0, microsecond=0
+    )
+    booking = {
+        "patient_id": pid,
+        "doctor_id": did,
+        "start_time_utc": start.isoformat(),
+        "duration_minutes": 30,
+    }
+    headers = _key()
+
+    first = client.post("/appointments", json=booking, headers=headers)
+    retry = client.post("/appointments", json=booking, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert REPLAYED_HEADER not in first.headers
+    # Without the key the same request is a new booking attempt.
+    assert client.post("/appointments", json=booking).status_code == 409
+
+
+def test_key_reused_for_another_request_422():
+    headers = _key()
+    assert client.post("/patients", json=_patient(), headers=headers).status_code == 201
+    r = client.post("/patients", json=_patient(), headers=headers)
+    assert r.status_code == 422
+    assert "different request" in r.json()["detail"]
+
+
+def test_concurrent_duplicates_wait_for_the_first(monkeypatch):
+    calls = []
+
+    def slow_create_patient(db, payload):
+        calls.append(payload)
+        time.sleep(0.2)
+        return original(db, payload)
+
+    original = main.create_patient
+    monkeypatch.setattr(main, "create_patient", slow_create_patient)
+    headers, payload = _key(), _patient()
+
+    async def send_twice():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await asyncio.gather(
+                *(c.post("/patients", json=payload, headers=headers) for _ in range(2))
+            )
+
+    responses = asyncio.run(send_twice())
+
+    assert len(calls) == 1
+    assert [r.status_code for r in responses] == [201, 201]
+    assert responses[0].content == responses[1].content
+    assert sum(REPLAYED_HEADER in r.headers for r in responses) == 1
+
+
+def test_key_held_by_another_worker_times_out_409(monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_SECONDS", 0.3)
+    headers = _key()
+    with SessionLocal() as db:
+        assert claim_key(db, headers["Idempotency-Key"], "other worker") is None
+    claims = []
+
+    def counting_claim_key(db, key, request_hash):
+        claims.append(key)
+        return claim_key(db, key, request_hash)
+
+    monkeypatch.setattr(idempotency, "claim_key", counting_claim_key)
+
+    r = client.post("/patients", json=_patient(), headers=headers)
+    assert r.status_code == 409
+    assert "in progress" in r.json()["detail"]
+    assert len(claims) == 1  # then polled with plain reads
+
+
+def test_abandoned_claim_is_taken_over_after_its_lease():
+    headers = _key()
+    with SessionLocal() as db:
+        db.add(
+            IdempotencyKey(
+                key=headers["Idempotency-Key"],
+                request_hash="killed worker",
+                created_at=datetime.now(timezone.utc)
+                - timedelta(seconds=idempotency.IDEMPOTENCY_LEASE_SECONDS + 1),
+            )
+        )
+        db.commit()
+
+    payload = _patient()
+    first = client.post("/patients", json=payload, headers=headers)
+    assert first.status_code == 201
+    retry = client.post("/patients", json=payload, headers=headers)
+    assert retry.content == first.content
+    assert retry.headers[REPLAYED_HEADER] == "true"
@@ -0,0 +1,59 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from src.database import engine
+from src.main import app
+from src.metrics import Histogram
+
+client = TestClient(app)
+
+
+def _sample(text: str, name: str, **labels: str) -> float:
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    match = re.search(rf"^{name}\{{{re.escape(wanted)}\}} (\S+)$", text, re.M)
+    assert match, f"{name}{{{wanted}}} missing"
+    return float(match.group(1))
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    hist = Histogram((0.1, 1.0))
+    for value in (0.1, 0.5, 2.0):
+        hist.observe(value)
+    assert list(hist.cumulative()) == [("0.1", 1), ("1", 2), ("+Inf", 3)]
+    assert hist.sum == 2.6
+
+
+def test_metrics_report_requests_and_queries_per_route_template():
+    r = client.post(
+        "/doctors", json={"full_name": "Dr Metrics", "specialization": "General"}
+    )
+    assert r.status_code == 201
+    assert client.get(f"/doctors/{r.json()['id']}").status_code == 200
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+
+    route = {"method": "POST", "route": "/doctors"}
+    assert _sample(text, "http_requests_total", **route, status="201") >= 1
+    assert _sample(text, "http_request_duration_seconds_count", **route) >= 1
+    assert _sample(text, "db_queries_total", **route) >= 1
+    assert _sample(text, "db_query_duration_seconds_total", **route) > 0
+    assert _sample(text, "db_pool_wait_seconds_total", **route) >= 0
+    # Raw ids never become labels.
+    assert 'route="/doctors/{doctor_id}"' in text
+    assert "db_pool_wait_seconds_count" in text
+
+
+def test_pool_wait_is_still_timed_after_dispose():
+    def pool_waits() -> float:
+        text = client.get("/metrics").text
+        match = re.search(r"^db_pool_wait_seconds_count (\S+)$", text, re.M)
+        return float(match.group(1))
+
+    engine.dispose()  # replaces engine.pool
+    before = pool_waits()
+    assert client.get("/doctors").status_code == 200
+    assert pool_waits() > before
@@ -0,0 +1,122 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.database import SessionLocal
+from src.main import app
+from src.models.patient import Patient
+from src.services import patient_service
+from src.services.patient_service import _prefix_search, search_patient_rows
+
+client = TestClient(app)
+
+
+def _tag() -> str:
+    # Letters only, so it is a single search token unique to this test.
+    return "".join(chr(ord("a") + int(c, 16)) for c in uuid.uuid4().hex[:10])
+
+
+def _create(first: str, last: str, email_local: str) -> int:
+    r = client.post(
+        "/patients",
+        json={
+            "first_name": first,
+            "last_name": last,
+            "email": f"{email_local}@example.com",
+            "phone": "9999999999",
+        },
+    )
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def _search(q: str, **params) -> list[dict]:
+    r = client.get("/patients/search", params={"q": q, **params})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_search_matches_prefixes_and_ranks_last_name_first():
+    tag = _tag()
+    by_email = _create("Ann", "Other", f"{tag}smith.ann")
+    by_first = _create(f"{tag.title()}smith", "Jones", f"jones.{tag}")
+    by_last = _create("Zoë", f"{tag.title()}smithers", f"z.{tag}")
+
+    ids = [p["id"] for p in _search(f"{tag}smi")]
+    assert ids == [by_last, by_first, by_email]
+
+    # Every word must match; accents and case do not matter.
+    assert [p["id"] for p in _search(f"zoe {tag[:4].upper()}")] == [by_last]
+    # The email domain is ignored; the local part is searchable.
+    assert [p["id"] for p in _search(f"jones.{tag}@example.com")] == [by_first]
+    assert len(_search(f"{tag}smi", limit=2)) == 2
+
+
+def test_search_index_follows_updates_and_deletes():
+    tag, renamed = _tag(), _tag()
+    pid = _create("Search", tag.title(), f"search.{tag}")
+    assert [p["id"] for p in _search(tag)] == [pid]
+
+    with SessionLocal() as db:
+        db.execute(
+            text("UPDATE vamsi_patients SET last_name = :name WHERE id = :id"),
+            {"name": renamed.title(), "id": pid},
+        )
+        db.commit()
+    assert [p["last_name"] for p in _search(renamed)] == [renamed.title()]
+    assert [p["id"] for p in _search(f"{tag} search")] == [pid]  # email
+
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM vamsi_patients WHERE id = :id"), {"id": pid})
+        db.commit()
+    assert _search(renamed) == []
+
+
+def test_search_without_words_returns_nothing():
+    assert _search("@!") == []
+    assert client.get("/patients/search", params={"q": ""}).status_code == 422
+
+
+def test_prefix_search_fallback_matches_every_term():
+    # The non-SQLite query, run here for its semantics: LIKE is
+    # case-insensitive for ASCII on SQLite as with MySQL's default collation.
+    tag = _tag()
+    last = _create("Maria", f"{tag.title()}berg", f"mb.{tag}")
+    first = _create(f"{tag.title()}ina", "Berg", f"ib.{tag}")
+    with SessionLocal() as db:
+        rows = db.execute(_prefix_search([tag])).all()
+        assert [row.id for row in rows] == [last, first]
+        rows = db.execute(_prefix_search([tag, "berg"])).all()
+        assert [row.id for row in rows] == [first]
+
+
+def test_search_ranks_more_than_the_oldest_limit_matches():
+    tag = _tag()
+    with SessionLocal() as db:
+        db.add_all(
+            Patient(
+                first_name=f"{tag.title()}smithers",
+                last_name="Older",
+                email=f"older.{tag}.{i}@example.com",
+                phone="9999999999",
+            )
+            for i in range(250)
+        )
+        db.commit()
+    newest = _create("Newer", f"{tag.title()}smith", f"newer.{tag}")
+
+    with SessionLocal() as db:
+        rows = search_patient_rows(db, f"{tag}smith", 10)
+    assert rows[0].id == newest
+    assert len(rows) == 10
+
+
+def test_search_ranks_at_most_search_candidates(monkeypatch):
+    tag = _tag()
+    ids = [_create(f"{tag.title()}{i}", "Bound", f"bound{i}.{tag}") for i in range(5)]
+    monkeypatch.setattr(patient_service, "SEARCH_CANDIDATES", 3)
+
+    with SessionLocal() as db:
+        rows = search_patient_rows(db, tag, 10)
+    assert [row.id for row in rows] == ids[:3]
@@ -0,0 +1,65 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import admin, profiling
+from src.main import app
+
+client = TestClient(app)
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture()
+def profiling_on(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", TOKEN)
+    return tmp_path
+
+
+def _create_patient() -> dict:
+    return {
+        "first_name": "Prof",
+        "last_name": "Iled",
+        "email": f"prof_{uuid.uuid4().hex[:10]}@example.com",
+        "phone": "9999999999",
+    }
+
+
+def test_profiled_request_saves_pstats_and_sql_by_service_function(profiling_on):
+    r = client.post(
+        "/patients",
+        json=_create_patient(),
+        headers={"X-Profile": "1", "X-Admin-Token": TOKEN},
+    )
+    assert r.status_code == 201
+    profile_id = r.headers["X-Profile-Id"]
+    assert (profiling_on / f"{profile_id}.pstats").is_file()
+
+    r = client.get(f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": TOKEN})
+    assert r.status_code == 200
+    assert "POST /patients" in r.text
+    assert "src.services.patient_service.create_patient" in r.text
+    assert "INSERT INTO vamsi_patients" in r.text
+    assert "cumulative" in r.text
+
+    r = client.get(
+        f"/admin/profiles/{profile_id}?format=pstats",
+        headers={"X-Admin-Token": TOKEN},
+    )
+    assert r.status_code == 200 and r.content
+
+
+def test_profile_flag_is_ignored_without_admin_token(profiling_on):
+    r = client.post("/patients?profile=1", json=_create_patient())
+    assert r.status_code == 201
+    assert "X-Profile-Id" not in r.headers
+    assert not list(profiling_on.iterdir())
+
+
+def test_profiles_endpoint_rejects_bad_tokens_and_ids(profiling_on):
+    assert client.get(f"/admin/profiles/{'0' * 32}").status_code == 403
+    headers = {"X-Admin-Token": TOKEN}
+    assert client.get("/admin/profiles/..%2Fetc", headers=headers).status_code == 404
+    assert client.get(f"/admin/profiles/{'0' * 32}", headers=headers).status_code == 404
@@ -0,0 +1,126 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src import database
+from src.database import Base
+from src.main import app
+from src.models.doctor import Doctor
+from src.read_routing import (
+    READ_PRIMARY_COOKIE,
+    ReadYourWritesMiddleware,
+    wants_primary,
+)
+
+
+@pytest.fixture()
+def replica(tmp_path, monkeypatch):
+    """An empty second SQLite file standing in for a lagging replica."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'replica.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(
+        database, "ReadSessionLocal", sessionmaker(bind=engine, autoflush=False)
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_get_routes_read_the_replica_and_writes_the_primary(replica):
+    writer, reader = TestClient(app), TestClient(app)
+    tag = "".join(chr(ord("a") + int(c, 16)) for c in uuid.uuid4().hex[:10])
+    pid = writer.post(
+        "/patients",
+        json={
+            "first_name": "Replica",
+            "last_name": tag.title(),
+            "email": f"{tag}@example.com",
+            "phone": "9999999999",
+        },
+    ).json()["id"]
+
+    assert reader.get("/patients/search", params={"q": tag}).json() == []
+    primary = reader.get(
+        "/patients/search", params={"q": tag}, headers={"X-Read-Primary": "1"}
+    ).json()
+    assert [p["id"] for p in primary] == [pid]
+
+    # The booking overlap check runs on the primary, not the empty replica.
+    did = writer.post(
+        "/doctors", json={"full_name": "Dr Replica", "specialization": "General"}
+    ).json()["id"]
+    start = (datetime.now(timezone.utc) + timedelta(days=300)).replace(
+        hour=10, minute=0, second=0, microsecond=0
+    )
+    booking = {
+        "patient_id": pid,
+        "doctor_id": did,
+        "start_time_utc": start.isoformat(),
+        "duration_minutes": 30,
+    }
+    assert writer.post("/appointments", json=booking).status_code == 201
+    assert writer.post("/appointments", json=booking).status_code == 409
+    listing = reader.get(f"/appointments?date={start.date()}&doctor_id={did}")
+    assert listing.status_code == 200 and listing.json() == []
+
+
+def test_replica_lookups_do_not_fill_the_entity_cache(replica):
+    client = TestClient(app)
+    did = client.post(
+        "/doctors", json={"full_name": "Dr Current", "specialization": "General"}
+    ).json()["id"]
+    with Session(replica) as db:
+        db.add(Doctor(id=did, full_name="Dr Lagging", specialization="General"))
+        db.commit()
+
+    day = (datetime.now(timezone.utc) + timedelta(days=300)).date()
+    r = client.get(
+        f"/doctors/{did}/availability",
+        params={"from": str(day), "to": str(day)},
+    )
+    assert r.status_code == 200  # the doctor came from the replica
+    assert client.get(f"/doctors/{did}").json()["full_name"] == "Dr Current"
+
+
+def _cookie_app() -> FastAPI:
+    test_app = FastAPI()
+    test_app.add_middleware(ReadYourWritesMiddleware)
+
+    @test_app.post("/write", status_code=201)
+    def write():
+        return {}
+
+    @test_app.post("/reject")
+    def reject():
+        raise HTTPException(status_code=409, detail="no")
+
+    @test_app.get("/read")
+    def read(request: Request):
+        return wants_primary(request.headers, request.cookies)
+
+    return test_app
+
+
+def test_successful_writes_pin_the_client_to_the_primary():
+    client = TestClient(_cookie_app())
+    assert client.get("/read").json() is False
+
+    assert "set-cookie" not in client.post("/reject").headers
+    assert client.get("/read").json() is False
+
+    r = client.post("/write")
+    assert READ_PRIMARY_COOKIE in r.headers["set-cookie"]
+    assert client.get("/read").json() is True
+
+    expired = {READ_PRIMARY_COOKIE: str(time.time() - 1)}
+    assert not wants_primary({}, expired)
+    assert not wants_primary({}, {READ_PRIMARY_COOKIE: "junk"})
+    assert wants_primary({"x-read-primary": "1"}, {})
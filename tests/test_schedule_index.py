@@ -0,0 +1,271 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src import database
+from src.database import Base
+from src.main import app
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.schedule_index import ScheduleIndex
+from src.services import appointment_service
+from src.services.appointment_service import schedule_index
+
+client = TestClient(app)
+
+
+@pytest.fixture()
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'index.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                Doctor(id=1, full_name="Dr Index", specialization="X"),
+                Patient(
+                    id=1,
+                    first_name="A",
+                    last_name="B",
+                    email="a@example.com",
+                    phone="1",
+                ),
+            ]
+        )
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def _book(db: Session, start: datetime, minutes: int) -> Appointment:
+    appt = Appointment(
+        patient_id=1, doctor_id=1, start_time_utc=start, duration_minutes=minutes
+    )
+    db.add(appt)
+    db.commit()
+    return appt
+
+
+def test_index_answers_like_the_database(db, tmp_path):
+    index = ScheduleIndex(
+        max_duration=timedelta(minutes=180), enabled=True, directory=tmp_path
+    )
+    day = (datetime.now(timezone.utc) + timedelta(days=2)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    for hour, minutes in ((8, 180), (10, 30), (13, 15), (30, 60)):
+        _book(db, day + timedelta(hours=hour), minutes)
+
+    busy = index.intervals(db, 1, day + timedelta(hours=9), day + timedelta(hours=12))
+    assert busy == [
+        (day.replace(hour=8), day.replace(hour=11)),
+        (day.replace(hour=10), day.replace(hour=10, minute=30)),
+    ]
+    assert index.collides(1, day.replace(hour=10, minute=29), day.replace(hour=11))
+    assert not index.collides(1, day.replace(hour=11), day.replace(hour=13))
+    # Beyond the horizon the database has to answer.
+    far = day + timedelta(days=200)
+    assert index.intervals(db, 1, far, far + timedelta(hours=1)) is None
+    assert not index.collides(1, far, far + timedelta(hours=1))
+
+
+def test_index_records_bookings_and_reconciles(db, tmp_path):
+    index = ScheduleIndex(
+        max_duration=timedelta(minutes=180),
+        enabled=True,
+        reconcile_seconds=3600,
+        directory=tmp_path,
+    )
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    index.record(db, [_book(db, start, 30)])  # loads the doctor
+    index.record(db, [_book(db, start + timedelta(hours=1), 30)])
+
+    # Another worker books; this process only sees it after a reload.
+    _book(db, start + timedelta(hours=2), 30)
+    window = (start, start + timedelta(hours=3))
+    assert len(index.intervals(db, 1, *window)) == 2
+
+    index.reconcile_seconds = 0
+    assert len(index.intervals(db, 1, *window)) == 3
+    stats = index.stats()
+    assert stats["doctors"] == 1 and stats["appointments"] == 3
+    assert stats["reconcile_drift"] == 1
+    assert stats["bytes"] > 0
+
+
+def test_deletes_reach_other_workers(db, tmp_path):
+    worker_a, worker_b = (
+        ScheduleIndex(
+            max_duration=timedelta(minutes=180),
+            enabled=True,
+            reconcile_seconds=3600,
+            directory=tmp_path,
+        )
+        for _ in range(2)
+    )
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    appt = _book(db, start, 30)
+    slot = (start, start + timedelta(minutes=30))
+    for worker in (worker_a, worker_b):
+        assert len(worker.intervals(db, 1, *slot)) == 1
+
+    db.delete(appt)
+    db.commit()
+    worker_a.invalidate(1)
+
+    assert not worker_b.collides(1, *slot)
+    assert worker_b.intervals(db, 1, *slot) == []
+
+
+def _create(path: str, payload: dict) -> int:
+    r = client.post(path, json=payload)
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+@pytest.fixture()
+def enabled_index(monkeypatch):
+    monkeypatch.setattr(schedule_index, "enabled", True)
+    yield schedule_index
+    schedule_index.clear()
+
+
+def test_booking_refuses_indexed_conflict_before_locking(enabled_index, monkeypatch):
+    pid = _create(
+        "/patients",
+        {
+            "first_name": "Index",
+            "last_name": "Patient",
+            "email": f"idx_{uuid.uuid4().hex[:10]}@example.com",
+            "phone": "9999999999",
+        },
+    )
+    did = _create(
+        "/doctors",
+        {"full_name": f"Dr Index {uuid.uuid4().hex[:8]}", "specialization": "X"},
+    )
+    start = (datetime.now(timezone.utc) + timedelta(days=3)).replace(
+        hour=10, minute=0, second=0, microsecond=0
+    )
+    booking = {
+        "patient_id": pid,
+        "doctor_id": did,
+        "start_time_utc": start.isoformat(),
+        "duration_minutes": 60,
+    }
+    assert client.post("/appointments", json=booking).status_code == 201
+
+    def no_lock(*args):
+        raise AssertionError("conflict should be refused from the index")
+
+    monkeypatch.setattr(appointment_service, "_lock_doctors", no_lock)
+    overlapping = {
+        **booking,
+        "start_time_utc": (start + timedelta(minutes=30)).isoformat(),
+    }
+    r = client.post("/appointments", json=overlapping)
+    assert r.status_code == 409
+    # Unknown patients are still reported first.
+    r = client.post("/appointments", json={**overlapping, "patient_id": 999999999})
+    assert r.status_code == 404
+
+    r = client.get(
+        f"/doctors/{did}/availability",
+        params={
+            "from": start.date().isoformat(),
+            "to": start.date().isoformat(),
+            "work_start": "09:00",
+            "work_end": "12:00",
+        },
+    )
+    starts = [slot["start_time_utc"][11:16] for slot in r.json()["slots"]]
+    assert starts == ["09:00", "09:30", "11:00", "11:30"]
+
+
+def test_index_is_never_loaded_from_a_replica(db, tmp_path):
+    index = ScheduleIndex(
+        max_duration=timedelta(minutes=180), enabled=True, directory=tmp_path
+    )
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    _book(db, start, 30)
+    slot = (start, start + timedelta(minutes=30))
+
+    db.info["replica"] = True
+    assert index.intervals(db, 1, *slot) is None
+    assert index.stats()["loads"] == 0 and not index.collides(1, *slot)
+
+    db.info["replica"] = False
+    assert len(index.intervals(db, 1, *slot)) == 1
+    db.info["replica"] = True
+    assert len(index.intervals(db, 1, *slot)) == 1  # fresh, loaded from primary
+
+
+def test_slot_freed_on_primary_is_not_blocked_by_a_lagging_replica(
+    enabled_index, tmp_path, monkeypatch
+):
+    pid = _create(
+        "/patients",
+        {
+            "first_name": "Lag",
+            "last_name": "Patient",
+            "email": f"lag_{uuid.uuid4().hex[:10]}@example.com",
+            "phone": "9999999999",
+        },
+    )
+    did = _create(
+        "/doctors",
+        {"full_name": f"Dr Lag {uuid.uuid4().hex[:8]}", "specialization": "X"},
+    )
+    start = (datetime.now(timezone.utc) + timedelta(days=4)).replace(
+        hour=10, minute=0, second=0, microsecond=0
+    )
+    # The replica still has an appointment the primary no longer has.
+    replica = create_engine(
+        f"sqlite:///{tmp_path / 'replica.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=replica)
+    with Session(replica) as stale:
+        stale.add_all(
+            [
+                Doctor(id=did, full_name="Dr Lag", specialization="X"),
+                Patient(
+                    id=pid,
+                    first_name="Lag",
+                    last_name="Patient",
+                    email="lag@example.com",
+                    phone="1",
+                ),
+                Appointment(
+                    patient_id=pid,
+                    doctor_id=did,
+                    start_time_utc=start,
+                    duration_minutes=60,
+                ),
+            ]
+        )
+        stale.commit()
+    monkeypatch.setattr(
+        database, "ReadSessionLocal", sessionmaker(bind=replica, autoflush=False)
+    )
+
+    r = TestClient(app).get(
+        f"/doctors/{did}/availability",
+        params={"from": start.date().isoformat(), "to": start.date().isoformat()},
+    )
+    assert r.status_code == 200
+    r = client.post(
+        "/appointments",
+        json={
+            "patient_id": pid,
+            "doctor_id": did,
+            "start_time_utc": start.isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    assert r.status_code == 201, r.text
+    replica.dispose()
@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, TypeAdapter
+
+from src.database import SessionLocal
+from src.main import app
+from src.schemas.appointment_pydantic import AppointmentExpandedRead
+from src.schemas.doctor_pydantic import DoctorRead
+from src.schemas.patient_pydantic import PatientRead
+from src.services.appointment_service import list_appointments_by_date
+from src.services.doctor_service import list_doctors
+from src.services.patient_service import list_patients
+
+client = TestClient(app)
+
+
+def _model_path_body(model: type[BaseModel], items, **dump) -> bytes:
+    # What the response_model path renders: validate, dump in JSON mode,
+    # json.dumps through JSONResponse.
+    adapter = TypeAdapter(list[model])
+    objs = [
+        (
+            item
+            if isinstance(item, model)
+            else model.model_validate(item, from_attributes=True)
+        )
+        for item in items
+    ]
+    return JSONResponse(adapter.dump_python(objs, mode="json", **dump)).body
+
+
+def test_list_patients_fast_path_is_byte_identical():
+    client.post(
+        "/patients",
+        json={
+            "first_name": 'Zoë  "quoted"',
+            "last_name": "Ünïcode\\",
+            "email": f"fast_{uuid.uuid4().hex[:10]}@example.com",
+            "phone": "9999999999",
+        },
+    )
+    r = client.get("/patients?limit=500")
+    assert r.status_code == 200
+    with SessionLocal() as db:
+        items, _ = list_patients(db, 500, None)
+        assert r.content == _model_path_body(PatientRead, items)
+
+
+def test_list_doctors_fast_path_is_byte_identical():
+    client.post("/doctors", json={"full_name": "Dr Fast", "specialization": "ENT"})
+    r = client.get("/doctors?limit=500&specialization=ENT")
+    assert r.status_code == 200 and r.json()
+    with SessionLocal() as db:
+        items, _ = list_doctors(db, 500, None, "ENT")
+        assert r.content == _model_path_body(DoctorRead, items)
+
+
+def test_list_appointments_fast_path_is_byte_identical():
+    pid = client.post(
+        "/patients",
+        json={
+            "first_name": "Fast",
+            "last_name": "Path",
+            "email": f"fast_{uuid.uuid4().hex[:10]}@example.com",
+            "phone": "9999999999",
+        },
+    ).json()["id"]
+    did = client.post(
+        "/doctors", json={"full_name": "Dr Rows", "specialization": "General"}
+    ).json()["id"]
+    start = (datetime.now(timezone.utc) + timedelta(days=220)).replace(
+        hour=9, minute=0, second=0, microsecond=123456
+    )
+    r = client.post(
+        "/appointments",
+        json={
+            "patient_id": pid,
+            "doctor_id": did,
+            "start_time_utc": start.isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    assert r.status_code == 201
+
+    r = client.get(f"/appointments?date={start.date()}")
+    assert r.status_code == 200 and r.json()
+    assert ".123456Z" in r.text
+    with SessionLocal() as db:
+        items = list_appointments_by_date(db, start.date())
+        expected = _model_path_body(AppointmentExpandedRead, items, exclude_unset=True)
+        assert r.content == expected
@@ -0,0 +1,135 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import admin, slow_queries
+from src.idempotency import REPLAYED_HEADER
+from src.main import app
+from src.slow_queries import REDACTED, slow_query_log
+
+client = TestClient(app)
+TOKEN = "test-admin-token"
+HEADERS = {"X-Admin-Token": TOKEN}
+
+
+@pytest.fixture()
+def log_everything(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", TOKEN)
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_THRESHOLD_MS", 0.0)
+    slow_query_log.clear()
+    yield
+    slow_query_log.clear()
+
+
+def test_slow_queries_record_endpoint_redacted_params_and_plan(log_everything):
+    email = f"slow_{uuid.uuid4().hex[:10]}@example.com"
+    r = client.post(
+        "/patients",
+        json={
+            "first_name": "Slow",
+            "last_name": "Query",
+            "email": email,
+            "phone": "5551234567",
+        },
+    )
+    assert r.status_code == 201
+    day = (datetime.now(timezone.utc) + timedelta(days=3)).date()
+    assert client.get(f"/appointments?date={day}").status_code == 200
+
+    r = client.get("/admin/slow-queries", headers=HEADERS)
+    assert r.status_code == 200
+    entries = r.json()
+    assert email not in r.text and "5551234567" not in r.text
+
+    insert = next(e for e in entries if e["statement"].startswith("INSERT"))
+    assert insert["endpoint"] == "POST /patients"
+    assert insert["parameters"][0]["email"] == REDACTED
+    assert insert["parameters"][0]["phone"] == REDACTED
+
+    listing = next(e for e in entries if e["endpoint"] == "GET /appointments")
+    assert listing["plan"] and any("vamsi_appointments" in p for p in listing["plan"])
+    assert listing["duration_ms"] >= 0
+
+    assert client.delete("/admin/slow-queries", headers=HEADERS).status_code == 204
+    newest = client.get("/admin/slow-queries?limit=1", headers=HEADERS).json()
+    assert len(newest) <= 1
+
+
+def test_slow_queries_redact_patient_search_terms(log_everything):
+    tag = "".join(chr(ord("a") + int(c, 16)) for c in uuid.uuid4().hex[:10])
+    r = client.get("/patients/search", params={"q": f"{tag} ivanova"})
+    assert r.status_code == 200
+
+    r = client.get("/admin/slow-queries", headers=HEADERS)
+    assert tag not in r.text and "ivanova" not in r.text
+    search = next(e for e in r.json() if e["endpoint"] == "GET /patients/search")
+    assert search["parameters"] and REDACTED in search["parameters"][0].values()
+
+
+def test_slow_queries_redact_stored_idempotent_responses(log_everything):
+    tag = "".join(chr(ord("a") + int(c, 16)) for c in uuid.uuid4().hex[:10])
+    patient = {
+        "first_name": f"First{tag}",
+        "last_name": f"Last{tag}",
+        "email": f"{tag}@example.com",
+        "phone": "5557654321",
+    }
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    first = client.post("/patients", json=patient, headers=headers)
+    replay = client.post("/patients", json=patient, headers=headers)
+    assert first.status_code == replay.status_code == 201
+    assert replay.headers[REPLAYED_HEADER] == "true"
+    assert replay.json() == first.json()
+
+    r = client.get("/admin/slow-queries", headers=HEADERS)
+    assert tag not in r.text and "5557654321" not in r.text
+    stored = next(
+        e
+        for e in r.json()
+        if e["statement"].startswith("UPDATE vamsi_idempotency_keys")
+    )
+    assert stored["parameters"][0]["response_body"] == REDACTED
+
+
+def test_slow_queries_endpoint_requires_admin_token(log_everything):
+    assert client.get("/admin/slow-queries").status_code == 403
+
+
+def test_slow_queries_redact_expanded_in_lists(log_everything):
+    from sqlalchemy import select
+
+    from src.database import SessionLocal
+    from src.models.patient import Patient
+
+    emails = [f"in_{uuid.uuid4().hex[:10]}@example.com" for _ in range(2)]
+    with SessionLocal() as db:
+        db.execute(select(Patient.id).where(Patient.email.in_(emails))).all()
+
+    lookup = next(
+        e
+        for e in slow_query_log.entries()
+        if "vamsi_patients" in e.statement and " IN " in e.statement
+    )
+    assert set(lookup.parameters[0].values()) == {REDACTED}
+    assert not any(
+        email in str(e) for e in slow_query_log.entries() for email in emails
+    )
+
+
+def test_slow_queries_do_not_explain_streamed_results(log_everything):
+    start = datetime.now(timezone.utc)
+    r = client.get(
+        "/appointments/export",
+        params={
+            "from": start.isoformat(),
+            "to": (start + timedelta(days=1)).isoformat(),
+        },
+    )
+    assert r.status_code == 200
+
+    export = next(
+        e for e in slow_query_log.entries() if e.endpoint == "GET /appointments/export"
+    )
+    assert export.plan is None
@@ -0,0 +1,166 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from src import versions
+from src.database import SessionLocal
+from src.main import app
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.versions import VersionLog, if_none_match
+
+client = TestClient(app)
+
+
+def _doctor() -> int:
+    return client.post(
+        "/doctors", json={"full_name": "Dr Etag", "specialization": "X"}
+    ).json()["id"]
+
+
+def _patient() -> int:
+    return client.post(
+        "/patients",
+        json={
+            "first_name": "Etag",
+            "last_name": "Patient",
+            "email": f"etag_{uuid.uuid4().hex[:10]}@example.com",
+            "phone": "9999999999",
+        },
+    ).json()["id"]
+
+
+def _book(patient_id: int, doctor_id: int, start: datetime) -> None:
+    r = client.post(
+        "/appointments",
+        json={
+            "patient_id": patient_id,
+            "doctor_id": doctor_id,
+            "start_time_utc": start.isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    assert r.status_code == 201
+
+
+def test_doctor_list_304_until_a_doctor_is_added():
+    first = client.get("/doctors")
+    etag = first.headers["ETag"]
+
+    again = client.get("/doctors", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+    _doctor()
+    changed = client.get("/doctors", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_day_listing_etag_follows_bookings_on_that_day():
+    pid, did, other = _patient(), _doctor(), _doctor()
+    day = (datetime.now(timezone.utc) + timedelta(days=30)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    params = {"date": day.date().isoformat()}
+    doctor_params = {**params, "doctor_id": did}
+    next_day = {"date": (day + timedelta(days=1)).date().isoformat()}
+
+    day_etag = client.get("/appointments", params=params).headers["ETag"]
+    doctor_etag = client.get("/appointments", params=doctor_params).headers["ETag"]
+    next_etag = client.get("/appointments", params=next_day).headers["ETag"]
+
+    _book(pid, other, day)
+
+    # Another doctor's booking changes the day, not this doctor's view.
+    assert client.get("/appointments", params=params).headers["ETag"] != day_etag
+    r = client.get(
+        "/appointments", params=doctor_params, headers={"If-None-Match": doctor_etag}
+    )
+    assert r.status_code == 304
+    r = client.get(
+        "/appointments", params=next_day, headers={"If-None-Match": next_etag}
+    )
+    assert r.status_code == 304
+
+    _book(pid, did, day)
+    r = client.get(
+        "/appointments",
+        params={**doctor_params, "expand": "patient"},
+        headers={"If-None-Match": doctor_etag},
+    )
+    assert r.status_code == 200
+    assert r.headers["ETag"] != doctor_etag
+    assert [a["doctor_id"] for a in r.json()] == [did]
+
+
+def test_etags_change_on_writes_the_app_did_not_make():
+    pid, did = _patient(), _doctor()
+    day = (datetime.now(timezone.utc) + timedelta(days=31)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    params = {"date": day.date().isoformat(), "doctor_id": did}
+    doctors_etag = client.get("/doctors").headers["ETag"]
+    day_etag = client.get("/appointments", params=params).headers["ETag"]
+
+    # As src/generate_data.py or a script would: no version is bumped.
+    with SessionLocal() as db:
+        db.add(Doctor(full_name="Dr Script", specialization="X"))
+        db.add(
+            Appointment(
+                patient_id=pid, doctor_id=did, start_time_utc=day, duration_minutes=30
+            )
+        )
+        db.commit()
+
+    r = client.get("/doctors", headers={"If-None-Match": doctors_etag})
+    assert r.status_code == 200
+    r = client.get("/appointments", params=params, headers={"If-None-Match": day_etag})
+    assert r.status_code == 200
+    assert [a["doctor_id"] for a in r.json()] == [did]
+
+
+def test_version_log_agrees_across_workers(tmp_path):
+    path = tmp_path / "versions.log"
+    writer, reader = VersionLog(path, enabled=True), VersionLog(path, enabled=True)
+
+    assert writer.etag("doctors") == reader.etag("doctors")
+    writer.bump("doctors", "appointments:2030-01-01")
+    bumped = reader.etag("doctors")
+    assert bumped == writer.etag("doctors")
+    assert reader.etag("appointments:2030-01-02") == writer.etag("missing")
+    # A bump younger than the settle time gets no ETag.
+    assert reader.etag("doctors", settle_seconds=60) is None
+
+    assert reader.etag("doctors", "1-1") != bumped  # rows changed
+
+    path.unlink()  # a fresh log changes every version
+    writer.bump("doctors")
+    assert reader.etag("doctors") not in (None, bumped)
+    assert reader.etag("doctors") == writer.etag("doctors")
+
+    before = reader.etag("appointments:2030-01-02")
+    writer.reset()  # as after a bulk load
+    assert reader.etag("appointments:2030-01-02") != before
+
+
+def test_bump_stamp_never_lies_in_the_future(tmp_path, monkeypatch):
+    now_ns = 1_700_000_000_999_600_000  # .9996 s: rounds up to the next second
+    clock = SimpleNamespace(time=lambda: now_ns / 1e9, time_ns=lambda: now_ns)
+    monkeypatch.setattr(versions, "time", clock)
+    log = VersionLog(tmp_path / "versions.log", enabled=True)
+
+    log.bump("doctors")
+    assert log.etag("doctors") is not None
+    assert log.etag("doctors", settle_seconds=0.0005) is not None
+    assert log.etag("doctors", settle_seconds=0.001) is None
+
+
+def test_if_none_match():
+    assert if_none_match('"a.1", W/"b.2"', '"b.2"')
+    assert if_none_match("*", '"a.1"')
+    assert not if_none_match('"a.1"', '"a.2"')
+    assert not if_none_match(None, '"a.1"')